@@ -202,3 +202,90 @@ ADD COLUMN share_id VARCHAR(8) UNIQUE;
 
 -- Create indexes for backtest_requests
 CREATE INDEX idx_share_id ON backtest_requests(share_id);
+
+-- Keyset pagination of a user's backtests, newest first
+CREATE INDEX idx_backtest_requests_user_created
+ON backtest_requests(user_id, created_at DESC, id DESC);
+
+-- Report listing only scans backtests with a generated report
+CREATE INDEX idx_backtest_requests_user_reports
+ON backtest_requests(user_id, created_at DESC, id DESC)
+WHERE generated_report;
+
+-- Past backtest search: full-text over title, symbol and description plus
+-- trigram matching on titles and symbols, indexed per user
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE EXTENSION IF NOT EXISTS btree_gin;
+
+ALTER TABLE backtest_requests
+ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+    setweight(to_tsvector('english', COALESCE(strategy_title, '')), 'A') ||
+    setweight(to_tsvector('simple', COALESCE(instrument_symbol, '')), 'A') ||
+    setweight(to_tsvector('english', COALESCE(strategy_description, '')), 'B')
+) STORED;
+
+CREATE INDEX idx_backtest_requests_search
+ON backtest_requests USING GIN (user_id, search_vector);
+CREATE INDEX idx_backtest_requests_title_trgm
+ON backtest_requests USING GIN (user_id, strategy_title gin_trgm_ops);
+CREATE INDEX idx_backtest_requests_symbol_trgm
+ON backtest_requests USING GIN (user_id, instrument_symbol gin_trgm_ops);
+
+-- Bulk status polling: changes since a watermark and the in-flight set
+CREATE INDEX idx_backtest_requests_user_updated
+ON backtest_requests(user_id, updated_at);
+CREATE INDEX idx_backtest_requests_user_in_flight
+ON backtest_requests(user_id, updated_at)
+WHERE status NOT IN (
+    'script_generation_failed',
+    'validation_failed',
+    'execution_failed',
+    'report_generation_failed',
+    'report_generation_successful'
+);
+
+-- Hash of the report content the preview image was rendered from
+ALTER TABLE backtest_requests
+ADD COLUMN preview_report_hash VARCHAR(64);
+
+-- Structured strategy spec for strategies run on the built-in engine
+ALTER TABLE backtest_requests
+ADD COLUMN strategy_spec JSONB;
+
+-- Parameter sweeps: the requested grid and the ranked results
+ALTER TABLE backtest_requests
+ADD COLUMN parameter_grid JSONB,
+ADD COLUMN sweep_results_url TEXT,
+ADD COLUMN sweep_heatmap_url TEXT;
+
+-- Walk-forward train and test window configuration
+ALTER TABLE backtest_requests
+ADD COLUMN walk_forward JSONB;
+
+-- Portfolio instruments and allocation of multi-instrument backtests
+ALTER TABLE backtest_requests
+ADD COLUMN portfolio JSONB;
+
+-- Execution result cache entry a script-based backtest was stored under or reused from
+ALTER TABLE backtest_requests
+ADD COLUMN result_cache_key TEXT;
+
+-- Headline stats parsed from the log of a script-based backtest, also kept in its cache entry
+ALTER TABLE backtest_requests
+ADD COLUMN result_stats JSONB;
+
+-- Stamp backtest updates with the statement time rather than the transaction start,
+-- a worker transaction can be open for minutes before its update commits
+CREATE OR REPLACE FUNCTION update_updated_at_clock()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = clock_timestamp();
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER update_backtest_requests_updated_at ON backtest_requests;
+CREATE TRIGGER update_backtest_requests_updated_at
+    BEFORE UPDATE ON backtest_requests
+    FOR EACH ROW
+    EXECUTE FUNCTION update_updated_at_clock();
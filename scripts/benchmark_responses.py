@@ -0,0 +1,74 @@
+"""
+Compare the cost of serializing a large backtest listing through the default
+FastAPI path (response model validation, jsonable_encoder, json.dumps) with
+the trusted orjson path used by the listing routes.
+
+Usage: python -m scripts.benchmark_responses [rows] [repeats]
+"""
+import json
+import sys
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from typing import List
+
+from pydantic import TypeAdapter
+
+from src.api.responses import trusted_response
+from src.schemas.backtests import BacktestListItem
+
+def make_rows(count: int) -> List[dict]:
+    now = datetime.now(timezone.utc)
+    user_id = uuid.uuid4()
+    return [
+        {
+            "id": uuid.uuid4(),
+            "user_id": user_id,
+            "instrument_symbol": "NIFTY",
+            "from_date": date(2023, 1, 1),
+            "to_date": date(2023, 12, 31),
+            "strategy_description": "Buy when the 50-day moving average crosses above the 200-day moving average.",
+            "strategy_title": f"Golden Cross Strategy #{i}",
+            "python_script_url": f"https://s3.amazonaws.com/scripts/{i}.py",
+            "log_file_url": f"https://s3.amazonaws.com/logs/{i}.log",
+            "report_url": f"https://s3.amazonaws.com/reports/{i}.md",
+            "ready_for_report": True,
+            "generated_report": True,
+            "status": "report_generation_successful",
+            "error_message": None,
+            "created_at": now - timedelta(minutes=i),
+            "updated_at": now - timedelta(minutes=i)
+        }
+        for i in range(count)
+    ]
+
+LIST_ADAPTER = TypeAdapter(List[BacktestListItem])
+
+def default_path(rows: List[dict]) -> bytes:
+    # What the route and FastAPI's serialize_response did for each request:
+    # build the models, dump them, validate against the response model,
+    # serialize and encode with the standard library
+    items = [BacktestListItem(**row) for row in rows]
+    dumped = [item.model_dump(exclude_unset=True) for item in items]
+    validated = LIST_ADAPTER.validate_python(dumped)
+    content = LIST_ADAPTER.dump_python(validated, mode="json", exclude_unset=True)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def trusted_path(rows: List[dict]) -> bytes:
+    return trusted_response(rows).body
+
+def bench(name: str, fn, rows: List[dict], repeats: int):
+    fn(rows)
+    started = time.perf_counter()
+    for _ in range(repeats):
+        fn(rows)
+    elapsed = (time.perf_counter() - started) / repeats
+    print(f"{name:<10} {elapsed * 1000:8.2f} ms/response  {1 / elapsed:8.1f} responses/s")
+
+if __name__ == "__main__":
+    row_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    rows = make_rows(row_count)
+    print(f"{row_count} rows, {repeats} repeats")
+    bench("default", default_path, rows, repeats)
+    bench("trusted", trusted_path, rows, repeats)
@@ -1,87 +1,71 @@
-from fastapi import Depends, HTTPException, status, Request
+from fastapi import Depends, Header, HTTPException, status, Request
 from datetime import date
+import hmac
 from typing import Optional
 
 from src.db.base import get_db, execute_query_single
+from src.db.loaders import RequestLoader, get_request_loader
 from src.db.queries.subscriptions import get_free_subscription_plan
 from src.core.auth.jwt import get_current_user
 from src.config.settings import settings
 
-async def get_user_rate_limit(user_id: str, conn) -> int:
+def verify_internal_token(x_internal_token: Optional[str] = Header(None)):
+    """Only let the workers' postbacks through to internal routes"""
+    if not x_internal_token or not hmac.compare_digest(x_internal_token, settings.INTERNAL_API_TOKEN):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not allowed"
+        )
+
+def get_user_rate_limit(user: dict, plan_reports_per_day: Optional[int]) -> int:
     """Get user's daily rate limit based on subscription"""
-    # Check if user has active subscription
-    subscription = execute_query_single(
-        conn,
-        """
-        SELECT sp.reports_per_day
-        FROM user_subscriptions us
-        JOIN subscription_plans sp ON us.plan_id = sp.id
-        WHERE us.user_id = %s
-        AND us.is_active = true
-        AND us.start_date <= CURRENT_TIMESTAMP
-        AND us.end_date >= CURRENT_TIMESTAMP
-        """,
-        (user_id,)
-    )
-    
-    if subscription:
-        return subscription['reports_per_day']
+    if user['is_anonymous']:
+        return settings.ANONYMOUS_DAILY_LIMIT
+    if plan_reports_per_day is not None:
+        return plan_reports_per_day
     return settings.AUTHENTICATED_DAILY_LIMIT
 
 async def check_user_rate_limit(
     request: Request,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user),
+    loader: RequestLoader = Depends(get_request_loader)
 ) -> dict:
     """Check if user has exceeded their daily rate limit"""
-    with get_db() as conn:
-        # Get today's report count
-        daily_count = execute_query_single(
+    # Already loaded alongside the user by get_current_user
+    context = loader.get_user_context(current_user['id'])
+    rate_limit = get_user_rate_limit(current_user, context['plan_reports_per_day'])
+
+    if context['reports_today'] >= rate_limit:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=f"Daily report limit of {rate_limit} exceeded"
+        )
+
+    # Count the report, the limit is re-checked atomically in case of
+    # concurrent requests from the same user
+    with loader as conn:
+        counted = execute_query_single(
             conn,
             """
-            SELECT count FROM daily_report_counts
-            WHERE user_id = %s AND date = %s
+            INSERT INTO daily_report_counts (user_id, date, count)
+            VALUES (%s, %s, 1)
+            ON CONFLICT (user_id, date) DO UPDATE
+            SET count = daily_report_counts.count + 1,
+                updated_at = CURRENT_TIMESTAMP
+            WHERE daily_report_counts.count < %s
+            RETURNING count
             """,
-            (current_user['id'], date.today())
+            (current_user['id'], date.today(), rate_limit)
         )
-        
-        # Get user's rate limit
-        rate_limit = (
-            settings.ANONYMOUS_DAILY_LIMIT 
-            if current_user['is_anonymous']
-            else await get_user_rate_limit(current_user['id'], conn)
-        )
-        
-        # Check if user has exceeded limit
-        current_count = daily_count['count'] if daily_count else 0
-        if current_count >= rate_limit:
-            raise HTTPException(
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail=f"Daily report limit of {rate_limit} exceeded"
-            )
-        
-        # Update or create daily count
-        if not daily_count:
-            execute_query_single(
-                conn,
-                """
-                INSERT INTO daily_report_counts (user_id, date, count)
-                VALUES (%s, %s, 1)
-                """,
-                (current_user['id'], date.today())
-            )
-        else:
-            execute_query_single(
-                conn,
-                """
-                UPDATE daily_report_counts
-                SET count = count + 1
-                WHERE user_id = %s AND date = %s
-                """,
-                (current_user['id'], date.today())
-            )
         conn.commit()
-        
-        return current_user
+
+    if not counted:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=f"Daily report limit of {rate_limit} exceeded"
+        )
+
+    return current_user
 
 async def identify_anonymous_user(request: Request) -> dict:
     """Create or get anonymous user based on IP and MAC address"""
@@ -12,6 +12,10 @@ class AnonymousUserMiddleware(BaseHTTPMiddleware):
         # Skip middleware for authentication endpoints
         if request.url.path.startswith("/v1/auth"):
             return await call_next(request)
+
+        # Event streams may authenticate with a token query parameter instead
+        if request.url.path.startswith("/v1/events") and request.query_params.get("token"):
+            return await call_next(request)
             
         # Check for authorization header
         auth_header: Optional[str] = request.headers.get("Authorization")
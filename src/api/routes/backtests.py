@@ -1,48 +1,63 @@
 # src/api/routes/backtests.py
 import json
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from typing import List
+from fastapi import APIRouter, Depends, Header, HTTPException, status, Query, Response
+from typing import List, Optional
 from uuid import UUID
 from pydantic import BaseModel
-import httpx
 
-from src.db.base import get_db
+from src.db.loaders import get_request_loader
 from src.schemas.backtests import (
     BacktestResponse,
+    BacktestListItem,
     BacktestCreate,
     BacktestUpdate,
+    ReportChunkBroadcast,
+    BacktestStatusRequest,
+    BacktestStatusResponse,
     GroupedBacktestsResponse,
     ShareResponse,
     SharedBacktestResponse
 )
-from src.api.dependencies import check_user_rate_limit
+from src.api.dependencies import check_user_rate_limit, verify_internal_token
 from src.tasks.script_generation import generate_backtest_script_task as generate_backtest_script
+from src.tasks.preview_generation import generate_preview_image
 
 from src.db.queries.backtests import (
+    BACKTEST_LIST_FIELDS,
     create_backtest_request,
     get_user_backtests,
     get_backtest_by_id,
+    get_backtest_statuses,
+    get_status_watermark,
     get_grouped_backtests,
     get_grouped_backtests_search,
-    update_backtest_preview_image_url,
     update_backtest_share_id,
+    revoke_backtest_share,
     get_backtest_by_share_id
 )
-from src.infrastructure.llm.openai_client import generate_strategy_title
-# from src.infrastructure.llm.localllm_client import CustomLLMClient
 
+from src.api.responses import trusted_response
 from src.api.services.websocket import manager
+from src.api.services.past_backtests import get_grouped_past_backtests
+from src.api.services.shared_backtests import get_shared_backtest_body
 from src.core.auth.jwt import get_current_user
+from src.core.backtesting.sweep import validate_parameter_grid
+from src.core.backtesting.walk_forward import validate_walk_forward
+from src.core.backtesting.portfolio import validate_portfolio
 
 from src.infrastructure.storage.s3_client import S3Client
 
 from src.config.settings import settings
 
+from src.utils.pagination import encode_cursor, decode_cursor
+from src.utils.strategy_titles import get_provisional_strategy_title
 from src.utils.logger import get_logger
 logger = get_logger(__name__)
 
 router = APIRouter(prefix="/v1/backtests", tags=["backtests"])
 
+BACKTEST_RESPONSE_FIELDS = tuple(BacktestResponse.model_fields)
+
 @router.post(
     "", 
     response_model=BacktestResponse,
@@ -75,40 +90,82 @@ router = APIRouter(prefix="/v1/backtests", tags=["backtests"])
 async def create_backtest(
     backtest: BacktestCreate,
     current_user: dict = Depends(check_user_rate_limit),
-    db = Depends(get_db)
+    db = Depends(get_request_loader)
 ) -> BacktestResponse:
     """
     Create a new backtest request.
     
-    The request goes through the following pipeline:
-    1. Strategy title generation using LLM
+    The request is stored with a provisional title and queued immediately.
+    The pipeline then runs asynchronously:
+    1. Strategy title generation using LLM (pushed over the WebSocket)
     2. Python script generation
     3. Script validation
     4. Full backtest execution
     5. Report generation
     
+    With a parameter_grid every combination of the grid is backtested in
+    one execution and ranked, see `sweep_results_url` and `sweep_heatmap_url`.
+    With walk_forward only out-of-sample windows are traded and stitched.
+    With portfolio the strategy trades several instruments as one portfolio.
+
     Rate limits apply based on user type:
     - Anonymous: 3/day
     - Authenticated: 5/day
     - Subscribed: n/day (based on plan)
     """
-    # Generate strategy title using LLM
-    # custom_llm = CustomLLMClient()
+    if backtest.parameter_grid:
+        try:
+            validate_parameter_grid(
+                backtest.strategy_description,
+                backtest.parameter_grid,
+                settings.SWEEP_MAX_COMBINATIONS,
+                require_spec=not settings.STRATEGY_SPEC_LLM_ENABLED
+            )
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=str(e)
+            )
 
-    strategy_title = await generate_strategy_title(backtest.strategy_description)
-    
-    if strategy_title == "None":
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid strategy description"
-        )
+    if backtest.walk_forward:
+        try:
+            validate_walk_forward(
+                backtest.from_date,
+                backtest.to_date,
+                backtest.walk_forward.train_days,
+                backtest.walk_forward.test_days,
+                backtest.walk_forward.step_days,
+                max_windows=settings.WALK_FORWARD_MAX_WINDOWS
+            )
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=str(e)
+            )
 
-    # Sanitize strategy title by removing any leading or trailing whitespace
-    strategy_title = strategy_title.strip('"')
+    if backtest.portfolio:
+        try:
+            if backtest.parameter_grid or backtest.walk_forward:
+                raise ValueError("Portfolio backtests cannot be combined with parameter_grid or walk_forward")
+            validate_portfolio(
+                backtest.instrument_symbol,
+                backtest.portfolio.instrument_symbols,
+                backtest.portfolio.allocation,
+                backtest.portfolio.weights,
+                max_symbols=settings.PORTFOLIO_MAX_SYMBOLS
+            )
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=str(e)
+            )
 
-    # Create backtest request in database
+    # Create backtest request in database with a provisional title, the
+    # final title is generated by the script generation task
     backtest_dict = backtest.model_dump()
-    backtest_dict['strategy_title'] = strategy_title
+    backtest_dict['strategy_title'] = get_provisional_strategy_title(
+        backtest.strategy_description
+    )
     
     with db as conn:  # Use the connection within a context manager
         backtest_db = create_backtest_request(
@@ -125,34 +182,80 @@ async def create_backtest(
 
 @router.get(
     "", 
-    response_model=List[BacktestResponse],
+    response_model=List[BacktestListItem],
+    response_model_exclude_unset=True,
     responses={
         200: {
-            "description": "List of user's backtest requests",
+            "description": "Page of the user's backtest requests, the next page cursor is returned in the X-Next-Cursor header",
             "content": {
                 "application/json": {
                     "example": [{
                         "id": "123e4567-e89b-12d3-a456-426614174000",
                         "status": "completed",
-                        "strategy_title": "Golden Cross Strategy"
+                        "strategy_title": "Golden Cross Strategy",
+                        "created_at": "2024-01-01T00:00:00Z"
                     }]
                 }
             }
+        },
+        400: {
+            "description": "Invalid cursor or unknown field requested"
         }
     }
 )
 async def list_backtests(
+    limit: int = Query(50, ge=1, le=200, description="Maximum number of backtests to return"),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
+    fields: Optional[str] = Query(
+        None,
+        description="Comma separated list of fields to return, id and created_at are always included"
+    ),
     current_user: dict = Depends(get_current_user),
-    db = Depends(get_db)
-) -> List[BacktestResponse]:
+    db = Depends(get_request_loader)
+) -> List[BacktestListItem]:
     """
-    List all backtest requests for the current user.
+    List backtest requests for the current user, one page at a time.
     
-    Results are ordered by creation date (newest first).
+    Results are ordered by creation date (newest first). When more results
+    are available the response carries an X-Next-Cursor header to pass as
+    `cursor` for the next page.
     """
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+    columns = None
+    if fields:
+        columns = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown = [field for field in columns if field not in BACKTEST_LIST_FIELDS]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(unknown)}"
+            )
+
     with db as conn:
-        backtests = get_user_backtests(conn, current_user['id'])
-        return [BacktestResponse(**backtest) for backtest in backtests]
+        # Fetch one extra row to know whether another page exists
+        backtests = get_user_backtests(
+            conn,
+            current_user['id'],
+            limit=limit + 1,
+            after=after,
+            columns=columns
+        )
+
+    headers = {}
+    if len(backtests) > limit:
+        backtests = backtests[:limit]
+        last = backtests[-1]
+        headers["X-Next-Cursor"] = encode_cursor(last['created_at'], last['id'])
+
+    # Rows only hold the selected columns, so they serialize as-is
+    return trusted_response(backtests, headers=headers)
 
 @router.get(
     "/past",
@@ -191,24 +294,80 @@ async def list_backtests(
     }
 )
 async def get_past_backtests(
+    limit: int = Query(100, ge=1, le=500, description="Maximum number of recent backtests to return"),
     current_user: dict = Depends(get_current_user),
-    db = Depends(get_db)
+    db = Depends(get_request_loader)
 ) -> GroupedBacktestsResponse:
     """
-    Get past backtests for the current user, grouped by time periods:
+    Get the most recent past backtests for the current user, grouped by time periods:
     - thisWeek: Backtests from the last 7 days
     - lastMonth: Backtests from the last 30 days (excluding thisWeek)
     - older: All backtests older than 30 days
+
+    Served from the per-user Redis index, falling back to the database
+    if Redis is unavailable.
     """
     with db as conn:
-        result = get_grouped_backtests(conn, current_user['id'])
-        return GroupedBacktestsResponse(**result['result'])
+        try:
+            return trusted_response(get_grouped_past_backtests(conn, current_user['id'], limit))
+        except Exception as e:
+            logger.warning(f"Past backtests index unavailable, falling back to database: {e}")
+            result = get_grouped_backtests(conn, current_user['id'])
+            return trusted_response(result['result'])
+
+@router.post(
+    "/status",
+    response_model=BacktestStatusResponse,
+    responses={
+        200: {
+            "description": "Status of the polled backtests that changed since the watermark",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "items": [{
+                            "id": "123e4567-e89b-12d3-a456-426614174000",
+                            "status": "execution_in_progress",
+                            "ready_for_report": False,
+                            "generated_report": False,
+                            "error_message": None,
+                            "updated_at": "2024-01-01T00:05:00Z"
+                        }],
+                        "watermark": "2024-01-01T00:05:00Z"
+                    }
+                }
+            }
+        }
+    }
+)
+async def get_backtest_statuses_bulk(
+    status_request: BacktestStatusRequest,
+    current_user: dict = Depends(get_current_user),
+    db = Depends(get_request_loader)
+) -> BacktestStatusResponse:
+    """
+    Poll the status of many backtests in one request.
+
+    Pass `ids` to poll specific backtests, or omit it to poll all in-flight
+    backtests. Pass the returned `watermark` as `since` on the next poll to
+    receive only backtests that changed in between. The watermark trails the
+    poll by a few seconds, so a change can be reported twice but never missed.
+    """
+    with db as conn:
+        watermark = get_status_watermark(conn, settings.BACKTEST_STATUS_WATERMARK_LAG)
+        items = get_backtest_statuses(
+            conn,
+            current_user['id'],
+            ids=status_request.ids,
+            since=status_request.since
+        )
+
+    return BacktestStatusResponse(items=items, watermark=watermark)
 
 @router.get("/{backtest_id}", response_model=BacktestResponse)
 async def get_backtest(
     backtest_id: UUID,
     current_user: dict = Depends(get_current_user),
-    db = Depends(get_db)
+    db = Depends(get_request_loader)
 ) -> BacktestResponse:
     """
     Get specific backtest details
@@ -228,12 +387,16 @@ async def get_backtest(
             detail="Backtest not found"
         )
     
-    return BacktestResponse(**backtest)
+    return trusted_response(backtest, fields=BACKTEST_RESPONSE_FIELDS)
 
-@router.post("/broadcast/{backtest_id}", status_code=status.HTTP_200_OK)
+@router.post(
+    "/broadcast/{backtest_id}",
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(verify_internal_token)]
+)
 async def broadcast_backtest(
     backtest_id: UUID,
-    db = Depends(get_db)
+    db = Depends(get_request_loader)
 ):
     """
     Broadcast backtest update to the user.
@@ -258,6 +421,32 @@ async def broadcast_backtest(
         
         return {"message": "Backtest update broadcasted successfully"}
 
+@router.post(
+    "/broadcast/{backtest_id}/report",
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(verify_internal_token)]
+)
+async def broadcast_report_chunk(
+    backtest_id: UUID,
+    report_chunk: ReportChunkBroadcast
+):
+    """
+    Broadcast a streamed report chunk to the owner of the backtest.
+    """
+    data = {
+        "event": "backtest.report.chunk",
+        "data": {
+            "id": str(backtest_id),
+            "chunk": report_chunk.chunk,
+            "index": report_chunk.index,
+            "done": report_chunk.done
+        }
+    }
+
+    await manager.broadcast(report_chunk.user_id, json.dumps(data))
+
+    return {"message": "Report chunk broadcasted successfully"}
+
 @router.get("/{backtest_id}/report", response_model=str, responses={
     200: {
         "description": "Markdown report content",
@@ -279,7 +468,7 @@ async def broadcast_backtest(
 async def get_backtest_report(
     backtest_id: UUID,
     current_user: dict = Depends(get_current_user),
-    db = Depends(get_db)
+    db = Depends(get_request_loader)
 ) -> str:
     """
     Get the markdown report for a specific backtest.
@@ -336,20 +525,22 @@ async def get_backtest_report(
     }
 )
 async def search_past_backtests(
-    q: str = Query(..., description="Search term to filter backtests"),
+    q: str = Query(..., min_length=1, description="Search term to filter backtests"),
+    limit: int = Query(50, ge=1, le=200, description="Maximum number of matches to return"),
     current_user: dict = Depends(get_current_user),
-    db = Depends(get_db)
+    db = Depends(get_request_loader)
 ) -> GroupedBacktestsResponse:
     """
     Search past backtests for the current user and return results grouped by time periods.
-    Searches through strategy titles, descriptions, and instrument symbols.
+    Searches through strategy titles, descriptions, and instrument symbols using
+    full-text search with fuzzy title matching, best matches first.
     Results are grouped into:
     - thisWeek: Matching backtests from this week
     - lastMonth: Matching backtests from this month but before this week
     - older: Matching backtests before the current month
     """
     with db as conn:
-        result = get_grouped_backtests_search(conn, current_user['id'], q)
+        result = get_grouped_backtests_search(conn, current_user['id'], q, limit=limit)
         return GroupedBacktestsResponse(**result['result'])
 
 @router.get(
@@ -374,9 +565,14 @@ async def search_past_backtests(
 async def generate_share_link(
     backtest_id: UUID,
     current_user: dict = Depends(get_current_user),
-    db = Depends(get_db)
+    db = Depends(get_request_loader)
 ) -> ShareResponse:
-    """Generate a shareable link for a backtest report with preview image metadata."""
+    """
+    Generate a shareable link for a backtest report.
+
+    Returns immediately, the preview image is generated asynchronously.
+    Sharing the same backtest again returns the same link.
+    """
     with db as conn:
         backtest = get_backtest_by_id(conn=conn, backtest_id=backtest_id)
 
@@ -393,34 +589,14 @@ async def generate_share_link(
             )
 
         try:
-            # Fetch report content
-            s3_client = S3Client()
-            report_key = f"{backtest_id}/report.md"
-            report_content = await s3_client.get_file_content(report_key)
-
-            # Generate preview image
-            async with httpx.AsyncClient() as client:
-                preview_response = await client.post(
-                    f"{settings.PREVIEW_IMAGE_SERVER_URL}/generate-preview",
-                    json={
-                        "userId": str(current_user['id']),
-                        "markdown": report_content
-                    }
-                )
-                preview_response.raise_for_status()
-                preview_data = preview_response.json()
-                preview_image_url = preview_data['imageUrl']
-
-            # Update backtest with preview URL
-            update_backtest_preview_image_url(
-                conn,
-                backtest_id,
-                preview_image_url=preview_image_url
-            )
-
-            # Generate share ID
+            # Reuse the existing share_id so repeated shares keep the same link
             share_id = update_backtest_share_id(conn, backtest_id)
 
+            # Preview images are rendered in the background after report
+            # generation, only backtests from before then still need one
+            if not backtest.get('preview_image_url'):
+                generate_preview_image.delay(backtest_id=backtest_id)
+
             # Generate shareable URL using short ID
             share_url = f"{settings.SHARE_FRONTEND_URL}/s/{share_id}"
             share_text = f"Check out my backtest report: {share_url}"
@@ -433,6 +609,38 @@ async def generate_share_link(
                 detail=f"Failed to generate share link: {str(e)}"
             )
 
+@router.delete(
+    "/{backtest_id}/share",
+    status_code=status.HTTP_204_NO_CONTENT,
+    responses={
+        404: {
+            "description": "Backtest not found"
+        }
+    }
+)
+async def revoke_share_link(
+    backtest_id: UUID,
+    current_user: dict = Depends(get_current_user),
+    db = Depends(get_request_loader)
+):
+    """
+    Stop sharing a backtest report. The link stops resolving on this process
+    and in Redis right away, other API processes keep serving it from their
+    local cache for up to SHARED_BACKTEST_LOCAL_TTL seconds.
+    """
+    with db as conn:
+        backtest = get_backtest_by_id(conn=conn, backtest_id=backtest_id)
+
+        if not backtest or backtest['user_id'] != current_user['id']:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Backtest not found"
+            )
+
+        revoke_backtest_share(conn, backtest_id, current_user['id'])
+
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
 @router.get(
     "/s/{share_id}",
     response_model=SharedBacktestResponse,
@@ -459,16 +667,34 @@ async def generate_share_link(
 )
 async def get_shared_backtest(
     share_id: str,
-    db = Depends(get_db)
+    if_none_match: Optional[str] = Header(None),
+    db = Depends(get_request_loader)
 ) -> SharedBacktestResponse:
-    """Get publicly shared backtest information"""
-    with db as conn:
-        backtest = get_backtest_by_share_id(conn=conn, share_id=share_id)
-        
-        if not backtest:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Shared backtest not found"
-            )
-        
-        return SharedBacktestResponse(**backtest)
\ No newline at end of file
+    """
+    Get publicly shared backtest information.
+
+    Served from the shared link cache, the database is only read on a cache
+    miss. Responses carry an ETag and `Cache-Control: no-cache`, browsers and
+    CDNs may store them but revalidate every request, so a revoked link is not
+    served from their caches.
+    """
+    def load():
+        with db as conn:
+            return get_backtest_by_share_id(conn=conn, share_id=share_id)
+
+    cached = get_shared_backtest_body(share_id, load)
+    if not cached:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Shared backtest not found"
+        )
+
+    body, etag = cached
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "public, no-cache"
+    }
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return Response(content=body, media_type="application/json", headers=headers)
\ No newline at end of file
@@ -0,0 +1,140 @@
+import json
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from fastapi.security import OAuth2PasswordBearer
+
+from src.api.services.events import event_broker, format_sse, parse_event_id
+from src.config.settings import settings
+from src.core.auth.jwt import get_current_user
+from src.db.loaders import RequestLoader, get_request_loader
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/token", auto_error=False)
+
+router = APIRouter(
+    prefix="/v1/events",
+    tags=["events"],
+    responses={
+        401: {"description": "Not authenticated"}
+    }
+)
+
+async def get_event_user(
+    request: Request,
+    token: Optional[str] = Query(None, description="JWT for clients that cannot set headers, such as EventSource"),
+    header_token: Optional[str] = Depends(optional_oauth2_scheme),
+    loader: RequestLoader = Depends(get_request_loader)
+) -> dict:
+    """Authenticate from the `token` query parameter, falling back to the Authorization header"""
+    if not (token or header_token):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    user = await get_current_user(request, token or header_token, loader)
+    # The stream outlives the request's dependencies, release the connection now
+    loader.close()
+    return user
+
+@router.get(
+    "/stream",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "description": "Server-sent event stream of backtest events",
+            "content": {
+                "text/event-stream": {
+                    "example": 'id: 1704067200001\nevent: backtest.update\ndata: {"event": "backtest.update", "data": {...}}\n\n'
+                }
+            }
+        }
+    }
+)
+async def stream_events(
+    request: Request,
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+    current_user: dict = Depends(get_event_user)
+):
+    """
+    Stream backtest events as server-sent events.
+
+    Carries the same events as the WebSocket. Reconnecting clients send the
+    `Last-Event-ID` header and receive every buffered event they missed.
+    """
+    user_id = str(current_user['id'])
+    resume_from = parse_event_id(last_event_id)
+    if resume_from is None:
+        resume_from = event_broker.latest_id(user_id)
+
+    async def event_stream():
+        cursor = resume_from
+        yield "retry: 3000\n\n"
+        while not await request.is_disconnected():
+            events = await event_broker.wait(user_id, cursor, timeout=settings.EVENT_STREAM_KEEPALIVE)
+            if not events:
+                # Comment line keeps proxies from closing an idle connection
+                yield ": keepalive\n\n"
+                continue
+            for event in events:
+                yield format_sse(event)
+            cursor = events[-1].id
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+@router.get(
+    "/poll",
+    responses={
+        200: {
+            "description": "Events published after the given event id",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "events": [{
+                            "id": 1704067200001,
+                            "event": "backtest.update",
+                            "data": {"event": "backtest.update", "data": {}}
+                        }],
+                        "last_event_id": 1704067200001
+                    }
+                }
+            }
+        }
+    }
+)
+async def poll_events(
+    after: Optional[int] = Query(None, description="`last_event_id` of the previous poll"),
+    timeout: Optional[float] = Query(None, gt=0, le=60, description="Seconds to wait for an event before returning empty"),
+    current_user: dict = Depends(get_event_user)
+):
+    """
+    Long-poll for backtest events.
+
+    Returns as soon as an event newer than `after` is available, or an empty
+    list once the timeout expires. Pass the returned `last_event_id` as `after`
+    on the next poll.
+    """
+    user_id = str(current_user['id'])
+    if after is None:
+        after = event_broker.latest_id(user_id)
+
+    events = await event_broker.wait(user_id, after, timeout=timeout or settings.EVENT_POLL_TIMEOUT)
+
+    return {
+        "events": [
+            {"id": event.id, "event": event.event, "data": json.loads(event.data)}
+            for event in events
+        ],
+        "last_event_id": events[-1].id if events else after
+    }
@@ -1,10 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from typing import List, Optional
 
-from src.db.base import get_db
+from src.db.loaders import get_request_loader
 from src.schemas.reports import ReportResponse
 from src.api.dependencies import get_current_user
-from src.db.queries.backtests import get_backtest_by_id, get_user_backtests
+from src.db.queries.backtests import get_backtest_by_id
+from src.db.queries.reports import get_user_reports
+from src.utils.pagination import encode_cursor, decode_cursor
 
 router = APIRouter(
     prefix="/v1/reports",
@@ -41,20 +43,38 @@ router = APIRouter(
     }
 )
 async def list_reports(
+    response: Response,
+    limit: int = Query(50, ge=1, le=200, description="Maximum number of reports to return"),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
     current_user: dict = Depends(get_current_user),
-    db = Depends(get_db)
+    db = Depends(get_request_loader)
 ) -> List[ReportResponse]:
     """
-    List all generated reports for the current user.
+    List generated reports for the current user, one page at a time.
     
     Returns only backtest requests that have completed report generation.
-    Reports are ordered by creation date (newest first).
+    Reports are ordered by creation date (newest first). When more results
+    are available the response carries an X-Next-Cursor header to pass as
+    `cursor` for the next page.
     """
-    backtests = get_user_backtests(db, current_user['id'])
-    return [
-        backtest for backtest in backtests 
-        if backtest['generated_report']
-    ]
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+    with db as conn:
+        # Fetch one extra row to know whether another page exists
+        reports = get_user_reports(conn, current_user['id'], limit=limit + 1, after=after)
+
+    if len(reports) > limit:
+        reports = reports[:limit]
+        last = reports[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last['created_at'], last['id'])
+
+    return reports
 
 @router.get(
     "/{backtest_id}",
@@ -85,7 +105,7 @@ async def list_reports(
 async def get_report(
     backtest_id: str,
     current_user: dict = Depends(get_current_user),
-    db = Depends(get_db)
+    db = Depends(get_request_loader)
 ) -> ReportResponse:
     """
     Get a specific report by backtest ID.
@@ -95,7 +115,8 @@ async def get_report(
     - The backtest belongs to another user
     - The report hasn't been generated yet
     """
-    backtest = get_backtest_by_id(db, backtest_id)
+    with db as conn:
+        backtest = get_backtest_by_id(conn, backtest_id)
     if not backtest or backtest['user_id'] != current_user['id']:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -0,0 +1,138 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Deque, List, Optional
+
+from src.config.settings import settings
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# High-volume events buffered apart from status events
+CHUNK_EVENTS = {"backtest.report.chunk"}
+
+@dataclass
+class Event:
+    id: int
+    event: str
+    data: str
+
+class UserEventStream:
+    """Ring buffers of recent events for one user plus a wake-up signal for waiters"""
+
+    def __init__(self, buffer_size: int, chunk_buffer_size: int):
+        self.events: Deque[Event] = deque(maxlen=buffer_size)
+        self.chunks: Deque[Event] = deque(maxlen=chunk_buffer_size)
+        self.changed = asyncio.Event()
+        self.last_seen = time.monotonic()
+
+    def after(self, last_event_id: int) -> List[Event]:
+        events = [event for event in self.events if event.id > last_event_id]
+        chunks = [event for event in self.chunks if event.id > last_event_id]
+        return sorted(events + chunks, key=lambda event: event.id) if chunks else events
+
+class EventBroker:
+    """
+    In-process fan-out of user events for the SSE and long-poll endpoints.
+
+    Fed by the same broadcasts as the WebSocket connection manager. Every user
+    gets a bounded ring buffer so clients can resume from their last event id
+    after a reconnect. Report chunks go to a second, separate ring buffer so
+    a streamed report cannot push status changes out of the first one. Event
+    ids are seeded from the wall clock, so ids issued after an API restart
+    are always larger than ids issued before it.
+    """
+
+    def __init__(self, buffer_size: int = 100, ttl: int = 3600, chunk_buffer_size: int = 50):
+        self.buffer_size = buffer_size
+        self.chunk_buffer_size = chunk_buffer_size
+        self.ttl = ttl
+        self.streams: "OrderedDict[str, UserEventStream]" = OrderedDict()
+        self.last_id = int(time.time() * 1000)
+
+    def _stream(self, user_id: str) -> UserEventStream:
+        user_id = str(user_id)
+        stream = self.streams.get(user_id)
+        if stream is None:
+            stream = UserEventStream(self.buffer_size, self.chunk_buffer_size)
+            self.streams[user_id] = stream
+        else:
+            self.streams.move_to_end(user_id)
+        stream.last_seen = time.monotonic()
+        self._evict()
+        return stream
+
+    def _evict(self):
+        """Drop buffers of users that have been idle for longer than the ttl"""
+        cutoff = time.monotonic() - self.ttl
+        while self.streams:
+            user_id, stream = next(iter(self.streams.items()))
+            if stream.last_seen >= cutoff:
+                break
+            self.streams.pop(user_id)
+
+    def publish(self, user_id: str, message: str) -> Event:
+        """Buffer a broadcast message and wake up everyone waiting on the user"""
+        try:
+            name = json.loads(message).get("event", "message")
+        except (ValueError, AttributeError):
+            name = "message"
+
+        self.last_id += 1
+        event = Event(id=self.last_id, event=name, data=message)
+
+        stream = self._stream(user_id)
+        (stream.chunks if name in CHUNK_EVENTS else stream.events).append(event)
+        stream.changed.set()
+        stream.changed = asyncio.Event()
+        return event
+
+    def latest_id(self, user_id: str) -> int:
+        """Id of the newest buffered event for the user, new subscribers start after it"""
+        stream = self._stream(user_id)
+        latest = [buffer[-1].id for buffer in (stream.events, stream.chunks) if buffer]
+        return max(latest) if latest else self.last_id
+
+    async def wait(self, user_id: str, last_event_id: int, timeout: float) -> List[Event]:
+        """
+        Return the user's events newer than `last_event_id`, waiting up to
+        `timeout` seconds for one to be published when there are none yet.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            stream = self._stream(user_id)
+            changed = stream.changed
+            events = stream.after(last_event_id)
+            if events:
+                return events
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return []
+            try:
+                await asyncio.wait_for(changed.wait(), timeout=remaining)
+            except asyncio.TimeoutError:
+                return []
+
+def format_sse(event: Event) -> str:
+    """Serialize an event in the text/event-stream wire format"""
+    lines = [f"id: {event.id}", f"event: {event.event}"]
+    lines.extend(f"data: {line}" for line in event.data.splitlines() or [""])
+    return "\n".join(lines) + "\n\n"
+
+def parse_event_id(value: Optional[str]) -> Optional[int]:
+    """Parse a Last-Event-ID value, ignoring anything that is not one of our ids"""
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+event_broker = EventBroker(
+    buffer_size=settings.EVENT_BUFFER_SIZE,
+    ttl=settings.EVENT_BUFFER_TTL,
+    chunk_buffer_size=settings.EVENT_CHUNK_BUFFER_SIZE
+)
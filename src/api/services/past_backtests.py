@@ -0,0 +1,105 @@
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from uuid import UUID
+
+from src.db.base import execute_query
+from src.db.redis import redis_client
+
+from src.utils.logger import get_logger
+logger = get_logger(__name__)
+
+# Per-user index of past backtests kept in Redis:
+#   past_backtests:{user_id}        sorted set of backtest ids scored by created_at
+#   past_backtests:{user_id}:names  hash of backtest id to strategy title
+#   past_backtests:{user_id}:ready  marker set once the index holds the full history
+PAST_BACKTESTS_TTL = 7 * 24 * 60 * 60
+
+THIS_WEEK_SECONDS = 7 * 24 * 60 * 60
+LAST_MONTH_SECONDS = 30 * 24 * 60 * 60
+
+def _index_key(user_id) -> str:
+    return f"past_backtests:{user_id}"
+
+def _names_key(user_id) -> str:
+    return f"past_backtests:{user_id}:names"
+
+def _ready_key(user_id) -> str:
+    return f"past_backtests:{user_id}:ready"
+
+def _write(user_id, entries: Dict[str, tuple], mark_ready: bool = False):
+    """Write (title, created_at timestamp) entries and refresh the index TTL"""
+    pipe = redis_client.pipeline()
+    scores = {backtest_id: created_at for backtest_id, (_, created_at) in entries.items()}
+    names = {backtest_id: name or "" for backtest_id, (name, _) in entries.items()}
+    if scores:
+        pipe.zadd(_index_key(user_id), scores)
+        pipe.hset(_names_key(user_id), mapping=names)
+    if mark_ready:
+        pipe.set(_ready_key(user_id), 1)
+    for key in (_index_key(user_id), _names_key(user_id), _ready_key(user_id)):
+        pipe.expire(key, PAST_BACKTESTS_TTL)
+    pipe.execute()
+
+def record_backtest(user_id: UUID, backtest_id: UUID, name: Optional[str], created_at: datetime):
+    """Add a new backtest to the user's index"""
+    try:
+        _write(user_id, {str(backtest_id): (name, created_at.timestamp())})
+    except Exception as e:
+        logger.warning(f"Failed to record past backtest {backtest_id}: {e}")
+
+def rename_backtest(user_id: UUID, backtest_id: UUID, name: str):
+    """Update the title of a backtest in the user's index"""
+    try:
+        pipe = redis_client.pipeline()
+        pipe.hset(_names_key(user_id), str(backtest_id), name)
+        pipe.expire(_names_key(user_id), PAST_BACKTESTS_TTL)
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"Failed to rename past backtest {backtest_id}: {e}")
+
+def _warm(conn, user_id: UUID):
+    """Load the user's full history into the index"""
+    rows = execute_query(
+        conn,
+        """
+        SELECT id, strategy_title, created_at
+        FROM backtest_requests
+        WHERE user_id = %s
+        """,
+        (user_id,)
+    ) or []
+    _write(
+        user_id,
+        {str(row['id']): (row['strategy_title'], row['created_at'].timestamp()) for row in rows},
+        mark_ready=True
+    )
+
+def get_grouped_past_backtests(conn, user_id: UUID, limit: int) -> dict:
+    """
+    Get the user's most recent backtests grouped into thisWeek, lastMonth
+    and older. Buckets are computed from the stored timestamps at read time,
+    so the index never needs rebucketing and a read costs O(limit).
+    """
+    if not redis_client.exists(_ready_key(user_id)):
+        _warm(conn, user_id)
+
+    entries = redis_client.zrevrange(_index_key(user_id), 0, limit - 1, withscores=True)
+    names = redis_client.hmget(_names_key(user_id), [backtest_id for backtest_id, _ in entries]) if entries else []
+
+    now = time.time()
+    grouped: Dict[str, List[dict]] = {"thisWeek": [], "lastMonth": [], "older": []}
+    for (backtest_id, created_at), name in zip(entries, names):
+        age = now - created_at
+        if age < THIS_WEEK_SECONDS:
+            group = "thisWeek"
+        elif age < LAST_MONTH_SECONDS:
+            group = "lastMonth"
+        else:
+            group = "older"
+        grouped[group].append({
+            "id": backtest_id,
+            "name": name or "",
+            "date": datetime.fromtimestamp(created_at, tz=timezone.utc).strftime('%Y-%m-%d')
+        })
+    return grouped
@@ -0,0 +1,80 @@
+import hashlib
+import re
+from typing import Dict, Optional
+
+import orjson
+
+from src.config.settings import settings
+from src.core.backtesting.executor import ENGINE_VERSION
+from src.core.backtesting.validator import normalized_script_hash
+from src.db.redis import redis_client
+
+from src.utils.logger import get_logger
+logger = get_logger(__name__)
+
+# Execution results of generated scripts are cached in Redis under
+#   backtest_result:{engine version}:{script hash}:{dataset hash}
+# for RESULT_CACHE_TTL seconds. An entry points at the S3 log (and report,
+# once generated) of the backtest that produced it and the headline stats
+# parsed from the log, so an identical script on identical data is not run again.
+STAT_LINE = re.compile(r"^\s*([A-Za-z][\w ()%/.-]*?)\s*[:=]\s*(-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?)\s*%?\s*$")
+# Only these are kept, scripts write free-form logs with many other numbers
+STAT_NAMES = {
+    "total_return",
+    "cagr",
+    "sharpe_ratio",
+    "sortino_ratio",
+    "max_drawdown",
+    "win_rate",
+    "profit_factor",
+    "num_trades",
+    "total_trades",
+    "final_equity",
+}
+
+def file_hash(path: str, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 of a file's content, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def result_cache_key(script: str, data_path: str) -> str:
+    return f"backtest_result:{ENGINE_VERSION}:{normalized_script_hash(script)}:{file_hash(data_path)}"
+
+def parse_log_stats(log: str) -> Dict[str, float]:
+    """Headline "name: value" lines of a backtest log, keyed by snake_cased name"""
+    stats = {}
+    for line in log.splitlines():
+        match = STAT_LINE.match(line)
+        if match:
+            name = re.sub(r"\W+", "_", match.group(1).strip().lower()).strip("_")
+            if name in STAT_NAMES:
+                stats.setdefault(name, float(match.group(2)))
+    return stats
+
+def get_cached_result(key: str) -> Optional[dict]:
+    """Cached {backtest_id, log_key, stats, report_key} entry, None on a miss"""
+    try:
+        body = redis_client.get(key)
+    except Exception as e:
+        logger.warning(f"Result cache unavailable: {e}")
+        return None
+    return orjson.loads(body) if body else None
+
+def _store(key: str, entry: dict):
+    try:
+        redis_client.set(key, orjson.dumps(entry), ex=settings.RESULT_CACHE_TTL)
+    except Exception as e:
+        logger.warning(f"Failed to cache execution result {key}: {e}")
+
+def store_result(key: str, backtest_id, log_key: str, stats: Dict[str, float]):
+    _store(key, {"backtest_id": str(backtest_id), "log_key": log_key, "stats": stats, "report_key": None})
+
+def store_report(key: str, report_key: str):
+    """Add the generated report to an existing entry"""
+    entry = get_cached_result(key)
+    if entry is not None and not entry.get("report_key"):
+        entry["report_key"] = report_key
+        _store(key, entry)
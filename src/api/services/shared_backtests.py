@@ -0,0 +1,81 @@
+import hashlib
+from threading import Lock
+from typing import Callable, Optional, Tuple
+
+import orjson
+from cachetools import TTLCache
+
+from src.config.settings import settings
+from src.db.redis import redis_client
+
+from src.utils.logger import get_logger
+logger = get_logger(__name__)
+
+# Public shared backtests are cached as ready-to-send JSON bodies:
+#   in process: share_id -> (body, etag) for SHARED_BACKTEST_LOCAL_TTL seconds
+#   in Redis:   shared_backtest:{share_id} for SHARED_BACKTEST_CACHE_TTL seconds
+# A share_id that does not resolve is cached as an empty body so unknown
+# links cannot be used to hammer the database.
+MISSING = b""
+
+_local_cache: TTLCache = TTLCache(
+    maxsize=settings.SHARED_BACKTEST_LOCAL_CACHE_SIZE,
+    ttl=settings.SHARED_BACKTEST_LOCAL_TTL
+)
+_local_lock = Lock()
+
+def _cache_key(share_id: str) -> str:
+    return f"shared_backtest:{share_id}"
+
+def _etag(body: bytes) -> str:
+    return f'"{hashlib.sha1(body).hexdigest()}"'
+
+def _remember(share_id: str, body: bytes) -> Tuple[bytes, str]:
+    entry = (body, _etag(body))
+    with _local_lock:
+        _local_cache[share_id] = entry
+    return entry
+
+def get_shared_backtest_body(share_id: str, load: Callable[[], Optional[dict]]) -> Optional[Tuple[bytes, str]]:
+    """
+    Get the JSON body and ETag of a shared backtest, or None if the link does
+    not exist. Looks in the process cache, then Redis, and only calls `load`
+    to read the database when both miss.
+    """
+    with _local_lock:
+        entry = _local_cache.get(share_id)
+    if entry is None:
+        body = None
+        try:
+            body = redis_client.get(_cache_key(share_id))
+        except Exception as e:
+            logger.warning(f"Shared backtest cache unavailable: {e}")
+
+        if body is None:
+            backtest = load()
+            body = orjson.dumps(backtest) if backtest else MISSING
+            try:
+                redis_client.set(
+                    _cache_key(share_id),
+                    body,
+                    ex=settings.SHARED_BACKTEST_CACHE_TTL if backtest else settings.SHARED_BACKTEST_MISSING_TTL
+                )
+            except Exception as e:
+                logger.warning(f"Failed to cache shared backtest {share_id}: {e}")
+        elif isinstance(body, str):
+            body = body.encode()
+
+        entry = _remember(share_id, body)
+
+    return None if entry[0] == MISSING else entry
+
+def invalidate_shared_backtest(share_id: Optional[str]):
+    """Drop a shared backtest from both caches after it is revoked or changed"""
+    if not share_id:
+        return
+    with _local_lock:
+        _local_cache.pop(share_id, None)
+    try:
+        redis_client.delete(_cache_key(share_id))
+    except Exception as e:
+        logger.warning(f"Failed to invalidate shared backtest {share_id}: {e}")
@@ -1,6 +1,7 @@
 from typing import Dict
 from fastapi import WebSocket
 
+from src.api.services.events import event_broker
 from src.utils.logger import get_logger
 logger = get_logger(__name__)
 
@@ -25,6 +26,9 @@ class ConnectionManager:
             logger.warning(f"User {user_id} was not connected. Cannot disconnect.")
 
     async def broadcast(self, user_id: str, message: str):
+        # Buffer for SSE and long-poll clients, whether or not a socket is open
+        event_broker.publish(user_id, message)
+
         # Check if the user is connected
         if user_id not in self.active_connections:
             logger.warning(f"User {user_id} is not connected. Cannot broadcast message.")
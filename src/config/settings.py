@@ -33,6 +33,94 @@ class Settings(BaseSettings):
     OPENAI_API_KEY: str
     OPENAI_MODEL: str
 
+    # LLM provider routing, routes are "operation=provider,provider;..."
+    # where the first provider is preferred and the rest are failovers
+    LLM_PROVIDER_ROUTES: str = (
+        "title_generation=openai,local;"
+        "script_generation=openai,local;"
+        "script_repair=openai,local;"
+        "spec_generation=openai,local;"
+        "report_generation=openai,local"
+    )
+    LLM_HEDGE_OPERATIONS: str = ""
+    LLM_HEDGE_DEFAULT_DELAY: float = 5.0
+    LLM_STATS_WINDOW: int = 100
+    LLM_MAX_ERROR_RATE: float = 0.5
+    # Healthy providers with a p95 latency above this multiple of the fastest one's are tried later
+    LLM_MAX_LATENCY_RATIO: float = 2.0
+
+    # Shared HTTP client pools
+    HTTP_MAX_CONNECTIONS: int = 20
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    HTTP_CONNECT_TIMEOUT: float = 5.0
+    HTTP_DEFAULT_TIMEOUT: float = 30.0
+
+    # Structured strategy specs run on the built-in engine, skipping script
+    # generation. The rule parser always runs, the LLM is only asked for a
+    # spec when the parser gives up and STRATEGY_SPEC_LLM_ENABLED is set
+    STRATEGY_SPEC_ENABLED: bool = True
+    STRATEGY_SPEC_LLM_ENABLED: bool = False
+
+    # Parameter sweeps, chunks hold at most SWEEP_CHUNK_CELLS combination-bars
+    # and run on SWEEP_MAX_WORKERS processes (0 uses every core)
+    SWEEP_MAX_COMBINATIONS: int = 500
+    SWEEP_CHUNK_CELLS: int = 5000000
+    SWEEP_MAX_WORKERS: int = 0
+    SWEEP_RANK_METRIC: str = "sharpe_ratio"
+
+    # Walk-forward windows run on a thread pool of WALK_FORWARD_MAX_WORKERS
+    # threads (0 uses every core)
+    WALK_FORWARD_MAX_WINDOWS: int = 100
+    WALK_FORWARD_MAX_WORKERS: int = 0
+
+    # Execution results of identical scripts on identical data are reused for
+    # RESULT_CACHE_TTL seconds
+    RESULT_CACHE_ENABLED: bool = True
+    RESULT_CACHE_TTL: int = 604800
+
+    # Static checks of generated scripts before they are uploaded and validated
+    SCRIPT_STATIC_VALIDATION_ENABLED: bool = True
+    # Failing generated scripts are sent back to the LLM with their error up to
+    # SCRIPT_REPAIR_MAX_ATTEMPTS times inside the same task (0 disables repairs)
+    SCRIPT_REPAIR_MAX_ATTEMPTS: int = 2
+
+    # Multi-instrument portfolio backtests
+    PORTFOLIO_MAX_SYMBOLS: int = 20
+
+    # Monte Carlo robustness analysis of in-process backtests. Paths are
+    # simulated in chunks of MONTE_CARLO_CHUNK_CELLS path-trades on
+    # MONTE_CARLO_MAX_WORKERS processes (0 uses every core), a path is ruined
+    # once it loses MONTE_CARLO_RUIN_LEVEL of its capital
+    MONTE_CARLO_ENABLED: bool = True
+    MONTE_CARLO_PATHS: int = 10000
+    MONTE_CARLO_METHOD: str = "bootstrap"
+    MONTE_CARLO_RUIN_LEVEL: float = 0.5
+    MONTE_CARLO_CHUNK_CELLS: int = 5000000
+    MONTE_CARLO_MAX_WORKERS: int = 0
+
+    # Report streaming
+    REPORT_STREAMING_ENABLED: bool = True
+    REPORT_STREAM_FLUSH_INTERVAL: float = 0.25
+
+    # Server-sent events and long-poll
+    EVENT_BUFFER_SIZE: int = 100
+    # Streamed report chunks get their own buffer so they never push out status events
+    EVENT_CHUNK_BUFFER_SIZE: int = 50
+    EVENT_BUFFER_TTL: int = 3600
+    EVENT_STREAM_KEEPALIVE: float = 15.0
+    EVENT_POLL_TIMEOUT: float = 25.0
+
+    # Bulk status polls return a watermark this many seconds behind the database
+    # clock, so updates still committing during a poll are reported by the next one
+    BACKTEST_STATUS_WATERMARK_LAG: float = 5.0
+
+    # Shared backtest link cache
+    SHARED_BACKTEST_CACHE_TTL: int = 300
+    SHARED_BACKTEST_MISSING_TTL: int = 60
+    SHARED_BACKTEST_LOCAL_TTL: int = 10
+    SHARED_BACKTEST_LOCAL_CACHE_SIZE: int = 10000
+
     # Local running llm model
     LOCAL_LLM_SERVER_URL: str
     LOCAL_LLM_MODEL_NAME: str
@@ -46,6 +134,9 @@ class Settings(BaseSettings):
     JWT_ALGORITHM: str = "HS256"
     JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
+    # Shared secret of the workers' postbacks to the internal broadcast routes
+    INTERNAL_API_TOKEN: str
+
     # Rate limiting
     ANONYMOUS_DAILY_LIMIT: int = 3
     AUTHENTICATED_DAILY_LIMIT: int = 5
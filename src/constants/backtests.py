@@ -13,3 +13,12 @@ BACKTEST_STATUS_EXECUTION_SUCCESSFUL = "execution_successful"
 BACKTEST_STATUS_REPORT_GENERATION_IN_PROGRESS = "report_generation_in_progress"
 BACKTEST_STATUS_REPORT_GENERATION_FAILED = "report_generation_failed"
 BACKTEST_STATUS_REPORT_GENERATION_SUCCESSFUL = "report_generation_successful"
+
+# Statuses after which a backtest no longer changes
+BACKTEST_TERMINAL_STATUSES = (
+    BACKTEST_STATUS_SCRIPT_GENERATION_FAILED,
+    BACKTEST_STATUS_VALIDATION_FAILED,
+    BACKTEST_STATUS_EXECUTION_FAILED,
+    BACKTEST_STATUS_REPORT_GENERATION_FAILED,
+    BACKTEST_STATUS_REPORT_GENERATION_SUCCESSFUL,
+)
@@ -5,7 +5,7 @@ from fastapi import HTTPException, status, Depends, Request
 from fastapi.security import OAuth2PasswordBearer
 
 from src.config.settings import settings
-from src.db.base import get_db, execute_query_single
+from src.db.loaders import RequestLoader, get_request_loader
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/token")
 
@@ -26,7 +26,11 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     )
     return encoded_jwt
 
-async def get_current_user(request: Request, token: str = Depends(oauth2_scheme)):
+async def get_current_user(
+    request: Request,
+    token: str = Depends(oauth2_scheme),
+    loader: RequestLoader = Depends(get_request_loader)
+):
     """Validate JWT token and return current user"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -46,20 +50,13 @@ async def get_current_user(request: Request, token: str = Depends(oauth2_scheme)
     except JWTError:
         raise credentials_exception
     
-    with get_db() as conn:
-        user = execute_query_single(
-            conn,
-            """
-            SELECT * 
-            FROM users 
-            WHERE id = %s
-            """,
-            (user_id,)
-        )
+    # Loads the plan limit and today's report count in the same round-trip,
+    # so the rate limit dependency does not need another query
+    context = loader.get_user_context(user_id)
         
-    if user is None:
+    if context is None:
         raise credentials_exception
-    return user
+    return context['user']
 
 async def get_current_active_user(current_user = Depends(get_current_user)):
     """Check if the current user is active"""
@@ -0,0 +1,334 @@
+"""
+Vectorized backtest engine.
+
+Works on NumPy arrays only: a price series and a signal array go in,
+positions, returns, equity, trades and summary statistics come out. Signals
+run along the last axis, so a 2-D signal array of shape (strategies, bars)
+backtests many strategies against the same prices in one pass.
+
+Conventions:
+    - signals[t] is the target position decided at the close of bar t
+      (1 long, -1 short, 0 flat). It is held from bar t + 1, so a signal
+      can never trade on the price that produced it.
+    - Stop-loss and take-profit are checked on closing prices. The bar that
+      breaches the level is held to its close and the position is flat from
+      the next bar until the signal changes.
+    - Fees and slippage are fractions of the traded notional, charged on the
+      bar where the exposure changes.
+"""
+import os
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Union
+
+import numpy as np
+
+ArrayLike = Union[np.ndarray, list, float]
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+SECONDS_PER_YEAR = 365.25 * 24 * 60 * 60
+
+# Part of the execution result cache key, bump whenever a change to the engine
+# can change the results of an existing script
+ENGINE_VERSION = "1"
+
+TRADE_DTYPE = np.dtype([
+    ("row", np.int64),
+    ("entry_index", np.int64),
+    ("exit_index", np.int64),
+    ("direction", np.int8),
+    ("entry_price", np.float64),
+    ("exit_price", np.float64),
+    ("return", np.float64),
+])
+
+@dataclass
+class BacktestConfig:
+    initial_capital: float = 100000.0
+    # Fraction of equity per position, a scalar or an array broadcastable
+    # to the signals for per-bar sizing (see volatility_position_size)
+    position_size: ArrayLike = 1.0
+    stop_loss: Optional[float] = None
+    take_profit: Optional[float] = None
+    fees: float = 0.0
+    slippage: float = 0.0
+    allow_short: bool = True
+    periods_per_year: float = 252.0
+
+@dataclass
+class BacktestResult:
+    positions: np.ndarray
+    exposure: np.ndarray
+    returns: np.ndarray
+    equity: np.ndarray
+    trades: np.ndarray
+    stats: Dict[str, Union[float, np.ndarray]] = field(default_factory=dict)
+
+def script_environment() -> Dict[str, str]:
+    """Environment for generated scripts, lets them import this engine as src.core.backtesting"""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [PROJECT_ROOT, env.get("PYTHONPATH")]))
+    return env
+
+def infer_periods_per_year(timestamps: np.ndarray) -> float:
+    """Bars per year implied by a datetime64 index, used to annualize stats"""
+    timestamps = np.asarray(timestamps, dtype="datetime64[ns]")
+    if timestamps.size < 2:
+        return 252.0
+    span = (timestamps[-1] - timestamps[0]) / np.timedelta64(1, "s")
+    if span <= 0:
+        return 252.0
+    return (timestamps.size - 1) / (span / SECONDS_PER_YEAR)
+
+def shift(values: np.ndarray, periods: int = 1, fill=0) -> np.ndarray:
+    """Shift along the last axis, filling the vacated bars"""
+    result = np.empty_like(values)
+    if periods > 0:
+        result[..., :periods] = fill
+        result[..., periods:] = values[..., :-periods]
+    elif periods < 0:
+        result[..., periods:] = fill
+        result[..., :periods] = values[..., -periods:]
+    else:
+        result[...] = values
+    return result
+
+def forward_fill(values: np.ndarray) -> np.ndarray:
+    """Forward fill NaNs along the last axis, leading NaNs stay NaN"""
+    values = np.asarray(values, dtype=np.float64)
+    index = np.where(np.isnan(values), 0, np.arange(values.shape[-1]))
+    np.maximum.accumulate(index, axis=-1, out=index)
+    return np.take_along_axis(values, index, axis=-1)
+
+def signals_from_entries_exits(
+    entries: np.ndarray,
+    exits: np.ndarray,
+    short_entries: Optional[np.ndarray] = None,
+    short_exits: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Turn boolean entry and exit events into a held signal array.
+
+    A long entry holds 1 until the next exit or short entry, a short entry
+    holds -1 until the next short exit or long entry. Entries win over exits
+    on the same bar.
+    """
+    entries = np.asarray(entries, dtype=bool)
+    exits = np.asarray(exits, dtype=bool)
+    state = np.full(np.broadcast_shapes(entries.shape, exits.shape), np.nan)
+    state[np.broadcast_to(exits, state.shape)] = 0.0
+    if short_entries is not None:
+        short_exits = np.zeros_like(entries) if short_exits is None else np.asarray(short_exits, dtype=bool)
+        state[np.broadcast_to(short_exits, state.shape)] = 0.0
+        state[np.broadcast_to(np.asarray(short_entries, dtype=bool), state.shape)] = -1.0
+    state[np.broadcast_to(entries, state.shape)] = 1.0
+    return np.nan_to_num(forward_fill(state), nan=0.0).astype(np.int8)
+
+def bar_returns(prices: np.ndarray) -> np.ndarray:
+    """Simple returns along the last axis, 0 for the first bar"""
+    prices = np.asarray(prices, dtype=np.float64)
+    previous = shift(prices, 1, fill=np.nan)
+    previous[..., 0] = prices[..., 0]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = prices / previous - 1.0
+    return np.nan_to_num(returns, nan=0.0, posinf=0.0, neginf=0.0)
+
+def volatility_position_size(
+    prices: np.ndarray,
+    target_volatility: float,
+    window: int = 20,
+    max_size: float = 1.0,
+    periods_per_year: float = 252.0
+) -> np.ndarray:
+    """
+    Per-bar position size that targets an annualized volatility, using the
+    rolling standard deviation of returns known at each bar's close.
+    """
+    returns = bar_returns(prices)
+    cumsum = np.cumsum(np.insert(returns, 0, 0.0, axis=-1), axis=-1)
+    cumsum_sq = np.cumsum(np.insert(returns ** 2, 0, 0.0, axis=-1), axis=-1)
+    count = np.minimum(np.arange(1, returns.shape[-1] + 1), window)
+    start = np.arange(returns.shape[-1] + 1)[1:] - count
+    end = np.arange(1, returns.shape[-1] + 1)
+    total = np.take(cumsum, end, axis=-1) - np.take(cumsum, start, axis=-1)
+    total_sq = np.take(cumsum_sq, end, axis=-1) - np.take(cumsum_sq, start, axis=-1)
+    variance = np.maximum(total_sq / count - (total / count) ** 2, 0.0)
+    volatility = np.sqrt(variance * periods_per_year)
+    with np.errstate(divide="ignore"):
+        size = np.where(volatility > 0, target_volatility / volatility, max_size)
+    # Size decided at the close of bar t applies to the position held from t + 1
+    return shift(np.clip(size, 0.0, max_size), 1, fill=0.0)
+
+def apply_stops(
+    prices: np.ndarray,
+    positions: np.ndarray,
+    stop_loss: Optional[float] = None,
+    take_profit: Optional[float] = None
+) -> np.ndarray:
+    """
+    Flatten positions after a stop-loss or take-profit level is breached.
+
+    Every run of identical non-zero positions is one trade entered at the
+    close before its first bar. Once the close crosses a level the position
+    is flat until the run ends, i.e. until the signal changes.
+    """
+    if stop_loss is None and take_profit is None:
+        return positions
+
+    length = positions.shape[-1]
+    index = np.arange(length)
+    previous = shift(positions, 1, fill=0)
+    starts = positions != previous
+    run_start = np.maximum.accumulate(np.where(starts, index, 0), axis=-1)
+
+    prices = np.broadcast_to(np.asarray(prices, dtype=np.float64), positions.shape)
+    entry_prices = np.take_along_axis(shift(prices, 1, fill=np.nan), run_start, axis=-1)
+    entry_prices = np.where(np.isnan(entry_prices), prices[..., :1], entry_prices)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        run_return = np.sign(positions) * (prices / entry_prices - 1.0)
+
+    hit = np.zeros(positions.shape, dtype=bool)
+    if stop_loss is not None:
+        hit |= run_return <= -abs(stop_loss)
+    if take_profit is not None:
+        hit |= run_return >= abs(take_profit)
+    hit &= positions != 0
+
+    # Position is dropped on bars after a hit within the same run
+    last_hit = np.maximum.accumulate(np.where(hit, index, -1), axis=-1)
+    stopped = shift(last_hit, 1, fill=-1) >= run_start
+    return np.where(stopped, 0, positions)
+
+def extract_trades(prices: np.ndarray, exposure: np.ndarray) -> np.ndarray:
+    """One record per run of identical non-zero exposure, rows index the leading axis of 2-D input"""
+    exposure = np.atleast_2d(exposure)
+    prices = np.broadcast_to(np.atleast_2d(np.asarray(prices, dtype=np.float64)), exposure.shape)
+    previous = shift(exposure, 1, fill=0)
+    following = shift(exposure, -1, fill=0)
+    active = exposure != 0
+    start_rows, start_bars = np.nonzero(active & (exposure != previous))
+    _, end_bars = np.nonzero(active & (exposure != following))
+
+    trades = np.empty(start_bars.size, dtype=TRADE_DTYPE)
+    trades["row"] = start_rows
+    trades["entry_index"] = start_bars
+    trades["exit_index"] = end_bars
+    trades["direction"] = np.sign(exposure[start_rows, start_bars])
+    # Entered at the close of the signal bar, exited at the close of the last bar held
+    trades["entry_price"] = prices[start_rows, np.maximum(start_bars - 1, 0)]
+    trades["exit_price"] = prices[start_rows, end_bars]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        trades["return"] = trades["direction"] * (trades["exit_price"] / trades["entry_price"] - 1.0)
+    return trades
+
+def compute_stats(
+    returns: np.ndarray,
+    equity: np.ndarray,
+    exposure: np.ndarray,
+    trades: np.ndarray,
+    initial_capital: float,
+    periods_per_year: float
+) -> Dict[str, Union[float, np.ndarray]]:
+    """Summary statistics along the last axis, scalars for 1-D results and arrays for 2-D"""
+    rows = int(np.prod(returns.shape[:-1])) if returns.ndim > 1 else 1
+    bars = returns.shape[-1]
+    years = max(bars / periods_per_year, 1e-9)
+
+    final_equity = equity[..., -1]
+    total_return = final_equity / initial_capital - 1.0
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        cagr = np.where(final_equity > 0, (final_equity / initial_capital) ** (1.0 / years) - 1.0, -1.0)
+
+    mean = returns.mean(axis=-1)
+    std = returns.std(axis=-1)
+    downside = np.sqrt(np.mean(np.minimum(returns, 0.0) ** 2, axis=-1))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = np.where(std > 0, mean / std * np.sqrt(periods_per_year), 0.0)
+        sortino = np.where(downside > 0, mean / downside * np.sqrt(periods_per_year), 0.0)
+
+    drawdown = equity / np.maximum.accumulate(equity, axis=-1) - 1.0
+    max_drawdown = drawdown.min(axis=-1)
+
+    trade_rows = trades["row"]
+    trade_returns = np.nan_to_num(trades["return"])
+    num_trades = np.bincount(trade_rows, minlength=rows)
+    wins = np.bincount(trade_rows, weights=(trade_returns > 0).astype(np.float64), minlength=rows)
+    gross_profit = np.bincount(trade_rows, weights=np.maximum(trade_returns, 0.0), minlength=rows)
+    gross_loss = np.bincount(trade_rows, weights=-np.minimum(trade_returns, 0.0), minlength=rows)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        win_rate = np.where(num_trades > 0, wins / num_trades, 0.0)
+        avg_trade_return = np.where(num_trades > 0, (gross_profit - gross_loss) / num_trades, 0.0)
+        profit_factor = np.where(gross_loss > 0, gross_profit / gross_loss, np.inf)
+    profit_factor = np.where((gross_loss == 0) & (gross_profit == 0), 0.0, profit_factor)
+
+    shape = returns.shape[:-1]
+    stats = {
+        "initial_capital": np.full(shape, initial_capital),
+        "final_equity": final_equity,
+        "total_return": total_return,
+        "cagr": cagr,
+        "annual_volatility": std * np.sqrt(periods_per_year),
+        "sharpe_ratio": sharpe,
+        "sortino_ratio": sortino,
+        "max_drawdown": max_drawdown,
+        "exposure_time": (exposure != 0).mean(axis=-1),
+        "num_trades": num_trades.reshape(shape),
+        "win_rate": win_rate.reshape(shape),
+        "avg_trade_return": avg_trade_return.reshape(shape),
+        "profit_factor": profit_factor.reshape(shape),
+    }
+    if not shape:
+        return {name: value.item() for name, value in stats.items()}
+    return stats
+
+def run_backtest(
+    prices: np.ndarray,
+    signals: np.ndarray,
+    config: Optional[BacktestConfig] = None
+) -> BacktestResult:
+    """
+    Backtest target-position signals against a price series.
+
+    prices has shape (bars,) or matches signals. signals has shape (bars,) or
+    (strategies, bars) with values in {-1, 0, 1}. Every output array has the
+    shape of signals, stats hold scalars for 1-D signals and one value per
+    strategy for 2-D signals.
+    """
+    config = config or BacktestConfig()
+    prices = np.asarray(prices, dtype=np.float64)
+    signals = np.sign(np.nan_to_num(np.asarray(signals, dtype=np.float64))).astype(np.int8)
+    if not config.allow_short:
+        signals = np.maximum(signals, 0)
+    if signals.ndim > 2:
+        raise ValueError("signals must be 1-D or 2-D")
+    if prices.shape[-1] != signals.shape[-1]:
+        raise ValueError(f"prices have {prices.shape[-1]} bars but signals have {signals.shape[-1]}")
+
+    # Trade on the next bar, never on the bar that produced the signal
+    positions = shift(signals, 1, fill=0)
+    positions = apply_stops(prices, positions, config.stop_loss, config.take_profit)
+
+    size = np.broadcast_to(np.asarray(config.position_size, dtype=np.float64), positions.shape)
+    exposure = positions * size
+    turnover = np.abs(exposure - shift(exposure, 1, fill=0.0))
+
+    returns = exposure * bar_returns(prices) - turnover * (config.fees + config.slippage)
+    equity = config.initial_capital * np.cumprod(1.0 + returns, axis=-1)
+
+    trades = extract_trades(prices, positions)
+    stats = compute_stats(
+        returns,
+        equity,
+        positions,
+        trades,
+        config.initial_capital,
+        config.periods_per_year
+    )
+    return BacktestResult(
+        positions=positions,
+        exposure=exposure,
+        returns=returns,
+        equity=equity,
+        trades=trades,
+        stats=stats
+    )
@@ -0,0 +1,499 @@
+"""
+Structured strategy specs.
+
+Most strategy descriptions are one of a few well known families: moving
+average crossovers, RSI thresholds, breakouts and Bollinger band reversions.
+Instead of generating, validating and executing a script for them, the
+description is turned into a compact StrategySpec (indicators, entry and exit
+conditions, exits and sizing) which is run in-process on the vectorized
+engine in executor.py.
+
+A spec comes from parse_strategy_description, a conservative rule parser that
+only accepts descriptions it fully understands, or optionally from the LLM.
+Anything else returns None and goes through script generation as before.
+"""
+import re
+from typing import Dict, List, Literal, Optional, Union
+
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel, Field, ValidationError, model_validator
+
+from src.core.backtesting.executor import (
+    BacktestConfig,
+    BacktestResult,
+    run_backtest,
+    shift,
+    signals_from_entries_exits
+)
+
+from src.utils.logger import get_logger
+logger = get_logger(__name__)
+
+PRICE = "price"
+
+IndicatorKind = Literal[
+    "sma",
+    "ema",
+    "rsi",
+    "bollinger_middle",
+    "bollinger_upper",
+    "bollinger_lower",
+    "highest",
+    "lowest",
+]
+
+class IndicatorSpec(BaseModel):
+    name: str = Field(..., pattern=r"^[a-z][a-z0-9_]*$", max_length=32)
+    kind: IndicatorKind
+    window: int = Field(20, ge=1, le=5000)
+    num_std: float = Field(2.0, gt=0, le=10)
+
+class ConditionSpec(BaseModel):
+    left: str = Field(..., description="'price' or an indicator name")
+    op: Literal["above", "below", "crosses_above", "crosses_below"]
+    right: Union[float, str] = Field(..., description="A constant, 'price' or an indicator name")
+
+class StrategySpec(BaseModel):
+    indicators: List[IndicatorSpec] = Field(default_factory=list, max_length=10)
+    # Every entry condition has to hold, any exit condition closes the position.
+    # Without exit conditions the position is held while the entry conditions hold.
+    entry: List[ConditionSpec] = Field(..., min_length=1, max_length=5)
+    exit: List[ConditionSpec] = Field(default_factory=list, max_length=5)
+    direction: Literal["long", "short"] = "long"
+    position_size: float = Field(1.0, gt=0, le=1)
+    stop_loss: Optional[float] = Field(None, gt=0, lt=1)
+    take_profit: Optional[float] = Field(None, gt=0)
+    fees: float = Field(0.0, ge=0, lt=0.1)
+    initial_capital: float = Field(100000.0, gt=0)
+
+    @model_validator(mode="after")
+    def check_references(self) -> "StrategySpec":
+        names = [indicator.name for indicator in self.indicators]
+        if len(set(names)) != len(names) or PRICE in names:
+            raise ValueError("Indicator names must be unique and cannot be 'price'")
+        known = set(names) | {PRICE}
+        for condition in self.entry + self.exit:
+            operands = [condition.left]
+            if isinstance(condition.right, str):
+                operands.append(condition.right)
+            for operand in operands:
+                if operand not in known:
+                    raise ValueError(f"Unknown operand '{operand}' in condition")
+        return self
+
+    def warmup(self) -> int:
+        """Bars before every indicator has a value"""
+        return max([indicator.window for indicator in self.indicators], default=0)
+
+# Indicators, computed along the last axis so 1-D and 2-D price arrays both work
+
+def _frame(values: np.ndarray) -> pd.DataFrame:
+    return pd.DataFrame(np.atleast_2d(values).T)
+
+def _unframe(frame: pd.DataFrame, like: np.ndarray) -> np.ndarray:
+    return frame.to_numpy(dtype=np.float64).T.reshape(like.shape)
+
+def sma(values: np.ndarray, window: int) -> np.ndarray:
+    """Simple moving average, NaN until the window is full"""
+    values = np.asarray(values, dtype=np.float64)
+    cumsum = np.cumsum(np.insert(values, 0, 0.0, axis=-1), axis=-1)
+    result = np.full(values.shape, np.nan)
+    if window <= values.shape[-1]:
+        result[..., window - 1:] = (cumsum[..., window:] - cumsum[..., :-window]) / window
+    return result
+
+def ema(values: np.ndarray, window: int) -> np.ndarray:
+    """Exponential moving average with span `window`, NaN until the window is full"""
+    values = np.asarray(values, dtype=np.float64)
+    return _unframe(_frame(values).ewm(span=window, adjust=False, min_periods=window).mean(), values)
+
+def rolling_std(values: np.ndarray, window: int) -> np.ndarray:
+    values = np.asarray(values, dtype=np.float64)
+    return _unframe(_frame(values).rolling(window).std(ddof=0), values)
+
+def rsi(values: np.ndarray, window: int = 14) -> np.ndarray:
+    """Relative strength index with Wilder's smoothing"""
+    values = np.asarray(values, dtype=np.float64)
+    delta = np.diff(values, axis=-1, prepend=np.take(values, [0], axis=-1))
+    gains = _frame(np.maximum(delta, 0.0)).ewm(alpha=1.0 / window, adjust=False, min_periods=window + 1).mean()
+    losses = _frame(-np.minimum(delta, 0.0)).ewm(alpha=1.0 / window, adjust=False, min_periods=window + 1).mean()
+    gains, losses = _unframe(gains, values), _unframe(losses, values)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result = 100.0 - 100.0 / (1.0 + gains / losses)
+    return np.where((losses == 0) & ~np.isnan(gains), 100.0, result)
+
+def highest(values: np.ndarray, window: int) -> np.ndarray:
+    """Highest value of the previous `window` bars, excluding the current one"""
+    values = np.asarray(values, dtype=np.float64)
+    rolled = _unframe(_frame(values).rolling(window).max(), values)
+    return shift(rolled, 1, fill=np.nan)
+
+def lowest(values: np.ndarray, window: int) -> np.ndarray:
+    """Lowest value of the previous `window` bars, excluding the current one"""
+    values = np.asarray(values, dtype=np.float64)
+    rolled = _unframe(_frame(values).rolling(window).min(), values)
+    return shift(rolled, 1, fill=np.nan)
+
+def compute_indicator(indicator: IndicatorSpec, prices: np.ndarray) -> np.ndarray:
+    if indicator.kind == "sma":
+        return sma(prices, indicator.window)
+    if indicator.kind == "ema":
+        return ema(prices, indicator.window)
+    if indicator.kind == "rsi":
+        return rsi(prices, indicator.window)
+    if indicator.kind == "highest":
+        return highest(prices, indicator.window)
+    if indicator.kind == "lowest":
+        return lowest(prices, indicator.window)
+
+    middle = sma(prices, indicator.window)
+    if indicator.kind == "bollinger_middle":
+        return middle
+    band = indicator.num_std * rolling_std(prices, indicator.window)
+    return middle + band if indicator.kind == "bollinger_upper" else middle - band
+
+def compute_indicators(
+    spec: StrategySpec,
+    prices: np.ndarray,
+    cache: Optional[Dict[tuple, np.ndarray]] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Indicator values by name. A cache shared across specs run on the same
+    prices computes every distinct indicator only once, e.g. over a grid.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    cache = {} if cache is None else cache
+    values = {PRICE: prices}
+    for indicator in spec.indicators:
+        key = (indicator.kind, indicator.window, indicator.num_std)
+        if key not in cache:
+            cache[key] = compute_indicator(indicator, prices)
+        values[indicator.name] = cache[key]
+    return values
+
+def evaluate_condition(condition: ConditionSpec, values: Dict[str, np.ndarray]) -> np.ndarray:
+    """Boolean array of the bars where the condition holds, bars with missing values never do"""
+    left = values[condition.left]
+    right = values[condition.right] if isinstance(condition.right, str) else np.float64(condition.right)
+    right = np.broadcast_to(right, left.shape)
+    with np.errstate(invalid="ignore"):
+        if condition.op == "above":
+            return left > right
+        if condition.op == "below":
+            return left < right
+        previous_left = shift(left, 1, fill=np.nan)
+        previous_right = shift(np.array(right), 1, fill=np.nan)
+        if condition.op == "crosses_above":
+            return (left > right) & (previous_left <= previous_right)
+        return (left < right) & (previous_left >= previous_right)
+
+def build_signals(
+    spec: StrategySpec,
+    prices: np.ndarray,
+    cache: Optional[Dict[tuple, np.ndarray]] = None
+) -> np.ndarray:
+    """Target position per bar (1, -1 or 0) for the spec"""
+    values = compute_indicators(spec, prices, cache)
+    entries = np.logical_and.reduce([evaluate_condition(c, values) for c in spec.entry])
+    side = 1 if spec.direction == "long" else -1
+    if not spec.exit:
+        return (entries * side).astype(np.int8)
+
+    exits = np.logical_or.reduce([evaluate_condition(c, values) for c in spec.exit])
+    if side == 1:
+        return signals_from_entries_exits(entries, exits)
+    no_events = np.zeros_like(entries)
+    return signals_from_entries_exits(no_events, no_events, short_entries=entries, short_exits=exits)
+
+def backtest_config(spec: StrategySpec, periods_per_year: float = 252.0) -> BacktestConfig:
+    return BacktestConfig(
+        initial_capital=spec.initial_capital,
+        position_size=spec.position_size,
+        stop_loss=spec.stop_loss,
+        take_profit=spec.take_profit,
+        fees=spec.fees,
+        allow_short=spec.direction == "short",
+        periods_per_year=periods_per_year
+    )
+
+def run_strategy_spec(
+    spec: StrategySpec,
+    prices: np.ndarray,
+    periods_per_year: float = 252.0
+) -> BacktestResult:
+    """Backtest a spec on the vectorized engine"""
+    prices = np.asarray(prices, dtype=np.float64)
+    return run_backtest(prices, build_signals(spec, prices), backtest_config(spec, periods_per_year))
+
+# Rule parser
+
+NUMBER = r"(\d+(?:\.\d+)?)"
+PERIOD = r"\s*[- ]?\s*(?:day|period|bar|candle|session)?s?\s*[- ]?\s*"
+
+# Anything the families below cannot express, the description goes to the LLM
+UNSUPPORTED_PATTERN = re.compile(
+    r"\b(volume|vwap|macd|stochastic|atr|adx|obv|ichimoku|fibonacci|pivot|trailing|"
+    r"news|sentiment|earnings|options?|hedge|pairs?|spread|gaps?|candlestick|pattern|"
+    r"divergence|weekly|monthly|hour|hours|minutes?|time of day|open(?:ing)? price|"
+    r"martingale|pyramid\w*|scale in|average down|dca)\b"
+)
+MA_PATTERN = re.compile(
+    r"(\d+)" + PERIOD + r"(sma|ema|simple moving average|exponential moving average|moving average|ma)\b"
+    r"|\b(sma|ema)\s*\(?\s*(\d+)\)?"
+)
+RSI_PATTERN = re.compile(r"\brsi\b|relative strength")
+BREAKOUT_PATTERN = re.compile(r"breakout|break(?:s|ing)? (?:out )?(?:above|below)|donchian|" + r"\d+" + PERIOD + r"(?:high|low)s?\b")
+BOLLINGER_PATTERN = re.compile(r"bollinger")
+SHORT_PATTERN = re.compile(r"\b(?:go|going|sell|enter(?: a)?|open(?: a)?) short\b|\bshort (?:when|if|on|the)\b|\bshort[- ]only\b")
+LONG_PATTERN = re.compile(r"\bbuy\b|\bgo(?:ing)? long\b|\blong (?:when|if|on)\b")
+
+def _find_number(patterns: List[str], text: str) -> Optional[float]:
+    for pattern in patterns:
+        match = re.search(pattern, text)
+        if match:
+            return float(match.group(1))
+    return None
+
+def _percent(value: Optional[float]) -> Optional[float]:
+    return None if value is None else value / 100.0
+
+def _moving_averages(text: str) -> List[tuple]:
+    averages = []
+    for match in MA_PATTERN.finditer(text):
+        if match.group(1):
+            window, name = int(match.group(1)), match.group(2)
+        else:
+            window, name = int(match.group(4)), match.group(3)
+        kind = "ema" if name.startswith(("ema", "exponential")) else "sma"
+        if (window, kind) not in averages:
+            averages.append((window, kind))
+    return averages
+
+# Start of the exit clause of a long and of a short strategy
+EXIT_PATTERN = re.compile(r"\b(?:sell(?! short)|exit|exits|get out|close (?:the |my |a )?(?:position|trade|long))\b")
+SHORT_EXIT_PATTERN = re.compile(r"\b(?:cover|buy (?:back|to cover)|exit|exits|get out|close (?:the |my |a )?(?:position|trade|short))\b")
+# Words an exit clause may use besides its family's words, anything else
+# means an exit the parser does not understand
+EXIT_WORDS = {
+    "sell", "exit", "exits", "cover", "buy", "back", "get", "out", "close", "the", "a", "an", "my",
+    "position", "positions", "trade", "trades", "it", "its", "when", "if", "once", "on", "as", "soon",
+    "then", "and", "or", "long", "short", "of", "is", "goes", "go", "moves", "move", "all", "to",
+    "with", "at", "using", "use", "plus", "per",
+}
+PERIOD_WORDS = {"day", "days", "period", "periods", "bar", "bars", "candle", "candles", "session", "sessions", "d"}
+DOWN_WORDS = {"below", "under"}
+UP_WORDS = {"above", "over"}
+RISK_PATTERNS = {
+    "stop_loss": [r"stop[- ]?loss(?: of| at)?\s*" + NUMBER + r"\s*%", NUMBER + r"\s*%\s*stop[- ]?loss"],
+    "take_profit": [r"(?:take[- ]?profit|profit target|target)(?: of| at)?\s*" + NUMBER + r"\s*%", NUMBER + r"\s*%\s*(?:take[- ]?profit|profit target)"],
+    "position_size": [NUMBER + r"\s*% of (?:the |my )?(?:portfolio|capital|equity|account)"],
+    "fees": [r"(?:fees?|commission|brokerage)(?: of)?\s*" + NUMBER + r"\s*%", NUMBER + r"\s*%\s*(?:fees?|commission|brokerage)"],
+    "initial_capital": [r"(?:capital|starting with|start with|initial investment)(?: of)?\s*(?:₹|rs\.?|inr|\$)?\s*(\d+)\b(?!\s*%)"],
+}
+
+def _split_exit(text: str, short: bool) -> tuple:
+    """(entry, exit) parts of the text, the exit part is every sentence tail from an exit verb on"""
+    entry, exit = [], []
+    for sentence in re.split(r"\.(?!\d)", text):
+        match = (SHORT_EXIT_PATTERN if short else EXIT_PATTERN).search(sentence)
+        if match:
+            entry.append(sentence[:match.start()])
+            exit.append(sentence[match.start():])
+        else:
+            entry.append(sentence)
+    return " ".join(entry), " ".join(exit).strip()
+
+def _exit_understood(clause: str, words: set, numbers: set) -> bool:
+    """Whether every word and number of the exit clause, risk settings aside, belongs to the family's exit"""
+    for patterns in RISK_PATTERNS.values():
+        for pattern in patterns:
+            clause = re.sub(pattern, " ", clause)
+    for token in re.findall(r"\d+(?:\.\d+)?|[a-z]+", clause):
+        if token[0].isdigit():
+            if float(token) not in numbers:
+                return False
+        elif token not in EXIT_WORDS and token not in words:
+            return False
+    return True
+
+def _moving_average_spec(text: str, entry_text: str, exit_text: str, short: bool) -> Optional[dict]:
+    averages = _moving_averages(text)
+    if "cross" not in text:
+        return None
+    # The only exit understood is the reverse cross, stated explicitly
+    words = {
+        "cross", "crosses", "crossed", "crossing", "falls", "drops", "rises", "fast", "slow", "faster",
+        "slower", "shorter", "longer", "average", "averages", "moving", "sma", "ema", "simple",
+        "exponential", "ma", "one",
+    } | PERIOD_WORDS | (UP_WORDS if short else DOWN_WORDS)
+    if len(averages) == 1:
+        words |= {"price", "closes"}
+    numbers = {float(window) for window, _ in averages}
+    direction = UP_WORDS if short else DOWN_WORDS
+    if not direction & set(exit_text.split()) or not _exit_understood(exit_text, words, numbers):
+        return None
+    up, down = ("crosses_below", "crosses_above") if short else ("crosses_above", "crosses_below")
+    if len(averages) == 1:
+        # Price crossing a single average
+        (window, kind), = averages
+        return {
+            "indicators": [{"name": "average", "kind": kind, "window": window}],
+            "entry": [{"left": PRICE, "op": up, "right": "average"}],
+            "exit": [{"left": PRICE, "op": down, "right": "average"}],
+        }
+    if len(averages) != 2 or averages[0][0] == averages[1][0]:
+        return None
+    (fast_window, fast_kind), (slow_window, slow_kind) = sorted(averages)
+    return {
+        "indicators": [
+            {"name": "fast", "kind": fast_kind, "window": fast_window},
+            {"name": "slow", "kind": slow_kind, "window": slow_window},
+        ],
+        "entry": [{"left": "fast", "op": up, "right": "slow"}],
+        "exit": [{"left": "fast", "op": down, "right": "slow"}],
+    }
+
+def _rsi_spec(text: str, entry_text: str, exit_text: str, short: bool) -> Optional[dict]:
+    window = _find_number([r"(\d+)" + PERIOD + r"rsi\b", r"\brsi\s*\(?\s*(\d+)\s*\)?(?!\s*(?:and|or|%))"], text)
+    # Long strategies enter on the lower threshold and exit on the upper one, short ones the other way round
+    lower_text, upper_text = (exit_text, entry_text) if short else (entry_text, exit_text)
+    lower = _find_number([r"(?:\bbelow|\bunder|<|\bfalls? to|\bdrops? to)\s*" + NUMBER, r"oversold (?:at|level of|level)?\s*" + NUMBER], lower_text)
+    upper = _find_number([r"(?:\babove|\bover|>|\brises? to|\breaches)\s*" + NUMBER, r"overbought (?:at|level of|level)?\s*" + NUMBER], upper_text)
+    lower = lower if lower is not None else (30.0 if "oversold" in lower_text else None)
+    upper = upper if upper is not None else (70.0 if "overbought" in upper_text else None)
+    if lower is None or upper is None or not 0 < lower < upper < 100:
+        return None
+    window = int(window) if window and 1 < window < 200 else 14
+    words = {
+        "rsi", "relative", "strength", "index", "rises", "rise", "falls", "drops", "reaches", "reach",
+        "crosses", "cross", "overbought", "oversold", "level", "levels", "gets", "hits", "exceeds",
+    } | (DOWN_WORDS if short else UP_WORDS)
+    if not _exit_understood(exit_text, words, {float(window), lower if short else upper}):
+        return None
+    oversold = {"left": "rsi", "op": "below", "right": lower}
+    overbought = {"left": "rsi", "op": "above", "right": upper}
+    return {
+        "indicators": [{"name": "rsi", "kind": "rsi", "window": window}],
+        "entry": [overbought if short else oversold],
+        "exit": [oversold if short else overbought],
+    }
+
+def _breakout_spec(text: str, entry_text: str, exit_text: str, short: bool) -> Optional[dict]:
+    high = [r"(\d+)" + PERIOD + r"highs?\b", r"donchian[^0-9]*(\d+)"]
+    low = [r"(\d+)" + PERIOD + r"lows?\b"]
+    entry_window = _find_number(low if short else high, entry_text)
+    exit_window = _find_number(high if short else low, exit_text)
+    if exit_window is None:
+        return None
+    words = {
+        "price", "closes", "falls", "drops", "rises", "breaks", "break", "crosses", "cross", "lowest", "highest",
+        "low", "lows", "high", "highs", "donchian", "channel",
+    } | PERIOD_WORDS | (UP_WORDS if short else DOWN_WORDS)
+    words -= {"low", "lows", "lowest"} if short else {"high", "highs", "highest"}
+    if not _exit_understood(exit_text, words, {exit_window}):
+        return None
+    entry_window = int(entry_window or 20)
+    breakout = {"name": "breakout_level", "kind": "lowest" if short else "highest", "window": entry_window}
+    stop = {"name": "exit_level", "kind": "highest" if short else "lowest", "window": int(exit_window)}
+    return {
+        "indicators": [breakout, stop],
+        "entry": [{"left": PRICE, "op": "below" if short else "above", "right": "breakout_level"}],
+        "exit": [{"left": PRICE, "op": "above" if short else "below", "right": "exit_level"}],
+    }
+
+def _bollinger_spec(text: str, entry_text: str, exit_text: str, short: bool) -> Optional[dict]:
+    window = _find_number([r"bollinger bands?\s*\(?\s*(\d+)", r"(\d+)" + PERIOD + r"bollinger"], text)
+    num_std = _find_number([NUMBER + r"\s*(?:standard deviations?|std\.?|sd|sigma)"], text)
+    window = int(window) if window and window > 1 else 20
+    num_std = num_std if num_std and 0 < num_std <= 5 else 2.0
+    words = {
+        "price", "closes", "crosses", "cross", "reaches", "reach", "returns", "return", "reverts", "touches",
+        "touch", "hits", "hit", "rises", "falls", "drops", "middle", "mid", "center", "centre", "basis",
+        "band", "bands", "bollinger", "line", "moving", "average",
+    } | PERIOD_WORDS | (DOWN_WORDS if short else UP_WORDS)
+    middle = {"middle", "mid", "center", "centre", "basis", "average"}
+    if not middle & set(exit_text.split()) or not _exit_understood(exit_text, words, {float(window)}):
+        return None
+    band = "upper" if short else "lower"
+    return {
+        "indicators": [
+            {"name": "middle", "kind": "bollinger_middle", "window": window},
+            {"name": band, "kind": f"bollinger_{band}", "window": window, "num_std": num_std},
+        ],
+        "entry": [{"left": PRICE, "op": "above" if short else "below", "right": band}],
+        "exit": [{"left": PRICE, "op": "below" if short else "above", "right": "middle"}],
+    }
+
+def _risk_settings(text: str) -> dict:
+    settings = {key: _find_number(patterns, text) for key, patterns in RISK_PATTERNS.items()}
+    for key in ("stop_loss", "take_profit", "position_size", "fees"):
+        settings[key] = _percent(settings[key])
+    return {key: value for key, value in settings.items() if value is not None}
+
+def parse_strategy_description(description: str) -> Optional[StrategySpec]:
+    """
+    Rule-based spec for descriptions that clearly belong to exactly one known
+    family and state an exit the family understands. Returns None for anything
+    ambiguous or outside the families so the description falls back to script
+    generation.
+    """
+    text = " ".join(description.lower().replace(",", "").split())
+    if UNSUPPORTED_PATTERN.search(text):
+        return None
+
+    families = {
+        "bollinger": bool(BOLLINGER_PATTERN.search(text)),
+        "rsi": bool(RSI_PATTERN.search(text)),
+        "moving_average": bool(_moving_averages(text)) or "moving average" in text,
+        "breakout": bool(BREAKOUT_PATTERN.search(text)),
+    }
+    matched = [family for family, found in families.items() if found]
+    if len(matched) != 1:
+        return None
+
+    short = bool(SHORT_PATTERN.search(text))
+    if short and LONG_PATTERN.search(text):
+        # Long and short legs, more than one family can express
+        return None
+    builders = {
+        "bollinger": _bollinger_spec,
+        "rsi": _rsi_spec,
+        "moving_average": _moving_average_spec,
+        "breakout": _breakout_spec,
+    }
+    # Exits are never made up, a description without an exit the family
+    # understands falls back as well
+    entry_text, exit_text = _split_exit(text, short)
+    if not exit_text:
+        return None
+    spec = builders[matched[0]](text, entry_text, exit_text, short)
+    if spec is None:
+        return None
+
+    spec.update(_risk_settings(text))
+    spec["direction"] = "short" if short else "long"
+    try:
+        return StrategySpec.model_validate(spec)
+    except ValidationError as e:
+        logger.info(f"Parsed strategy spec rejected: {e}")
+        return None
+
+async def generate_strategy_spec(strategy_description: str, use_llm: bool = False) -> Optional[StrategySpec]:
+    """
+    Spec for a description from the rule parser, or from the LLM when enabled
+    and the parser gives up. None means the strategy needs a generated script.
+    """
+    spec = parse_strategy_description(strategy_description)
+    if spec is not None or not use_llm:
+        return spec
+
+    from src.infrastructure.llm.router import llm_router
+    try:
+        content = await llm_router.generate_strategy_spec(strategy_description)
+        if not content or not content.get("spec"):
+            return None
+        return StrategySpec.model_validate(content["spec"])
+    except Exception as e:
+        logger.warning(f"LLM strategy spec rejected, falling back to script generation: {e}")
+        return None
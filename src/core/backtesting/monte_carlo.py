@@ -0,0 +1,155 @@
+"""
+Monte Carlo robustness analysis over trade returns.
+
+A backtest is one path through its trades. Resampling the trade returns,
+with replacement (bootstrap) or as random permutations (shuffle), gives many
+alternative paths and with them distributions of the maximum drawdown, CAGR
+and total return, and the probability of ruin. Portfolios, whose sleeves
+trade at the same time, resample the returns of consecutive blocks of their
+equity curve instead.
+
+Paths are simulated as 2-D (paths, trades) arrays in chunks of at most
+chunk_cells values. Chunks run on a process pool when there is more than one,
+each with its own independent random stream.
+"""
+from dataclasses import dataclass
+from typing import Dict, Literal, Optional
+
+import numpy as np
+
+from src.core.backtesting.executor import BacktestResult
+from src.core.backtesting.parallel import map_chunks
+
+from src.utils.logger import get_logger
+logger = get_logger(__name__)
+
+Method = Literal["bootstrap", "shuffle"]
+PERCENTILES = (5, 25, 50, 75, 95)
+# Logged in place of the summary when a backtest has no returns to resample
+NOT_RUN_SUMMARY = "Monte Carlo: not run, script-generated backtests do not expose per-trade returns\n"
+
+@dataclass
+class MonteCarloResult:
+    method: str
+    paths: int
+    trades: int
+    ruin_level: float
+    total_return: np.ndarray
+    cagr: np.ndarray
+    max_drawdown: np.ndarray
+    ruined: np.ndarray
+    unit: str = "trades"
+
+    @property
+    def ruin_probability(self) -> float:
+        return float(self.ruined.mean())
+
+    @property
+    def loss_probability(self) -> float:
+        return float((self.total_return < 0).mean())
+
+    def percentiles(self) -> Dict[str, Dict[int, float]]:
+        return {
+            name: dict(zip(PERCENTILES, np.percentile(getattr(self, name), PERCENTILES)))
+            for name in ("total_return", "cagr", "max_drawdown")
+        }
+
+def trade_equity_returns(result: BacktestResult, initial_capital: float) -> np.ndarray:
+    """
+    Return of the account over each trade of a 1-D result, from the equity
+    before entry to the equity after the bar that closes the position, so
+    sizing and both fees are included. A reversal's closing bar belongs to
+    the trade it opens.
+    """
+    trades = result.trades
+    before = np.concatenate([[initial_capital], result.equity])
+    closing = np.minimum(trades["exit_index"] + 1, result.equity.size - 1)
+    reversed_ = np.append(trades["entry_index"][1:] == trades["exit_index"][:-1] + 1, False)
+    closing = np.where(reversed_, trades["exit_index"], closing)
+    return before[closing + 1] / before[trades["entry_index"]] - 1.0
+
+def period_equity_returns(equity: np.ndarray, initial_capital: float, period: int) -> np.ndarray:
+    """Return of the equity curve over consecutive blocks of `period` bars, the last one may be shorter"""
+    before = np.concatenate([[initial_capital], equity])
+    ends = np.append(np.arange(period, equity.size, period), equity.size)
+    return before[ends] / before[ends - np.diff(np.concatenate([[0], ends]))] - 1.0
+
+def simulate_paths(
+    trade_returns: np.ndarray,
+    paths: int,
+    method: Method,
+    years: float,
+    ruin_level: float,
+    seed
+) -> Dict[str, np.ndarray]:
+    """Total return, CAGR, maximum drawdown and ruin of `paths` resampled paths"""
+    rng = np.random.default_rng(seed)
+    count = trade_returns.size
+    if method == "bootstrap":
+        sampled = trade_returns[rng.integers(0, count, size=(paths, count))]
+    else:
+        sampled = trade_returns[np.argsort(rng.random((paths, count)), axis=1)]
+
+    equity = np.cumprod(1.0 + sampled, axis=1)
+    peaks = np.maximum(np.maximum.accumulate(equity, axis=1), 1.0)
+    max_drawdown = np.minimum((equity / peaks - 1.0).min(axis=1), 0.0)
+    final = equity[:, -1]
+    with np.errstate(invalid="ignore"):
+        cagr = np.where(final > 0, np.power(np.maximum(final, 0.0), 1.0 / years) - 1.0, -1.0)
+    return {
+        "total_return": final - 1.0,
+        "cagr": cagr,
+        "max_drawdown": max_drawdown,
+        "ruined": equity.min(axis=1) <= 1.0 - ruin_level,
+    }
+
+def _simulate_chunk(arguments: tuple) -> Dict[str, np.ndarray]:
+    return simulate_paths(*arguments)
+
+def run_monte_carlo(
+    trade_returns: np.ndarray,
+    years: float,
+    paths: int = 10000,
+    method: Method = "bootstrap",
+    ruin_level: float = 0.5,
+    chunk_cells: int = 5_000_000,
+    max_workers: Optional[int] = None,
+    seed: Optional[int] = None,
+    unit: str = "trades"
+) -> Optional[MonteCarloResult]:
+    """
+    Simulate `paths` resampled trade sequences. ruin_level is the fraction
+    of capital whose loss at any point of a path counts as ruin. `unit` names
+    what a return covers in the summary. Returns None without trades to resample.
+    """
+    trade_returns = np.nan_to_num(np.asarray(trade_returns, dtype=np.float64))
+    if trade_returns.size == 0:
+        return None
+    years = max(years, 1e-9)
+
+    chunk_paths = max(1, chunk_cells // trade_returns.size)
+    sizes = [min(chunk_paths, paths - start) for start in range(0, paths, chunk_paths)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    chunks = [(trade_returns, size, method, years, ruin_level, chunk_seed) for size, chunk_seed in zip(sizes, seeds)]
+    results = map_chunks(_simulate_chunk, chunks, max_workers, name="Monte Carlo")
+
+    merged = {name: np.concatenate([result[name] for result in results]) for name in results[0]}
+    return MonteCarloResult(
+        method=method,
+        paths=paths,
+        trades=trade_returns.size,
+        ruin_level=ruin_level,
+        unit=unit,
+        **merged
+    )
+
+def format_monte_carlo_summary(result: MonteCarloResult) -> str:
+    """Percentiles of the simulated distributions for the backtest log"""
+    lines = [f"Monte Carlo ({result.method}): {result.paths} paths of {result.trades} {result.unit}"]
+    header = "".join(f"{f'p{p}':>10}" for p in PERCENTILES)
+    lines.append(f"{'':<14}{header}")
+    for name, values in result.percentiles().items():
+        lines.append(f"{name:<14}" + "".join(f"{values[p]:>10.4f}" for p in PERCENTILES))
+    lines.append(f"loss_probability: {result.loss_probability:.4f}")
+    lines.append(f"ruin_probability: {result.ruin_probability:.4f} (loss of {result.ruin_level:.0%} of capital)")
+    return "\n".join(lines) + "\n"
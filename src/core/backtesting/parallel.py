@@ -0,0 +1,37 @@
+"""
+Process fan-out of independent chunks for the sweep and Monte Carlo engines.
+
+Both run inside Celery prefork workers, which are daemonic processes, and the
+standard library's process pools refuse to start children there. Chunks go to
+a billiard pool instead, Celery's fork of multiprocessing that allows it.
+"""
+import os
+from typing import Callable, List, Optional, Sequence
+
+from billiard.pool import Pool
+
+from src.utils.logger import get_logger
+logger = get_logger(__name__)
+
+def map_chunks(
+    function: Callable,
+    chunks: Sequence,
+    max_workers: Optional[int] = None,
+    name: str = "chunks"
+) -> List:
+    """
+    function(chunk) for every chunk, in order. More than one chunk runs on up
+    to max_workers processes (all cores by default), falling back to this
+    process when the system cannot start them.
+    """
+    workers = min(len(chunks), max_workers or os.cpu_count() or 1)
+    if workers > 1:
+        try:
+            with Pool(processes=workers) as pool:
+                # One job per chunk, billiard's map results are not acknowledged
+                # per worker and stall the pool's shutdown
+                results = [pool.apply_async(function, (chunk,)) for chunk in chunks]
+                return [result.get() for result in results]
+        except OSError as e:
+            logger.warning(f"Process pool unavailable for {name}, running in-process: {e}")
+    return [function(chunk) for chunk in chunks]
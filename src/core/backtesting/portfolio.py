@@ -0,0 +1,163 @@
+"""
+Portfolio backtests of one StrategySpec across several instruments.
+
+Prices come as one aligned (symbols, bars) panel. The spec trades every
+instrument in its own sleeve as one 2-D batch through the vectorized engine,
+and the sleeves are combined with target weights:
+
+    - "equal": the same weight for every instrument
+    - "inverse_volatility": weights proportional to 1 / the rolling volatility
+      of each instrument's bar returns, known at the previous close
+    - "weights": fixed user weights, normalized to sum to 1
+
+The portfolio is rebalanced to its target weights every bar, or every
+rebalance_days calendar days with weights drifting with the sleeves in between.
+"""
+from typing import Dict, List, Literal, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.core.backtesting.executor import BacktestResult, bar_returns, compute_stats, run_backtest
+from src.core.backtesting.generator import StrategySpec, backtest_config, build_signals
+
+Allocation = Literal["equal", "inverse_volatility", "weights"]
+
+def validate_portfolio(
+    instrument_symbol: str,
+    instrument_symbols: List[str],
+    allocation: str = "equal",
+    weights: Optional[Dict[str, float]] = None,
+    max_symbols: int = 20
+):
+    """Reject portfolios that cannot be backtested, raises ValueError"""
+    if len(set(instrument_symbols)) != len(instrument_symbols):
+        raise ValueError("instrument_symbols contains duplicates")
+    if len(instrument_symbols) > max_symbols:
+        raise ValueError(f"Portfolio has {len(instrument_symbols)} instruments, the limit is {max_symbols}")
+    if instrument_symbol not in instrument_symbols:
+        raise ValueError(f"instrument_symbol '{instrument_symbol}' must be one of the portfolio's instrument_symbols")
+    if allocation == "weights":
+        if not weights or set(weights) != set(instrument_symbols):
+            raise ValueError("Weights allocation needs one weight per instrument symbol")
+        if any(weight <= 0 for weight in weights.values()):
+            raise ValueError("Portfolio weights must be positive")
+
+def allocation_weights(
+    prices: np.ndarray,
+    symbols: List[str],
+    allocation: Allocation = "equal",
+    weights: Optional[Dict[str, float]] = None,
+    volatility_window: int = 20
+) -> np.ndarray:
+    """Target weight of every instrument at every bar, shape (symbols, bars), each bar sums to 1"""
+    count, bars = prices.shape
+    if allocation == "weights":
+        raw = np.array([weights[symbol] for symbol in symbols], dtype=np.float64)[:, None]
+        raw = np.broadcast_to(raw, (count, bars))
+    elif allocation == "inverse_volatility":
+        volatility = pd.DataFrame(bar_returns(prices).T).rolling(volatility_window).std().shift(1).to_numpy().T
+        with np.errstate(divide="ignore"):
+            raw = np.where(volatility > 0, 1.0 / volatility, np.nan)
+        # Equal weights until every instrument has a full window of history
+        raw = np.where(np.isnan(raw).any(axis=0), 1.0, raw)
+    else:
+        raw = np.ones((count, bars))
+    return raw / raw.sum(axis=0)
+
+def rebalance_periods(timestamps: np.ndarray, rebalance_days: Optional[int]) -> Optional[np.ndarray]:
+    """Rebalancing period of every bar, None to rebalance every bar"""
+    if not rebalance_days:
+        return None
+    timestamps = np.asarray(timestamps, dtype="datetime64[ns]")
+    return (timestamps - timestamps[0]) // np.timedelta64(rebalance_days, "D")
+
+def portfolio_returns(
+    sleeve_returns: np.ndarray,
+    weights: np.ndarray,
+    periods: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Bar returns of the combined sleeves. Weights are reset to their target at
+    the first bar of every period and drift with each sleeve's growth until
+    the next one.
+    """
+    if periods is None:
+        return (weights * sleeve_returns).sum(axis=0)
+
+    bars = sleeve_returns.shape[1]
+    starts = np.concatenate([[True], periods[1:] != periods[:-1]])
+    start_index = np.maximum.accumulate(np.where(starts, np.arange(bars), 0))
+
+    growth = np.cumprod(1.0 + sleeve_returns, axis=1)
+    before = np.concatenate([np.ones((growth.shape[0], 1)), growth[:, :-1]], axis=1)
+    # Value of the portfolio relative to the start of the period, after each bar
+    value = (weights[:, start_index] * growth / before[:, start_index]).sum(axis=0)
+    previous = np.concatenate([[1.0], value[:-1]])
+    previous[starts] = 1.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.nan_to_num(value / previous - 1.0)
+
+def run_portfolio(
+    spec: StrategySpec,
+    symbols: List[str],
+    timestamps: np.ndarray,
+    prices: np.ndarray,
+    allocation: Allocation = "equal",
+    weights: Optional[Dict[str, float]] = None,
+    volatility_window: int = 20,
+    rebalance_days: Optional[int] = None,
+    periods_per_year: float = 252.0
+) -> tuple:
+    """
+    Trade the spec on every instrument of the (symbols, bars) price panel and
+    combine the sleeves into one portfolio.
+
+    Returns (result, sleeves, table): the portfolio's 1-D BacktestResult whose
+    trades keep their instrument in the "row" field, the 2-D sleeve result and
+    one row per instrument with its average weight and sleeve stats.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    signals = np.empty(prices.shape, dtype=np.int8)
+    for row in range(prices.shape[0]):
+        signals[row] = build_signals(spec, prices[row])
+
+    sleeves = run_backtest(prices, signals, backtest_config(spec, periods_per_year))
+    target = allocation_weights(prices, symbols, allocation, weights, volatility_window)
+    returns = portfolio_returns(sleeves.returns, target, rebalance_periods(timestamps, rebalance_days))
+    equity = spec.initial_capital * np.cumprod(1.0 + returns)
+    exposure = (target * sleeves.exposure).sum(axis=0)
+
+    trades = np.sort(sleeves.trades, order=["entry_index", "row"])
+    pooled = trades.copy()
+    pooled["row"] = 0
+    result = BacktestResult(
+        positions=np.sign(exposure),
+        exposure=exposure,
+        returns=returns,
+        equity=equity,
+        trades=trades,
+        stats=compute_stats(returns, equity, exposure, pooled, spec.initial_capital, periods_per_year)
+    )
+
+    table = pd.DataFrame({
+        "symbol": symbols,
+        "avg_weight": target.mean(axis=1),
+        "total_return": sleeves.stats["total_return"],
+        "sharpe_ratio": sleeves.stats["sharpe_ratio"],
+        "max_drawdown": sleeves.stats["max_drawdown"],
+        "num_trades": sleeves.stats["num_trades"],
+        "win_rate": sleeves.stats["win_rate"],
+    })
+    return result, sleeves, table
+
+def portfolio_index(prices: np.ndarray) -> np.ndarray:
+    """Equal-weighted buy and hold index of the panel, starting at 100"""
+    return 100.0 * (prices / prices[:, :1]).mean(axis=0)
+
+def format_portfolio_summary(table: pd.DataFrame, allocation: str, rebalance_days: Optional[int] = None) -> str:
+    """Per-instrument table for the backtest log"""
+    rebalancing = f"every {rebalance_days} days" if rebalance_days else "every bar"
+    lines = [f"Portfolio: {len(table)} instruments, {allocation} allocation, rebalanced {rebalancing}"]
+    lines.append(table.to_string(index=False, float_format=lambda value: f"{value:.4f}"))
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,297 @@
+"""
+Event-driven tick replay for path-dependent strategies.
+
+Trailing stops, spread filters and order book logic depend on everything
+that happened before each tick and do not vectorize cleanly. Instead of a
+loop over DataFrame rows, the replay engine walks compact typed arrays
+(converted once to Python lists, the fastest thing to iterate) and calls a
+Strategy for every tick:
+
+    class MyStrategy(Strategy):
+        def on_tick(self, index, price, bid, ask, bid_size, ask_size, broker):
+            if broker.position == 0 and ask - bid < 0.05:
+                broker.order_target_percent(1.0)
+
+    result = replay(TickData.from_frame(df), MyStrategy(), initial_capital=100000)
+
+Market orders fill immediately against the current quote, buys at the ask
+and sells at the bid (the last price when a side is missing). The result is
+a BacktestResult with the same fields and stats as the vectorized engine,
+plus every fill.
+"""
+import math
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.core.backtesting.executor import (
+    TRADE_DTYPE,
+    BacktestResult,
+    compute_stats,
+    forward_fill,
+    infer_periods_per_year,
+    shift
+)
+
+FILL_DTYPE = np.dtype([
+    ("index", np.int64),
+    ("quantity", np.float64),
+    ("price", np.float64),
+    ("fee", np.float64),
+])
+
+@dataclass
+class ReplayResult(BacktestResult):
+    fills: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=FILL_DTYPE))
+
+@dataclass
+class TickData:
+    """One float64 array per quote field, every array has one value per tick"""
+    timestamps: np.ndarray
+    price: np.ndarray
+    bid_price: np.ndarray
+    ask_price: np.ndarray
+    bid_size: np.ndarray
+    ask_size: np.ndarray
+
+    @classmethod
+    def from_arrays(
+        cls,
+        timestamps: np.ndarray,
+        price: np.ndarray,
+        bid_price: Optional[np.ndarray] = None,
+        ask_price: Optional[np.ndarray] = None,
+        bid_size: Optional[np.ndarray] = None,
+        ask_size: Optional[np.ndarray] = None
+    ) -> "TickData":
+        """
+        Typed arrays from any array-likes. Missing prices are forward filled,
+        ticks before the first price are dropped and missing fields are NaN.
+        """
+        price = forward_fill(np.asarray(price, dtype=np.float64))
+        start = int(np.isnan(price).argmin()) if price.size and np.isnan(price[0]) else 0
+        price = price[start:]
+
+        def column(values):
+            if values is None:
+                return np.full(price.shape, np.nan)
+            return np.asarray(values, dtype=np.float64)[start:]
+
+        return cls(
+            timestamps=np.asarray(timestamps, dtype="datetime64[ns]")[start:],
+            price=price,
+            bid_price=column(bid_price),
+            ask_price=column(ask_price),
+            bid_size=column(bid_size),
+            ask_size=column(ask_size)
+        )
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, time_column: str = "time") -> "TickData":
+        """Typed arrays from a tick_data frame, only its time and quote columns are kept"""
+        def column(name):
+            return df[name].to_numpy(dtype=np.float64, na_value=np.nan) if name in df else None
+
+        return cls.from_arrays(
+            pd.to_datetime(df[time_column], utc=True).dt.tz_localize(None).to_numpy(dtype="datetime64[ns]"),
+            column("price"),
+            column("bid_price"),
+            column("ask_price"),
+            column("bid_size"),
+            column("ask_size")
+        )
+
+class Broker:
+    """
+    Cash, position and fills of a replay. Quantities are in units of the
+    instrument, positive to buy and negative to sell.
+    """
+    def __init__(self, initial_capital: float, fees: float = 0.0, allow_short: bool = False):
+        self.cash = initial_capital
+        self.position = 0.0
+        self.fees = fees
+        self.allow_short = allow_short
+        self.index = -1
+        self.price = math.nan
+        self.bid = math.nan
+        self.ask = math.nan
+        self.fills: List[tuple] = []
+        self.trades: List[tuple] = []
+        self._trade = None
+
+    @property
+    def equity(self) -> float:
+        """Cash plus the position marked at the last price"""
+        return self.cash + self.position * self.price
+
+    def buy(self, quantity: float):
+        if quantity > 0:
+            self._fill(quantity, self.ask if self.ask == self.ask else self.price)
+
+    def sell(self, quantity: float):
+        if not self.allow_short:
+            quantity = min(quantity, max(self.position, 0.0))
+        if quantity > 0:
+            self._fill(-quantity, self.bid if self.bid == self.bid else self.price)
+
+    def close(self):
+        if self.position > 0:
+            self.sell(self.position)
+        elif self.position < 0:
+            self.buy(-self.position)
+
+    def order_target(self, quantity: float):
+        """Buy or sell the difference to reach a target position"""
+        difference = quantity - self.position
+        if difference > 0:
+            self.buy(difference)
+        elif difference < 0:
+            self.sell(-difference)
+
+    def order_target_percent(self, fraction: float):
+        """Target a position worth a fraction of equity, negative for short"""
+        self.order_target(fraction * self.equity / self.price)
+
+    def _fill(self, quantity: float, price: float):
+        fee = abs(quantity) * price * self.fees
+        self.cash -= quantity * price + fee
+        self.fills.append((self.index, quantity, price, fee))
+
+        previous = self.position
+        self.position = position = previous + quantity
+        if abs(position) < 1e-12:
+            self.position = position = 0.0
+
+        if previous != 0 and (position == 0 or (position > 0) != (previous > 0)):
+            # Closed or reversed, the reversal's excess opens a new trade below
+            closed = abs(previous)
+            self._trade[3] += closed * price
+            self._trade[4] += closed
+            self._close_trade()
+            quantity = position
+        elif previous != 0 and abs(position) < abs(previous):
+            self._trade[3] += abs(quantity) * price
+            self._trade[4] += abs(quantity)
+            return
+        elif previous != 0:
+            self._trade[1] += abs(quantity) * price
+            self._trade[2] += abs(quantity)
+            return
+
+        if position != 0:
+            # [entry_index, entry_value, entry_quantity, exit_value, exit_quantity, direction]
+            self._trade = [self.index + 1, abs(quantity) * price, abs(quantity), 0.0, 0.0, 1 if position > 0 else -1]
+
+    def _close_trade(self):
+        entry_index, entry_value, entry_quantity, exit_value, exit_quantity, direction = self._trade
+        entry_price = entry_value / entry_quantity
+        exit_price = exit_value / exit_quantity
+        self.trades.append((
+            0, entry_index, self.index, direction, entry_price, exit_price,
+            direction * (exit_price / entry_price - 1.0)
+        ))
+        self._trade = None
+
+class Strategy:
+    """Callbacks of a replay, override on_tick and optionally the others"""
+    def on_start(self, data: TickData, broker: Broker):
+        pass
+
+    def on_tick(self, index: int, price: float, bid: float, ask: float, bid_size: float, ask_size: float, broker: Broker):
+        raise NotImplementedError
+
+    def on_finish(self, broker: Broker):
+        pass
+
+class TrailingStopStrategy(Strategy):
+    """
+    Example strategy: long while the bid stays within `trail` of its highest
+    value since entry, re-entering `cooldown` ticks after each stop.
+    """
+    def __init__(self, trail: float = 0.02, fraction: float = 1.0, cooldown: int = 0):
+        self.trail = trail
+        self.fraction = fraction
+        self.cooldown = cooldown
+        self.peak = 0.0
+        self.stopped_at = None
+
+    def on_tick(self, index, price, bid, ask, bid_size, ask_size, broker):
+        mark = bid if bid == bid else price
+        if broker.position > 0:
+            self.peak = max(self.peak, mark)
+            if mark <= self.peak * (1.0 - self.trail):
+                broker.close()
+                self.stopped_at = index
+        elif self.stopped_at is None or index - self.stopped_at > self.cooldown:
+            broker.order_target_percent(self.fraction)
+            self.peak = mark
+
+def replay(
+    data: TickData,
+    strategy: Strategy,
+    initial_capital: float = 100000.0,
+    fees: float = 0.0,
+    allow_short: bool = False,
+    close_at_end: bool = True,
+    periods_per_year: Optional[float] = None
+) -> ReplayResult:
+    """
+    Replay every tick through the strategy. With close_at_end the position is
+    closed on the last tick. Stats are annualized with the tick frequency
+    unless periods_per_year is given.
+    """
+    broker = Broker(initial_capital, fees, allow_short)
+    count = data.price.size
+    equity = np.empty(count)
+    held = np.empty(count)
+
+    strategy.on_start(data, broker)
+    on_tick = strategy.on_tick
+    ticks = zip(
+        data.price.tolist(),
+        data.bid_price.tolist(),
+        data.ask_price.tolist(),
+        data.bid_size.tolist(),
+        data.ask_size.tolist()
+    )
+    for index, (price, bid, ask, bid_size, ask_size) in enumerate(ticks):
+        broker.index, broker.price, broker.bid, broker.ask = index, price, bid, ask
+        on_tick(index, price, bid, ask, bid_size, ask_size, broker)
+        if close_at_end and index == count - 1:
+            broker.close()
+        equity[index] = broker.cash + broker.position * price
+        held[index] = broker.position * price
+    strategy.on_finish(broker)
+    if broker._trade is not None:
+        # Still open at the end, recorded as exiting at the last price
+        broker._trade[3] += broker._trade[2] * broker.price
+        broker._trade[4] += broker._trade[2]
+        broker._close_trade()
+
+    previous = np.concatenate([[initial_capital], equity[:-1]])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = np.nan_to_num(equity / previous - 1.0)
+        # Held over a tick is the position after the previous one, as in the vectorized engine
+        exposure = shift(np.nan_to_num(held / equity), 1, fill=0.0)
+    positions = np.sign(exposure).astype(np.int8)
+    trades = np.array(broker.trades, dtype=TRADE_DTYPE)
+
+    stats = compute_stats(
+        returns,
+        equity,
+        positions,
+        trades,
+        initial_capital,
+        periods_per_year or infer_periods_per_year(data.timestamps)
+    )
+    return ReplayResult(
+        positions=positions,
+        exposure=exposure,
+        returns=returns,
+        equity=equity,
+        trades=trades,
+        stats=stats,
+        fills=np.array(broker.fills, dtype=FILL_DTYPE)
+    )
@@ -0,0 +1,202 @@
+"""
+Parameter sweeps over a StrategySpec.
+
+A grid maps parameter paths of the spec to candidate values:
+
+    {"fast.window": [5, 10, 20], "slow.window": [50, 100, 200], "stop_loss": [0.02, 0.05]}
+
+    - "<indicator>.window" and "<indicator>.num_std" set an indicator's parameters
+    - "entry.<i>.right" and "exit.<i>.right" set a condition's numeric threshold
+    - "stop_loss", "take_profit", "position_size" and "fees" set the sizing and exits
+
+Every combination is backtested against the same prices. Combinations are
+evaluated in chunks as one 2-D signal array through the vectorized engine,
+distinct indicators are computed once per chunk, and chunks are spread over a
+process pool when there is more than one.
+"""
+import io
+import itertools
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.core.backtesting.executor import BacktestConfig, run_backtest
+from src.core.backtesting.parallel import map_chunks
+from src.core.backtesting.generator import (
+    StrategySpec,
+    build_signals,
+    parse_strategy_description
+)
+
+from src.utils.logger import get_logger
+logger = get_logger(__name__)
+
+SWEEPABLE_FIELDS = ("stop_loss", "take_profit", "position_size", "fees")
+INDICATOR_FIELDS = ("window", "num_std")
+
+def expand_grid(grid: Dict[str, List[float]]) -> List[Dict[str, float]]:
+    """Every combination of the grid's values, in grid order"""
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[key] for key in keys))]
+
+def apply_parameters(spec: StrategySpec, parameters: Dict[str, float]) -> StrategySpec:
+    """Copy of the spec with the parameters set, raises ValueError for unknown or invalid ones"""
+    data = spec.model_dump()
+    indicators = {indicator["name"]: indicator for indicator in data["indicators"]}
+    for key, value in parameters.items():
+        parts = key.split(".")
+        if len(parts) == 1 and parts[0] in SWEEPABLE_FIELDS:
+            data[parts[0]] = value
+        elif len(parts) == 2 and parts[0] in indicators and parts[1] in INDICATOR_FIELDS:
+            indicators[parts[0]][parts[1]] = int(value) if parts[1] == "window" else value
+        elif len(parts) == 3 and parts[0] in ("entry", "exit") and parts[1].isdigit() and parts[2] == "right":
+            conditions = data[parts[0]]
+            if int(parts[1]) >= len(conditions) or isinstance(conditions[int(parts[1])]["right"], str):
+                raise ValueError(f"'{key}' is not a numeric condition threshold of the strategy")
+            conditions[int(parts[1])]["right"] = value
+        else:
+            raise ValueError(
+                f"Unknown sweep parameter '{key}', the strategy has indicators "
+                f"{', '.join(indicators) or 'none'}"
+            )
+    return StrategySpec.model_validate(data)
+
+def validate_parameter_grid(
+    strategy_description: str,
+    grid: Dict[str, List[float]],
+    max_combinations: int,
+    require_spec: bool = True
+):
+    """
+    Reject grids that are too large or do not fit the strategy, raises
+    ValueError. Descriptions the rule parser cannot turn into a spec are
+    rejected with require_spec, otherwise their grid is only checked by the
+    sweep itself once the LLM has produced a spec.
+    """
+    combinations = int(np.prod([len(values) for values in grid.values()]))
+    if combinations > max_combinations:
+        raise ValueError(f"Parameter grid has {combinations} combinations, the limit is {max_combinations}")
+
+    spec = parse_strategy_description(strategy_description)
+    if spec is None:
+        if require_spec:
+            raise ValueError(
+                "Parameter sweeps are only supported for moving average, RSI, breakout "
+                "and Bollinger band strategies"
+            )
+        return
+    for key, values in grid.items():
+        for value in values:
+            apply_parameters(spec, {key: value})
+
+def evaluate_combinations(
+    spec: StrategySpec,
+    prices: np.ndarray,
+    combinations: List[Dict[str, float]],
+    periods_per_year: float = 252.0
+) -> Dict[str, np.ndarray]:
+    """Stats of every combination, one value per combination per stat"""
+    prices = np.asarray(prices, dtype=np.float64)
+    specs = [apply_parameters(spec, combination) for combination in combinations]
+
+    cache = {}
+    signals = np.empty((len(specs), prices.size), dtype=np.int8)
+    for row, combination_spec in enumerate(specs):
+        signals[row] = build_signals(combination_spec, prices, cache)
+
+    def column(field: str):
+        values = [getattr(s, field) for s in specs]
+        if any(value is None for value in values):
+            return None
+        return np.array(values, dtype=np.float64)[:, None]
+
+    config = BacktestConfig(
+        initial_capital=spec.initial_capital,
+        position_size=column("position_size"),
+        stop_loss=column("stop_loss"),
+        take_profit=column("take_profit"),
+        fees=column("fees"),
+        allow_short=spec.direction == "short",
+        periods_per_year=periods_per_year
+    )
+    return run_backtest(prices, signals, config).stats
+
+def _evaluate_chunk(arguments: tuple) -> Dict[str, np.ndarray]:
+    spec_data, prices, combinations, periods_per_year = arguments
+    return evaluate_combinations(StrategySpec.model_validate(spec_data), prices, combinations, periods_per_year)
+
+def run_sweep(
+    spec: StrategySpec,
+    prices: np.ndarray,
+    grid: Dict[str, List[float]],
+    periods_per_year: float = 252.0,
+    rank_by: str = "sharpe_ratio",
+    chunk_cells: int = 5_000_000,
+    max_workers: Optional[int] = None
+) -> pd.DataFrame:
+    """
+    Backtest every combination of the grid and return one row per combination,
+    parameters followed by stats, best `rank_by` first.
+
+    Chunks hold at most chunk_cells combination-bars to bound memory and are
+    spread over up to max_workers processes by map_chunks.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    combinations = expand_grid(grid)
+    chunk_rows = max(1, chunk_cells // max(prices.size, 1))
+    spec_data = spec.model_dump()
+    chunks = [
+        (spec_data, prices, combinations[i:i + chunk_rows], periods_per_year)
+        for i in range(0, len(combinations), chunk_rows)
+    ]
+    results = map_chunks(_evaluate_chunk, chunks, max_workers, name="parameter sweep")
+
+    table = pd.DataFrame(combinations)
+    for name in results[0]:
+        table[name] = np.concatenate([np.asarray(result[name]).reshape(-1) for result in results])
+    return table.sort_values(rank_by, ascending=False, kind="stable").reset_index(drop=True)
+
+def render_heatmap(table: pd.DataFrame, grid: Dict[str, List[float]], metric: str = "sharpe_ratio") -> bytes:
+    """
+    PNG heatmap of the metric over the first two swept parameters, the best
+    value over any further parameters. A single parameter is drawn as one row.
+    """
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    swept = [key for key in grid if len(grid[key]) > 1] or list(grid)
+    rows = swept[1] if len(swept) > 1 else None
+    columns = swept[0]
+    if rows:
+        pivot = table.pivot_table(index=rows, columns=columns, values=metric, aggfunc="max")
+    else:
+        pivot = table.groupby(columns)[metric].max().to_frame().T
+        pivot.index = [metric]
+
+    figure, axis = plt.subplots(figsize=(max(6, 0.8 * pivot.shape[1] + 2), max(3, 0.6 * pivot.shape[0] + 2)))
+    image = axis.imshow(pivot.to_numpy(dtype=np.float64), cmap="RdYlGn", aspect="auto", origin="lower")
+    axis.set_xticks(range(pivot.shape[1]), [f"{value:g}" for value in pivot.columns])
+    axis.set_yticks(range(pivot.shape[0]), [f"{value:g}" if rows else value for value in pivot.index])
+    axis.set_xlabel(columns)
+    axis.set_ylabel(rows or "")
+    if pivot.size <= 400:
+        for (y, x), value in np.ndenumerate(pivot.to_numpy(dtype=np.float64)):
+            if np.isfinite(value):
+                axis.text(x, y, f"{value:.2f}", ha="center", va="center", fontsize=8)
+    figure.colorbar(image, ax=axis, label=metric)
+    axis.set_title(f"{metric} by parameter")
+    figure.tight_layout()
+
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format="png", dpi=120)
+    plt.close(figure)
+    return buffer.getvalue()
+
+def format_sweep_summary(table: pd.DataFrame, grid: Dict[str, List[float]], top: int = 10) -> str:
+    """Top rows of the ranked table for the backtest log"""
+    columns = list(grid) + ["total_return", "cagr", "sharpe_ratio", "max_drawdown", "num_trades", "win_rate"]
+    lines = [f"Parameter sweep: {len(table)} combinations of {', '.join(grid)}"]
+    lines.append(table[columns].head(top).to_string(index=False, float_format=lambda value: f"{value:.4f}"))
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,202 @@
+"""
+Static checks of generated backtest scripts.
+
+Runs on the script source before it is uploaded, so broken scripts are
+rejected in milliseconds inside the generation task instead of after a
+queue hop and a sandbox run. The checks are deliberately conservative and
+only reject what would certainly fail or must not run:
+
+    - the script does not parse
+    - it does not accept the --data and --log arguments it is run with
+    - it imports a module that is neither standard library nor an allowed
+      package, a known-dangerous module, or imports dynamically
+    - it reads a column of the loaded data frame that is neither fetched
+      (data_columns) nor created by the script itself
+
+Slow but working code, like loops over iterrows, is only reported by
+script_warnings.
+"""
+import ast
+import hashlib
+import sys
+from typing import Iterable, List, Optional, Set
+
+# Packages available to generated scripts besides the standard library
+ALLOWED_MODULES = {"numpy", "pandas", "scipy", "sklearn", "numba", "vectorbt", "matplotlib"}
+ALLOWED_PACKAGE_PREFIXES = ("src.core.backtesting",)
+# Standard library modules that reach the network, other processes or native
+# code, or load code at runtime
+FORBIDDEN_MODULES = {
+    "subprocess", "socket", "ssl", "ctypes", "multiprocessing", "concurrent", "http", "urllib",
+    "ftplib", "smtplib", "poplib", "imaplib", "telnetlib", "xmlrpc", "socketserver", "webbrowser",
+    "pty", "importlib", "pickle", "marshal", "shelve", "runpy", "code", "codeop",
+}
+FORBIDDEN_CALLS = {"__import__", "exec", "eval", "compile"}
+REQUIRED_ARGUMENTS = ("--data", "--log")
+# Methods that return the same data frame, reads on their results are column reads
+FRAME_METHODS = {"copy", "dropna"}
+
+def _imported_modules(tree: ast.AST) -> Iterable[tuple]:
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                yield node.lineno, alias.name
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            yield node.lineno, node.module
+
+def _is_allowed(module: str) -> bool:
+    top = module.split(".")[0]
+    if top in FORBIDDEN_MODULES:
+        return False
+    if top in ALLOWED_MODULES or top in sys.stdlib_module_names:
+        return True
+    return any(module == prefix or module.startswith(prefix + ".") for prefix in ALLOWED_PACKAGE_PREFIXES)
+
+def _strings(node: ast.AST) -> List[str]:
+    """String constants of a constant or a list/tuple of constants"""
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return [node.value]
+    if isinstance(node, (ast.List, ast.Tuple)):
+        return [item.value for item in node.elts if isinstance(item, ast.Constant) and isinstance(item.value, str)]
+    return []
+
+def _is_read_csv(node: ast.AST) -> bool:
+    return isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr == "read_csv"
+
+def _is_frame(node: ast.AST, frames: Set[str]) -> bool:
+    """Whether the expression is the loaded data frame: read_csv, a frame variable or its copy or dropna"""
+    if _is_read_csv(node):
+        return True
+    if isinstance(node, ast.Name):
+        return node.id in frames
+    return (
+        isinstance(node, ast.Call)
+        and isinstance(node.func, ast.Attribute)
+        and node.func.attr in FRAME_METHODS
+        and _is_frame(node.func.value, frames)
+    )
+
+def _frame_names(tree: ast.AST) -> Set[str]:
+    """Variables holding the loaded data frame, Series and aggregates derived from it are not tracked"""
+    frames: Set[str] = set()
+    assignments = [node for node in ast.walk(tree) if isinstance(node, ast.Assign)]
+    changed = True
+    while changed:
+        changed = False
+        for node in assignments:
+            if not _is_frame(node.value, frames):
+                continue
+            for target in node.targets:
+                if isinstance(target, ast.Name) and target.id not in frames:
+                    frames.add(target.id)
+                    changed = True
+    return frames
+
+def _column_references(tree: ast.AST, frames: Set[str]) -> tuple:
+    """(read, created): line and name of every literal column read from a frame, names of created columns"""
+    read, created = [], set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Subscript):
+            key = node.slice
+            if (
+                isinstance(node.value, ast.Attribute)
+                and node.value.attr in ("loc", "at")
+                and _is_frame(node.value.value, frames)
+            ):
+                # df.loc[rows, "column"]
+                key = key.elts[-1] if isinstance(key, ast.Tuple) and len(key.elts) == 2 else None
+            elif not _is_frame(node.value, frames):
+                continue
+            names = _strings(key) if key is not None else []
+            if isinstance(node.ctx, ast.Store):
+                created.update(names)
+            else:
+                read.extend((node.lineno, name) for name in names)
+        elif isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute):
+            if node.func.attr == "assign":
+                created.update(keyword.arg for keyword in node.keywords if keyword.arg)
+            for keyword in node.keywords:
+                if keyword.arg == "columns" and isinstance(keyword.value, ast.Dict):
+                    # rename(columns={"old": "new"})
+                    created.update(name for value in keyword.value.values for name in _strings(value))
+                elif keyword.arg in ("usecols", "parse_dates", "index_col") and _is_read_csv(node):
+                    read.extend((node.lineno, name) for name in _strings(keyword.value))
+    return read, created
+
+def validate_script_source(
+    script: str,
+    data_columns: Optional[List[str]] = None,
+    available_columns: Optional[List[str]] = None
+) -> List[str]:
+    """
+    Problems found in a generated script, empty when it passes. Columns are
+    only checked when data_columns is given, and data_columns are checked
+    against available_columns when that is given.
+    """
+    try:
+        tree = ast.parse(script)
+    except SyntaxError as e:
+        return [f"line {e.lineno}: syntax error: {e.msg}"]
+
+    problems = []
+    arguments = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr == "add_argument":
+            arguments.update(name for arg in node.args for name in _strings(arg))
+    for argument in REQUIRED_ARGUMENTS:
+        if argument not in arguments:
+            problems.append(f"the script must accept a {argument} argument with argparse")
+
+    for line, module in _imported_modules(tree):
+        if not _is_allowed(module):
+            problems.append(f"line {line}: import of '{module}' is not allowed")
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in FORBIDDEN_CALLS:
+            problems.append(f"line {node.lineno}: {node.func.id}() is not allowed")
+
+    if data_columns is not None:
+        if available_columns is not None:
+            missing = [column for column in data_columns if column not in available_columns]
+            if missing:
+                problems.append(f"data_columns {', '.join(missing)} are not available for this instrument")
+        read, created = _column_references(tree, _frame_names(tree))
+        reported = set()
+        for line, column in read:
+            if column not in data_columns and column not in created and column not in reported:
+                reported.add(column)
+                problems.append(f"line {line}: column '{column}' is read but not listed in data_columns")
+    return problems
+
+def script_warnings(script: str) -> List[str]:
+    """Slow but working code in a generated script, reported without rejecting it"""
+    try:
+        tree = ast.parse(script)
+    except SyntaxError:
+        return []
+
+    warnings = []
+    for node in ast.walk(tree):
+        if (
+            isinstance(node, (ast.For, ast.comprehension))
+            and isinstance(node.iter, ast.Call)
+            and isinstance(node.iter.func, ast.Attribute)
+            and node.iter.func.attr == "iterrows"
+        ):
+            line = getattr(node, "lineno", getattr(node.iter, "lineno", 0))
+            warnings.append(
+                f"line {line}: row by row loop over iterrows, use vectorized operations "
+                f"or the replay engine in src.core.backtesting.replay"
+            )
+    return warnings
+
+def normalized_script_hash(script: str) -> str:
+    """
+    SHA-256 of the script's syntax tree, so formatting and comment changes
+    hash the same. Scripts that do not parse are hashed as text.
+    """
+    try:
+        normalized = ast.dump(ast.parse(script))
+    except SyntaxError:
+        normalized = script
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
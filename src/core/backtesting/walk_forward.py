@@ -0,0 +1,189 @@
+"""
+Walk-forward evaluation of a StrategySpec.
+
+The backtest period is split into rolling windows of train_days followed by
+test_days, advancing by step_days. With a parameter grid the best
+combination on each train window is picked by a sweep, otherwise the spec is
+used as is. Each test window is then traded out-of-sample, starting flat,
+with indicators warmed up on the train window, and the out-of-sample returns
+are stitched into one equity curve.
+
+The data is loaded once. Windows are located with searchsorted on the
+timestamps and work on slices (views) of the same arrays, and they run on a
+thread pool so no copy of the data is sent anywhere.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.core.backtesting.executor import BacktestResult, compute_stats, run_backtest
+from src.core.backtesting.generator import StrategySpec, backtest_config, build_signals
+from src.core.backtesting.sweep import apply_parameters, run_sweep
+
+@dataclass
+class WalkForwardWindow:
+    train_start: int
+    train_end: int
+    test_start: int
+    test_end: int
+
+def validate_walk_forward(
+    from_date: date,
+    to_date: date,
+    train_days: int,
+    test_days: int,
+    step_days: Optional[int] = None,
+    max_windows: int = 100
+):
+    """Reject configurations without a full window or with too many windows, raises ValueError"""
+    step_days = step_days or test_days
+    if step_days < test_days:
+        raise ValueError("step_days cannot be shorter than test_days, test windows would overlap")
+    span = (to_date - from_date).days
+    if span < train_days + test_days:
+        raise ValueError(f"The backtest period of {span} days is shorter than one train and test window")
+    windows = (span - train_days - test_days) // step_days + 1
+    if windows > max_windows:
+        raise ValueError(f"Walk-forward would run {windows} windows, the limit is {max_windows}")
+
+def walk_forward_windows(
+    timestamps: np.ndarray,
+    train_days: int,
+    test_days: int,
+    step_days: Optional[int] = None
+) -> List[WalkForwardWindow]:
+    """Bar index ranges of every full train and test window, [start, end)"""
+    timestamps = np.asarray(timestamps, dtype="datetime64[ns]")
+    step_days = step_days or test_days
+    if timestamps.size == 0:
+        return []
+
+    day = np.timedelta64(1, "D")
+    origin = timestamps[0]
+    windows = []
+    while True:
+        test_begin = origin + train_days * day
+        test_finish = test_begin + test_days * day
+        if test_finish > timestamps[-1] + day:
+            break
+        train_start, test_start, test_end = np.searchsorted(timestamps, [origin, test_begin, test_finish])
+        if test_start > train_start and test_end > test_start:
+            windows.append(WalkForwardWindow(int(train_start), int(test_start), int(test_start), int(test_end)))
+        origin = origin + step_days * day
+    return windows
+
+def evaluate_window(
+    spec: StrategySpec,
+    prices: np.ndarray,
+    window: WalkForwardWindow,
+    grid: Optional[Dict[str, List[float]]] = None,
+    periods_per_year: float = 252.0,
+    rank_by: str = "sharpe_ratio"
+) -> tuple:
+    """Parameters picked on the train window and the out-of-sample result on the test window"""
+    parameters = {}
+    if grid:
+        train = prices[window.train_start:window.train_end]
+        table = run_sweep(spec, train, grid, periods_per_year=periods_per_year, rank_by=rank_by, max_workers=1)
+        parameters = {key: table.iloc[0][key] for key in grid}
+        spec = apply_parameters(spec, parameters)
+
+    # Indicators see the train window too, trading only happens on the test window
+    history = prices[window.train_start:window.test_end]
+    signals = build_signals(spec, history)[window.test_start - window.train_start:]
+    result = run_backtest(
+        prices[window.test_start:window.test_end],
+        signals,
+        backtest_config(spec, periods_per_year)
+    )
+    return parameters, result
+
+def stitch_results(
+    results: List[BacktestResult],
+    initial_capital: float,
+    periods_per_year: float
+) -> BacktestResult:
+    """One out-of-sample result from consecutive test windows, trade indices refer to the stitched series"""
+    returns = np.concatenate([result.returns for result in results])
+    equity = initial_capital * np.cumprod(1.0 + returns)
+
+    lengths = [result.returns.size for result in results]
+    offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+    trades = np.concatenate([result.trades for result in results])
+    trade_offsets = np.repeat(offsets, [result.trades.size for result in results])
+    trades["entry_index"] += trade_offsets
+    trades["exit_index"] += trade_offsets
+
+    positions = np.concatenate([result.positions for result in results])
+    return BacktestResult(
+        positions=positions,
+        exposure=np.concatenate([result.exposure for result in results]),
+        returns=returns,
+        equity=equity,
+        trades=trades,
+        stats=compute_stats(returns, equity, positions, trades, initial_capital, periods_per_year)
+    )
+
+def run_walk_forward(
+    spec: StrategySpec,
+    timestamps: np.ndarray,
+    prices: np.ndarray,
+    train_days: int,
+    test_days: int,
+    step_days: Optional[int] = None,
+    grid: Optional[Dict[str, List[float]]] = None,
+    periods_per_year: float = 252.0,
+    rank_by: str = "sharpe_ratio",
+    max_workers: Optional[int] = None
+) -> tuple:
+    """
+    Run every walk-forward window and stitch the out-of-sample results.
+
+    Returns (result, out_of_sample_index, windows_table): the stitched
+    BacktestResult, the index of each of its bars in the full series (to
+    slice timestamps and prices for the log) and one row per window with its
+    periods, picked parameters and out-of-sample stats.
+    """
+    timestamps = np.asarray(timestamps, dtype="datetime64[ns]")
+    prices = np.asarray(prices, dtype=np.float64)
+    windows = walk_forward_windows(timestamps, train_days, test_days, step_days)
+    if not windows:
+        raise ValueError("Not enough data for a single walk-forward window")
+
+    workers = min(len(windows), max_workers or os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        evaluated = list(pool.map(
+            lambda window: evaluate_window(spec, prices, window, grid, periods_per_year, rank_by),
+            windows
+        ))
+
+    results = [result for _, result in evaluated]
+    stitched = stitch_results(results, spec.initial_capital, periods_per_year)
+    index = np.concatenate([np.arange(window.test_start, window.test_end) for window in windows])
+
+    rows = []
+    for window, (parameters, result) in zip(windows, evaluated):
+        rows.append({
+            "train_from": timestamps[window.train_start],
+            "test_from": timestamps[window.test_start],
+            "test_to": timestamps[window.test_end - 1],
+            **parameters,
+            "total_return": result.stats["total_return"],
+            "sharpe_ratio": result.stats["sharpe_ratio"],
+            "max_drawdown": result.stats["max_drawdown"],
+            "num_trades": result.stats["num_trades"],
+        })
+    return stitched, index, pd.DataFrame(rows)
+
+def format_walk_forward_summary(table: pd.DataFrame) -> str:
+    """Per-window table for the backtest log"""
+    lines = [f"Walk-forward: {len(table)} out-of-sample windows"]
+    lines.append(table.to_string(index=False, float_format=lambda value: f"{value:.4f}"))
+    profitable = (table["total_return"] > 0).mean() if len(table) else 0.0
+    lines.append(f"profitable_windows: {profitable:.4f}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,108 @@
+"""
+Backtest logs for the report LLM.
+
+Strategies run in-process on the vectorized engine have no script writing
+their own log, the log is built here from the BacktestResult instead. It
+covers the same ground the report prompt asks generated scripts for:
+capital, returns, risk ratios, drawdown, trade statistics and period.
+"""
+from typing import List, Optional
+
+import numpy as np
+
+from src.core.backtesting.executor import BacktestResult
+
+def _format_value(value) -> str:
+    if isinstance(value, (float, np.floating)):
+        return f"{value:.4f}" if np.isfinite(value) else str(value)
+    return str(value)
+
+def _format_time(timestamp: np.datetime64) -> str:
+    return str(np.datetime_as_string(np.datetime64(timestamp, "s"), unit="s")).replace("T", " ")
+
+def drawdown_period(equity: np.ndarray, timestamps: np.ndarray) -> Optional[tuple]:
+    """Peak, trough and recovery timestamps of the maximum drawdown, recovery is None if never recovered"""
+    peaks = np.maximum.accumulate(equity)
+    drawdown = equity / peaks - 1.0
+    trough = int(np.argmin(drawdown))
+    if drawdown[trough] >= 0:
+        return None
+    peak = int(np.argmax(equity[:trough + 1]))
+    recovered = np.nonzero(equity[trough:] >= equity[peak])[0]
+    recovery = timestamps[trough + recovered[0]] if recovered.size else None
+    return timestamps[peak], timestamps[trough], recovery
+
+def monthly_returns(equity: np.ndarray, timestamps: np.ndarray, initial_capital: float) -> List[tuple]:
+    """(month, return) pairs from month-end equity"""
+    months = np.asarray(timestamps, dtype="datetime64[M]")
+    boundaries = np.nonzero(months[1:] != months[:-1])[0]
+    month_end = np.append(boundaries, months.size - 1)
+    closing = equity[month_end]
+    opening = np.insert(closing[:-1], 0, initial_capital)
+    return list(zip(months[month_end].astype(str), closing / opening - 1.0))
+
+def format_backtest_log(
+    result: BacktestResult,
+    timestamps: np.ndarray,
+    prices: np.ndarray,
+    strategy_title: Optional[str] = None,
+    strategy_spec: Optional[dict] = None,
+    symbols: Optional[List[str]] = None
+) -> str:
+    """Plain text log of a 1-D backtest result, symbols name the instrument of each trade row of a portfolio"""
+    timestamps = np.asarray(timestamps, dtype="datetime64[ns]")
+    stats = result.stats
+    lines = []
+    if strategy_title:
+        lines.append(f"Strategy: {strategy_title}")
+    if strategy_spec:
+        lines.append(f"Strategy spec: {strategy_spec}")
+    lines.append(f"Time period: {_format_time(timestamps[0])} to {_format_time(timestamps[-1])} ({timestamps.size} bars)")
+    lines.append(f"Buy and hold return: {_format_value(prices[-1] / prices[0] - 1.0)}")
+    lines.append("")
+
+    lines.append("Performance summary")
+    for name, value in stats.items():
+        lines.append(f"{name}: {_format_value(value)}")
+    lines.append(f"net_profit: {_format_value(stats['final_equity'] - stats['initial_capital'])}")
+
+    period = drawdown_period(result.equity, timestamps)
+    if period:
+        peak, trough, recovery = period
+        lines.append(
+            f"max_drawdown_period: peak {_format_time(peak)}, trough {_format_time(trough)}, "
+            f"recovered {_format_time(recovery) if recovery is not None else 'never'}"
+        )
+    lines.append("")
+
+    trades = result.trades
+    lines.append("Trades")
+    if trades.size:
+        returns = trades["return"]
+        holding = trades["exit_index"] - trades["entry_index"] + 1
+        winners, losers = returns[returns > 0], returns[returns <= 0]
+        lines.append(f"long_trades: {int((trades['direction'] > 0).sum())}")
+        lines.append(f"short_trades: {int((trades['direction'] < 0).sum())}")
+        lines.append(f"largest_win: {_format_value(returns.max())}")
+        lines.append(f"largest_loss: {_format_value(returns.min())}")
+        lines.append(f"avg_win: {_format_value(winners.mean() if winners.size else 0.0)}")
+        lines.append(f"avg_loss: {_format_value(losers.mean() if losers.size else 0.0)}")
+        lines.append(f"avg_holding_bars: {_format_value(float(holding.mean()))}")
+        for trade in trades[-20:]:
+            lines.append(
+                (f"{symbols[trade['row']]} " if symbols else "") +
+                f"{'LONG' if trade['direction'] > 0 else 'SHORT'} "
+                f"entry {_format_time(timestamps[max(trade['entry_index'] - 1, 0)])} @ {trade['entry_price']:.2f}, "
+                f"exit {_format_time(timestamps[trade['exit_index']])} @ {trade['exit_price']:.2f}, "
+                f"return {_format_value(trade['return'])}"
+            )
+        if trades.size > 20:
+            lines.append(f"... last 20 of {trades.size} trades shown")
+    else:
+        lines.append("No trades")
+    lines.append("")
+
+    lines.append("Monthly returns")
+    for month, value in monthly_returns(result.equity, timestamps, stats["initial_capital"]):
+        lines.append(f"{month}: {_format_value(value)}")
+    return "\n".join(lines) + "\n"
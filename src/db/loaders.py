@@ -0,0 +1,98 @@
+from datetime import date
+from typing import Dict, Generator, Optional
+
+from src.db.base import get_db_connection, execute_query_single
+
+from src.utils.logger import get_logger
+logger = get_logger(__name__)
+
+class RequestLoader:
+    """
+    Request-scoped database access shared by the auth and rate limit
+    dependencies and the route itself.
+
+    The connection is opened lazily on first use and closed when the request
+    ends, so a request that never touches the database never opens one.
+    Lookups are memoized, a user requested by several dependencies is only
+    loaded once. Usable as `with loader as conn:` in place of `get_db`.
+    """
+
+    def __init__(self):
+        self._conn = None
+        self._user_contexts: Dict[str, Optional[dict]] = {}
+
+    @property
+    def conn(self):
+        if self._conn is None:
+            self._conn = get_db_connection()
+        return self._conn
+
+    def __enter__(self):
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        # The connection outlives the block and is closed with the request,
+        # roll back so a failed block does not poison later queries
+        if exc_type is not None and self._conn is not None:
+            self._conn.rollback()
+        return False
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def get_user_context(self, user_id: str) -> Optional[dict]:
+        """
+        Load a user together with their subscription's daily report limit and
+        today's report count in a single round-trip.
+
+        Returns {"user": ..., "plan_reports_per_day": ..., "reports_today": ...}
+        or None if the user does not exist. plan_reports_per_day is None when
+        the user has no active subscription.
+        """
+        user_id = str(user_id)
+        if user_id not in self._user_contexts:
+            row = execute_query_single(
+                self.conn,
+                """
+                WITH plan AS (
+                    SELECT sp.reports_per_day
+                    FROM user_subscriptions us
+                    JOIN subscription_plans sp ON us.plan_id = sp.id
+                    WHERE us.user_id = %(user_id)s
+                    AND us.is_active = true
+                    AND us.start_date <= CURRENT_TIMESTAMP
+                    AND us.end_date >= CURRENT_TIMESTAMP
+                    LIMIT 1
+                ),
+                usage AS (
+                    SELECT count FROM daily_report_counts
+                    WHERE user_id = %(user_id)s AND date = %(today)s
+                )
+                SELECT u.*,
+                       (SELECT reports_per_day FROM plan) AS plan_reports_per_day,
+                       COALESCE((SELECT count FROM usage), 0) AS reports_today
+                FROM users u
+                WHERE u.id = %(user_id)s
+                """,
+                {"user_id": user_id, "today": date.today()}
+            )
+            context = None
+            if row:
+                user = dict(row)
+                context = {
+                    "plan_reports_per_day": user.pop("plan_reports_per_day"),
+                    "reports_today": user.pop("reports_today"),
+                    "user": user
+                }
+            self._user_contexts[user_id] = context
+        return self._user_contexts[user_id]
+
+def get_request_loader() -> Generator[RequestLoader, None, None]:
+    """FastAPI dependency, every dependency of a request shares the same loader"""
+    loader = RequestLoader()
+    try:
+        yield loader
+    finally:
+        loader.close()
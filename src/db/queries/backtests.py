@@ -1,14 +1,23 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
+from datetime import datetime
 from uuid import UUID
+from psycopg2 import sql
+from psycopg2.extras import Json
 import logging
-import asyncio
 import shortuuid
 
 from src.db.base import execute_query, execute_query_single
+from src.constants.backtests import BACKTEST_TERMINAL_STATUSES
+from src.infrastructure.queue.event_loop import run_async
 
 from src.api.services.postbacks import (
     post_backtest_update
 )
+from src.api.services.shared_backtests import invalidate_shared_backtest
+from src.api.services.past_backtests import (
+    record_backtest,
+    rename_backtest
+)
 
 from src.utils.logger import get_logger
 logger = get_logger(__name__)
@@ -21,9 +30,10 @@ def create_backtest_request(conn, user_id: UUID, backtest: dict) -> dict:
             """
             INSERT INTO backtest_requests (
                 user_id, instrument_symbol, from_date, to_date,
-                strategy_description, strategy_title
+                strategy_description, strategy_title, parameter_grid, walk_forward,
+                portfolio
             )
-            VALUES (%s, %s, %s, %s, %s, %s)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
             RETURNING *
             """,
             (
@@ -32,27 +42,83 @@ def create_backtest_request(conn, user_id: UUID, backtest: dict) -> dict:
                 backtest['from_date'],
                 backtest['to_date'],
                 backtest['strategy_description'],
-                backtest.get('strategy_title')
+                backtest.get('strategy_title'),
+                Json(backtest['parameter_grid']) if backtest.get('parameter_grid') else None,
+                Json(backtest['walk_forward']) if backtest.get('walk_forward') else None,
+                Json(backtest['portfolio']) if backtest.get('portfolio') else None
             )
         )
         conn.commit()
+        record_backtest(user_id, result['id'], result['strategy_title'], result['created_at'])
         return result
     except Exception as e:
         conn.rollback()
         raise Exception(f"Failed to create backtest request: {str(e)}")
 
-def get_user_backtests(conn, user_id: UUID) -> List[dict]:
-    """Get all backtest requests for a user"""
-    result = execute_query(
-        conn,
-        """
-        SELECT * FROM backtest_requests
-        WHERE user_id = %s
-        ORDER BY created_at DESC
-        """,
-        (user_id,)
+# Columns that can be projected by the backtest listing
+BACKTEST_LIST_FIELDS = (
+    "id",
+    "user_id",
+    "instrument_symbol",
+    "from_date",
+    "to_date",
+    "strategy_description",
+    "strategy_title",
+    "python_script_url",
+    "validation_data_url",
+    "full_data_url",
+    "log_file_url",
+    "report_url",
+    "ready_for_report",
+    "generated_report",
+    "status",
+    "error_message",
+    "created_at",
+    "updated_at",
+    "share_id"
+)
+
+def get_user_backtests(
+    conn,
+    user_id: UUID,
+    limit: Optional[int] = None,
+    after: Optional[Tuple[datetime, str]] = None,
+    columns: Optional[List[str]] = None
+) -> List[dict]:
+    """
+    Get backtest requests for a user, newest first.
+
+    Pages with a keyset on (created_at, id), `after` being the position of
+    the last row of the previous page, and only selects the requested
+    columns. id and created_at are always selected as they form the keyset.
+    """
+    columns = [
+        column for column in (columns or BACKTEST_LIST_FIELDS)
+        if column in BACKTEST_LIST_FIELDS
+    ]
+    for column in ("created_at", "id"):
+        if column not in columns:
+            columns.insert(0, column)
+
+    conditions = [sql.SQL("user_id = %s")]
+    params = [user_id]
+    if after:
+        conditions.append(sql.SQL("(created_at, id) < (%s, %s)"))
+        params.extend(after)
+
+    query = sql.SQL("""
+        SELECT {fields} FROM backtest_requests
+        WHERE {conditions}
+        ORDER BY created_at DESC, id DESC
+        """).format(
+        fields=sql.SQL(", ").join(sql.Identifier(column) for column in columns),
+        conditions=sql.SQL(" AND ").join(conditions)
     )
-    return result
+    if limit:
+        query = query + sql.SQL(" LIMIT %s")
+        params.append(limit)
+
+    return execute_query(conn, query, tuple(params)) or []
 
 def get_backtest_by_id(conn, backtest_id: UUID) -> Optional[dict]:
     """Get a specific backtest request"""
@@ -70,6 +136,56 @@ def get_backtest_by_id(conn, backtest_id: UUID) -> Optional[dict]:
         logger.error(f"Error in get_backtest_by_id: {e}")
         return None
 
+def get_backtest_statuses(
+    conn,
+    user_id: UUID,
+    ids: Optional[List[UUID]] = None,
+    since: Optional[datetime] = None
+) -> List[dict]:
+    """
+    Get compact status rows for many of a user's backtests in one query.
+
+    Polls the given ids, or every in-flight backtest when no ids are given.
+    With a `since` watermark only backtests updated after it are returned,
+    which also surfaces backtests that have just reached a terminal status.
+    """
+    conditions = ["user_id = %s"]
+    params = [user_id]
+    if ids:
+        conditions.append("id = ANY(%s::uuid[])")
+        params.append([str(backtest_id) for backtest_id in ids])
+    if since:
+        conditions.append("updated_at > %s")
+        params.append(since)
+    elif not ids:
+        conditions.append("status NOT IN %s")
+        params.append(BACKTEST_TERMINAL_STATUSES)
+
+    return execute_query(
+        conn,
+        f"""
+        SELECT id, status, ready_for_report, generated_report,
+               error_message, updated_at
+        FROM backtest_requests
+        WHERE {" AND ".join(conditions)}
+        ORDER BY updated_at
+        """,
+        tuple(params)
+    ) or []
+
+def get_status_watermark(conn, lag: float) -> Optional[datetime]:
+    """
+    Database clock minus `lag` seconds. Read before the statuses it covers, an
+    update that commits after them has a later updated_at unless its statement
+    ran more than `lag` seconds before its commit.
+    """
+    result = execute_query_single(
+        conn,
+        "SELECT clock_timestamp() - make_interval(secs => %s) AS watermark",
+        (lag,)
+    )
+    return result['watermark'] if result else None
+
 def update_backtest_status(
     conn,
     backtest_id: UUID,
@@ -88,7 +204,7 @@ def update_backtest_status(
                 error_message = %s,
                 ready_for_report = %s,
                 generated_report = %s,
-                updated_at = CURRENT_TIMESTAMP
+                updated_at = clock_timestamp()
             WHERE id = %s
             RETURNING *
             """,
@@ -99,7 +215,7 @@ def update_backtest_status(
         logger.info(f"Successfully updated backtest status: {result}")
 
         # Broadcast the backtest update asynchronously
-        asyncio.run(post_backtest_update(backtest_id=backtest_id))
+        run_async(post_backtest_update(backtest_id=backtest_id))
 
         logger.info("Broadcast backtest update initiated.")
         return result
@@ -117,7 +233,9 @@ def update_backtest_urls(
     full_data_url: Optional[str] = None,
     log_file_url: Optional[str] = None,
     report_url: Optional[str] = None,
-    preview_image_url: Optional[str] = None
+    preview_image_url: Optional[str] = None,
+    sweep_results_url: Optional[str] = None,
+    sweep_heatmap_url: Optional[str] = None
 ) -> dict:
     """Update backtest file URLs"""
     try:
@@ -131,7 +249,9 @@ def update_backtest_urls(
                 log_file_url = COALESCE(%s, log_file_url),
                 report_url = COALESCE(%s, report_url),
                 preview_image_url = COALESCE(%s, preview_image_url),
-                updated_at = CURRENT_TIMESTAMP
+                sweep_results_url = COALESCE(%s, sweep_results_url),
+                sweep_heatmap_url = COALESCE(%s, sweep_heatmap_url),
+                updated_at = clock_timestamp()
             WHERE id = %s
             RETURNING *
             """,
@@ -142,28 +262,127 @@ def update_backtest_urls(
                 log_file_url,
                 report_url,
                 preview_image_url,
+                sweep_results_url,
+                sweep_heatmap_url,
                 backtest_id
             )
         )
         conn.commit()
-        asyncio.run(post_backtest_update(backtest_id=backtest_id))
+        run_async(post_backtest_update(backtest_id=backtest_id))
         return result
     except Exception as e:
         conn.rollback()
         logger.warning(f'Error updating backtest file: {e}')
 
-def update_backtest_preview_image_url(conn, backtest_id: UUID, preview_image_url: str) -> dict:
-    """Update backtest preview image URL"""
-    return execute_query_single(
+def update_backtest_title(conn, backtest_id: UUID, strategy_title: str) -> dict:
+    """Update backtest strategy title and broadcast it to the user"""
+    try:
+        result = execute_query_single(
+            conn,
+            """
+            UPDATE backtest_requests
+            SET strategy_title = %s,
+                updated_at = clock_timestamp()
+            WHERE id = %s
+            RETURNING *
+            """,
+            (strategy_title, backtest_id)
+        )
+        conn.commit()
+        rename_backtest(result['user_id'], backtest_id, strategy_title)
+        invalidate_shared_backtest(result['share_id'])
+        run_async(post_backtest_update(backtest_id=backtest_id))
+        return result
+    except Exception as e:
+        conn.rollback()
+        logger.warning(f'Error updating title for backtest {backtest_id}: {e}')
+        return None
+
+def update_backtest_strategy_spec(conn, backtest_id: UUID, strategy_spec: dict) -> dict:
+    """Store the structured strategy spec a backtest is executed from"""
+    try:
+        result = execute_query_single(
+            conn,
+            """
+            UPDATE backtest_requests
+            SET strategy_spec = %s,
+                updated_at = clock_timestamp()
+            WHERE id = %s
+            RETURNING *
+            """,
+            (Json(strategy_spec), backtest_id)
+        )
+        conn.commit()
+        return result
+    except Exception as e:
+        conn.rollback()
+        logger.warning(f'Error updating strategy spec for backtest {backtest_id}: {e}')
+        return None
+
+def update_backtest_result_stats(conn, backtest_id: UUID, result_stats: dict) -> dict:
+    """Store the headline stats parsed from the log of a script-based backtest"""
+    try:
+        result = execute_query_single(
+            conn,
+            """
+            UPDATE backtest_requests
+            SET result_stats = %s,
+                updated_at = clock_timestamp()
+            WHERE id = %s
+            RETURNING *
+            """,
+            (Json(result_stats), backtest_id)
+        )
+        conn.commit()
+        return result
+    except Exception as e:
+        conn.rollback()
+        logger.warning(f'Error updating result stats for backtest {backtest_id}: {e}')
+        return None
+
+def update_backtest_result_cache_key(conn, backtest_id: UUID, result_cache_key: str) -> dict:
+    """Store the execution result cache key of a script-based backtest"""
+    try:
+        result = execute_query_single(
+            conn,
+            """
+            UPDATE backtest_requests
+            SET result_cache_key = %s,
+                updated_at = clock_timestamp()
+            WHERE id = %s
+            RETURNING *
+            """,
+            (result_cache_key, backtest_id)
+        )
+        conn.commit()
+        return result
+    except Exception as e:
+        conn.rollback()
+        logger.warning(f'Error updating result cache key for backtest {backtest_id}: {e}')
+        return None
+
+def update_backtest_preview_image_url(
+    conn,
+    backtest_id: UUID,
+    preview_image_url: str,
+    preview_report_hash: Optional[str] = None
+) -> dict:
+    """Update backtest preview image URL and the hash of the report it was rendered from"""
+    result = execute_query_single(
         conn,
         """
         UPDATE backtest_requests 
         SET preview_image_url = %s,
-            is_public = true
+            preview_report_hash = %s
         WHERE id = %s
+        RETURNING share_id
         """,
-        (preview_image_url, backtest_id)
+        (preview_image_url, preview_report_hash, backtest_id)
     )
+    conn.commit()
+    if result:
+        invalidate_shared_backtest(result['share_id'])
+    return result
 
 def get_grouped_backtests(conn, user_id: UUID) -> dict:
     """Get backtests grouped by time periods"""
@@ -222,15 +441,40 @@ def get_grouped_backtests(conn, user_id: UUID) -> dict:
         (user_id,)
     )
 
-def get_grouped_backtests_search(conn, user_id: UUID, search_term: str) -> dict:
-    """Get backtests grouped by time periods with search functionality"""
+def get_grouped_backtests_search(conn, user_id: UUID, search_term: str, limit: int = 50) -> dict:
+    """
+    Search a user's backtests and group the best matches by time periods.
+
+    Matches full-text on the generated search_vector column (title, symbol
+    and description) and fuzzily on the title with pg_trgm, both served by
+    per-user GIN indexes. Results are ranked and capped at `limit`.
+    """
     return execute_query_single(
         conn,
         """
-        WITH grouped_backtests AS (
+        WITH matches AS (
             SELECT 
                 id,
                 strategy_title as name,
+                created_at,
+                ts_rank(search_vector, query)
+                    + word_similarity(%(term)s, COALESCE(strategy_title, '')) as rank
+            FROM backtest_requests,
+                 websearch_to_tsquery('english', %(term)s) query
+            WHERE user_id = %(user_id)s
+            AND (
+                search_vector @@ query
+                OR %(term)s <%% strategy_title
+                OR instrument_symbol ILIKE %(pattern)s
+            )
+            ORDER BY rank DESC, created_at DESC
+            LIMIT %(limit)s
+        ),
+        grouped_backtests AS (
+            SELECT 
+                id,
+                name,
+                rank,
                 DATE(created_at) as date,
                 CASE
                     WHEN DATE(created_at) >= DATE_TRUNC('week', CURRENT_DATE) THEN 'thisWeek'
@@ -238,14 +482,7 @@ def get_grouped_backtests_search(conn, user_id: UUID, search_term: str) -> dict:
                          AND DATE(created_at) < DATE_TRUNC('week', CURRENT_DATE) THEN 'lastMonth'
                     ELSE 'older'
                 END as time_group
-            FROM backtest_requests
-            WHERE user_id = %s
-            AND (
-                LOWER(strategy_title) LIKE LOWER(%s)
-                OR LOWER(strategy_description) LIKE LOWER(%s)
-                OR LOWER(instrument_symbol) LIKE LOWER(%s)
-            )
-            ORDER BY created_at DESC
+            FROM matches
         )
         SELECT
             jsonb_build_object(
@@ -255,7 +492,7 @@ def get_grouped_backtests_search(conn, user_id: UUID, search_term: str) -> dict:
                             'id', id,
                             'name', name,
                             'date', TO_CHAR(date, 'YYYY-MM-DD')
-                        )
+                        ) ORDER BY rank DESC
                     ) FILTER (WHERE time_group = 'thisWeek'),
                     '[]'
                 ),
@@ -265,7 +502,7 @@ def get_grouped_backtests_search(conn, user_id: UUID, search_term: str) -> dict:
                             'id', id,
                             'name', name,
                             'date', TO_CHAR(date, 'YYYY-MM-DD')
-                        )
+                        ) ORDER BY rank DESC
                     ) FILTER (WHERE time_group = 'lastMonth'),
                     '[]'
                 ),
@@ -275,40 +512,68 @@ def get_grouped_backtests_search(conn, user_id: UUID, search_term: str) -> dict:
                             'id', id,
                             'name', name,
                             'date', TO_CHAR(date, 'YYYY-MM-DD')
-                        )
+                        ) ORDER BY rank DESC
                     ) FILTER (WHERE time_group = 'older'),
                     '[]'
                 )
             ) as result
         FROM grouped_backtests
         """,
-        (
-            user_id,
-            f"%{search_term}%",
-            f"%{search_term}%",
-            f"%{search_term}%"
-        )
+        {
+            "user_id": user_id,
+            "term": search_term,
+            "pattern": f"%{escape_like(search_term)}%",
+            "limit": limit
+        }
     )
 
+def escape_like(term: str) -> str:
+    """Escape LIKE wildcards so the term is matched literally"""
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
 def generate_share_id() -> str:
     """Generate a short unique ID for sharing"""
     return shortuuid.uuid()[:8]  # 8 characters should be sufficient
 
 def update_backtest_share_id(conn, backtest_id: UUID) -> str:
-    """Update or create share_id for backtest"""
-    share_id = generate_share_id()
-    execute_query_single(
+    """Make a backtest public, reusing its share_id if it already has one"""
+    result = execute_query_single(
         conn,
         """
-        UPDATE backtest_requests 
-        SET share_id = %s,
+        UPDATE backtest_requests
+        SET share_id = COALESCE(share_id, %s),
             is_public = true
         WHERE id = %s
         RETURNING share_id
         """,
-        (share_id, backtest_id)
+        (generate_share_id(), backtest_id)
+    )
+    conn.commit()
+    share_id = result['share_id'] if result else None
+    invalidate_shared_backtest(share_id)
+    return share_id
+
+def revoke_backtest_share(conn, backtest_id: UUID, user_id: UUID) -> Optional[str]:
+    """Stop sharing a backtest, returns the revoked share_id if it was shared"""
+    previous = execute_query_single(
+        conn,
+        """
+        UPDATE backtest_requests b
+        SET share_id = NULL,
+            is_public = false
+        FROM (
+            SELECT id, share_id FROM backtest_requests
+            WHERE id = %s AND user_id = %s
+            FOR UPDATE
+        ) previous
+        WHERE b.id = previous.id
+        RETURNING previous.share_id
+        """,
+        (backtest_id, user_id)
     )
     conn.commit()
+    share_id = previous['share_id'] if previous else None
+    invalidate_shared_backtest(share_id)
     return share_id
 
 def get_backtest_by_share_id(conn, share_id: str) -> Optional[dict]:
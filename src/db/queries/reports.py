@@ -0,0 +1,34 @@
+from typing import List, Optional, Tuple
+from datetime import datetime
+from uuid import UUID
+
+from src.db.base import execute_query
+
+def get_user_reports(
+    conn,
+    user_id: UUID,
+    limit: Optional[int] = None,
+    after: Optional[Tuple[datetime, str]] = None
+) -> List[dict]:
+    """
+    Get generated reports for a user, newest first.
+
+    Only selects the report columns and pages with a keyset on
+    (created_at, id), served by the partial index on generated reports.
+    """
+    query = """
+        SELECT id, strategy_title, status, report_url, created_at, updated_at
+        FROM backtest_requests
+        WHERE user_id = %s
+        AND generated_report
+        """
+    params = [user_id]
+    if after:
+        query += " AND (created_at, id) < (%s, %s)"
+        params.extend(after)
+    query += " ORDER BY created_at DESC, id DESC"
+    if limit:
+        query += " LIMIT %s"
+        params.append(limit)
+
+    return execute_query(conn, query, tuple(params)) or []
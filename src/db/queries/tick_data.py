@@ -1,9 +1,12 @@
+import psycopg2.extensions
 from psycopg2 import sql
-from typing import List
+from typing import List, Tuple
 from datetime import datetime
+import numpy as np
 import pandas as pd
 
 from src.db.base import execute_query
+from src.core.backtesting.executor import forward_fill
 
 from src.utils.logger import get_logger
 logger = get_logger(__name__)
@@ -96,6 +99,84 @@ def fetch_tick_data(
         logger.warning(f'Error fetching tick data: {e}')
         return pd.DataFrame()
 
+def fetch_price_series(
+    conn,
+    instrument_symbol: str,
+    from_date: datetime,
+    to_date: datetime
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Fetch the price series of an instrument as numpy arrays for the built-in engine.
+
+    Rows come back as plain tuples instead of dicts and skip the DataFrame, the
+    arrays are loaded once and sliced by every window that runs on them.
+
+    Returns:
+        (timestamps, prices): naive UTC datetime64[ns] and float64 arrays
+    """
+    with conn.cursor(cursor_factory=psycopg2.extensions.cursor) as cur:
+        cur.execute(
+            """
+            SELECT time, price
+            FROM tick_data
+            WHERE ticker = %s
+            AND time BETWEEN %s AND %s
+            AND price IS NOT NULL
+            ORDER BY time
+            """,
+            (instrument_symbol, from_date, to_date)
+        )
+        rows = cur.fetchall()
+
+    if not rows:
+        return np.empty(0, dtype="datetime64[ns]"), np.empty(0, dtype=np.float64)
+    times, prices = zip(*rows)
+    timestamps = pd.to_datetime(list(times), utc=True).tz_localize(None).to_numpy(dtype="datetime64[ns]")
+    return timestamps, np.array(prices, dtype=np.float64)
+
+def fetch_price_panel(
+    conn,
+    instrument_symbols: List[str],
+    from_date: datetime,
+    to_date: datetime
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Fetch the prices of several instruments in one query as an aligned panel.
+
+    Every instrument gets a row on the union of all timestamps, forward filled
+    from its last price. Bars before an instrument's first price stay NaN.
+
+    Returns:
+        (timestamps, prices): naive UTC datetime64[ns] array and a float64
+        (symbols, bars) array with rows in the order of instrument_symbols
+    """
+    with conn.cursor(cursor_factory=psycopg2.extensions.cursor) as cur:
+        cur.execute(
+            """
+            SELECT ticker, time, price
+            FROM tick_data
+            WHERE ticker = ANY(%s)
+            AND time BETWEEN %s AND %s
+            AND price IS NOT NULL
+            """,
+            (list(instrument_symbols), from_date, to_date)
+        )
+        rows = cur.fetchall()
+
+    if not rows:
+        return np.empty(0, dtype="datetime64[ns]"), np.empty((len(instrument_symbols), 0), dtype=np.float64)
+    tickers, times, prices = zip(*rows)
+    timestamps, bar = np.unique(
+        pd.to_datetime(list(times), utc=True).tz_localize(None).to_numpy(dtype="datetime64[ns]"),
+        return_inverse=True
+    )
+    positions = {symbol: row for row, symbol in enumerate(instrument_symbols)}
+    symbol = np.fromiter((positions[ticker] for ticker in tickers), dtype=np.int64, count=len(tickers))
+
+    panel = np.full((len(instrument_symbols), timestamps.size), np.nan)
+    panel[symbol, bar] = np.array(prices, dtype=np.float64)
+    return timestamps, forward_fill(panel)
+
 def get_column_names(result_set):
     """Helper function to get column names from result set description"""
     return [desc[0] for desc in result_set.description] if result_set.description else []
\ No newline at end of file
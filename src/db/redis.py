@@ -26,6 +26,22 @@ class RedisClient:
         """Check if a key exists in Redis."""
         return self.client.exists(key) > 0
 
+    def expire(self, key: str, seconds: int):
+        """Set an expiration time on a key."""
+        return self.client.expire(key, seconds)
+
+    def zrevrange(self, key: str, start: int, end: int, withscores: bool = False):
+        """Get members of a sorted set by rank, highest score first."""
+        return self.client.zrevrange(key, start, end, withscores=withscores)
+
+    def hmget(self, key: str, fields: list):
+        """Get the values of several hash fields."""
+        return self.client.hmget(key, fields)
+
+    def pipeline(self, transaction: bool = True):
+        """Create a pipeline to batch several commands in one round-trip."""
+        return self.client.pipeline(transaction=transaction)
+
     def flushdb(self):
         """Flush the entire Redis database."""
         return self.client.flushdb()
@@ -0,0 +1,115 @@
+import asyncio
+import importlib.util
+import weakref
+from typing import Dict, Tuple
+
+import httpx
+
+from src.config.settings import settings
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# HTTP/2 needs the optional h2 package, fall back to HTTP/1.1 keep-alive without it
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Per-service pool settings, each service talks to a single host so the
+# connection limits act as per-host limits
+CLIENT_TIMEOUTS = {
+    "local_llm": 30.0,
+    "preview": 60.0,
+    "postback": 10.0,
+    "downloads": 120.0,
+}
+
+def _build_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=settings.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY
+    )
+
+def _build_timeout(name: str) -> httpx.Timeout:
+    return httpx.Timeout(
+        CLIENT_TIMEOUTS.get(name, settings.HTTP_DEFAULT_TIMEOUT),
+        connect=settings.HTTP_CONNECT_TIMEOUT
+    )
+
+class HTTPClientRegistry:
+    """
+    Process-wide registry of pooled HTTP clients, one per service.
+
+    Async clients are bound to the event loop they were created on, so a
+    client is only reused while its loop is alive. Sync clients are shared
+    by the whole process.
+    """
+
+    def __init__(self):
+        self._async_clients: Dict[str, Tuple[weakref.ref, httpx.AsyncClient]] = {}
+        self._sync_clients: Dict[str, httpx.Client] = {}
+
+    def get_async_client(self, name: str) -> httpx.AsyncClient:
+        """Get the pooled async client for a service on the running event loop"""
+        loop = asyncio.get_running_loop()
+        entry = self._async_clients.get(name)
+        if entry:
+            loop_ref, client = entry
+            if loop_ref() is loop and not client.is_closed:
+                return client
+
+        client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            limits=_build_limits(),
+            timeout=_build_timeout(name)
+        )
+        self._async_clients[name] = (weakref.ref(loop), client)
+        return client
+
+    def get_client(self, name: str) -> httpx.Client:
+        """Get the pooled sync client for a service"""
+        client = self._sync_clients.get(name)
+        if client is None or client.is_closed:
+            client = httpx.Client(
+                http2=HTTP2_AVAILABLE,
+                limits=_build_limits(),
+                timeout=_build_timeout(name)
+            )
+            self._sync_clients[name] = client
+        return client
+
+    def download_to_file(self, url: str, path: str, name: str = "downloads"):
+        """Stream a URL to a local file using a pooled sync client"""
+        with self.get_client(name).stream("GET", url) as response:
+            response.raise_for_status()
+            with open(path, 'wb') as file:
+                for chunk in response.iter_bytes():
+                    file.write(chunk)
+
+    async def startup(self):
+        """Create the async clients eagerly on the running event loop"""
+        for name in CLIENT_TIMEOUTS:
+            self.get_async_client(name)
+        logger.info(f"HTTP client pools initialized (http2={HTTP2_AVAILABLE})")
+
+    async def aclose(self):
+        """Close all async clients that belong to the running event loop and all sync clients"""
+        loop = asyncio.get_running_loop()
+        for name, (loop_ref, client) in list(self._async_clients.items()):
+            if loop_ref() is loop:
+                await client.aclose()
+            self._async_clients.pop(name, None)
+        self.close()
+
+    def close(self):
+        """Close sync clients and drop async clients, whose loops may already be gone"""
+        for client in self._sync_clients.values():
+            client.close()
+        self._sync_clients.clear()
+        self._async_clients.clear()
+
+    def reset(self):
+        """Forget clients inherited from a parent process without closing shared sockets"""
+        self._sync_clients.clear()
+        self._async_clients.clear()
+
+http_clients = HTTPClientRegistry()
@@ -1,15 +1,19 @@
 import httpx
+import json
 from logging import getLogger
+from typing import AsyncIterator
 from src.utils.metrics import (
     LLM_REQUEST_COUNT,
     LLM_REQUEST_DURATION,
     track_time
 )
 from src.config.settings import settings
+from src.infrastructure.http.clients import http_clients
 from src.infrastructure.llm.prompts import (
     backtest_script_system_prompt, 
     strategy_title_system_prompt,
-    backtest_report_system_prompt_v3
+    backtest_report_system_prompt_v3,
+    strategy_spec_system_prompt
 )
 
 logger = getLogger()
@@ -24,14 +28,14 @@ class CustomLLMClient:
 
     async def _send_request(self, payload: dict) -> dict:
         try:
-            async with httpx.AsyncClient(timeout=httpx.Timeout(30.0)) as client:
-                response = await client.post(
-                    f"{self.base_url}/v1/chat/completions",
-                    headers={"Content-Type": "application/json"},
-                    json=payload
-                )
-                response.raise_for_status()
-                return response.json()
+            client = http_clients.get_async_client("local_llm")
+            response = await client.post(
+                f"{self.base_url}/v1/chat/completions",
+                headers={"Content-Type": "application/json"},
+                json=payload
+            )
+            response.raise_for_status()
+            return response.json()
         except httpx.RequestError as exc:
             logger.error(f"Request failed: {exc}")
             raise
@@ -70,7 +74,8 @@ class CustomLLMClient:
                 operation='title_generation',
                 status='error'
             ).inc()
-            return "Custom Trading Strategy"  # Fallback title
+            # The router fails over and falls back to a default title
+            raise
 
     async def generate_backtest_script(self, strategy_description: str, extra_message: str) -> tuple[str, list[str]]:
         """Generate Python script and required data points for the strategy."""
@@ -101,7 +106,9 @@ class CustomLLMClient:
             # Parse the script and required data columns
             import re
             script_match = re.search(r'```python\n(.*?)```', content, re.DOTALL)
-            script = script_match.group(1).strip() if script_match else None
+            if not script_match:
+                raise ValueError("No python code block in the local LLM response")
+            script = script_match.group(1).strip()
 
             data_columns_match = re.search(r'(Required data columns:.*)', content, re.DOTALL)
             if data_columns_match:
@@ -115,6 +122,29 @@ class CustomLLMClient:
             logger.error(f"Error generating backtest script: {e}")
             raise
 
+    @track_time(LLM_REQUEST_DURATION.labels(operation='spec_generation'))
+    async def generate_strategy_spec(self, strategy_description: str) -> dict:
+        """Generate a structured strategy spec, {"spec": null} when the strategy needs a script."""
+        payload = {
+            "model": self.model_name,
+            "messages": [
+                {"role": "system", "content": strategy_spec_system_prompt},
+                {"role": "user", "content": strategy_description},
+            ],
+            "max_tokens": 800,
+            "temperature": 0,
+        }
+
+        try:
+            response = await self._send_request(payload)
+            content = response['choices'][0]['message']['content'].strip()
+            # Local models tend to wrap JSON in a markdown fence
+            content = content.removeprefix("```json").removeprefix("```").removesuffix("```")
+            return json.loads(content)
+        except Exception as e:
+            logger.error(f"Error generating strategy spec: {e}")
+            raise
+
     async def generate_backtest_report(self, log_content: str) -> str:
         """Generate a markdown report from backtest logs."""
         payload = {
@@ -137,6 +167,45 @@ class CustomLLMClient:
             logger.error(f"Error generating backtest report: {e}")
             raise
 
+    async def stream_backtest_report(self, log_content: str) -> AsyncIterator[str]:
+        """Stream a markdown report from backtest logs, yielding content deltas as they arrive."""
+        payload = {
+            "model": self.model_name,
+            "messages": [
+                {
+                    "role": "system",
+                    "content": backtest_report_system_prompt_v3
+                },
+                {"role": "user", "content": log_content},
+            ],
+            "max_tokens": 2000,
+            "temperature": 0.3,
+            "stream": True,
+        }
+
+        try:
+            client = http_clients.get_async_client("local_llm")
+            async with client.stream(
+                "POST",
+                f"{self.base_url}/v1/chat/completions",
+                headers={"Content-Type": "application/json"},
+                json=payload
+            ) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        break
+                    choices = json.loads(data).get('choices') or [{}]
+                    delta = choices[0].get('delta', {}).get('content')
+                    if delta:
+                        yield delta
+        except Exception as e:
+            logger.error(f"Error streaming backtest report: {e}")
+            raise
+
     async def generate_fixed_script(self, original_script: str, error_message: str) -> str:
         """Generate a fixed Python script based on the original script and error message."""
         system_prompt = (
@@ -1,4 +1,5 @@
 from openai import AsyncOpenAI
+from typing import AsyncIterator
 import re
 import json
 
@@ -15,7 +16,9 @@ from src.infrastructure.llm.prompts import (
     # Strategy Title Prompts
     strategy_title_system_prompt,
     # Backtest Report Prompts
-    backtest_report_system_prompt_v3
+    backtest_report_system_prompt_v3,
+    # Strategy Spec Prompts
+    strategy_spec_system_prompt
 )
 
 client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
@@ -50,8 +53,8 @@ async def generate_strategy_title(strategy_description: str) -> str:
             operation='title_generation',
             status='error'
         ).inc()
-        # Log error here
-        return "Custom Trading Strategy"  # Fallback title
+        # The router fails over and falls back to a default title
+        raise Exception(f"Failed to generate strategy title: {str(e)}")
 
 async def generate_backtest_script(strategy_description: str, extra_message: str) -> tuple[str, list[str]]:
     """Generate Python script and required data points for the strategy"""
@@ -113,6 +116,32 @@ async def generate_backtest_script(strategy_description: str, extra_message: str
         # Log error here
         raise Exception(f"Failed to generate backtest script: {str(e)}")
 
+@track_time(LLM_REQUEST_DURATION.labels(operation='spec_generation'))
+async def generate_strategy_spec(strategy_description: str) -> dict:
+    """Generate a structured strategy spec, {"spec": null} when the strategy needs a script"""
+    try:
+        response = await client.chat.completions.create(
+            model="gpt-4o",
+            messages=[
+                {"role": "system", "content": strategy_spec_system_prompt},
+                {"role": "user", "content": strategy_description}
+            ],
+            max_tokens=800,
+            temperature=0,
+            response_format={"type": "json_object"}
+        )
+        LLM_REQUEST_COUNT.labels(
+            operation='spec_generation',
+            status='success'
+        ).inc()
+        return json.loads(response.choices[0].message.content)
+    except Exception as e:
+        LLM_REQUEST_COUNT.labels(
+            operation='spec_generation',
+            status='error'
+        ).inc()
+        raise Exception(f"Failed to generate strategy spec: {str(e)}")
+
 async def generate_backtest_report(log_content: str) -> str:
     """Generate a markdown report from backtest logs"""
     try:
@@ -137,6 +166,35 @@ async def generate_backtest_report(log_content: str) -> str:
         # Log error here
         raise Exception(f"Failed to generate backtest report: {str(e)}")
 
+async def stream_backtest_report(log_content: str) -> AsyncIterator[str]:
+    """Stream a markdown report from backtest logs, yielding content deltas as they arrive"""
+    try:
+        stream = await client.chat.completions.create(
+            model="gpt-4",
+            messages=[
+                {
+                    "role": "system",
+                    "content": backtest_report_system_prompt_v3
+                },
+                {
+                    "role": "user",
+                    "content": log_content
+                }
+            ],
+            max_tokens=2000,
+            temperature=0.3,
+            stream=True
+        )
+
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                yield delta
+    except Exception as e:
+        raise Exception(f"Failed to stream backtest report: {str(e)}")
+
 async def generate_fixed_script(original_script: str, error_message: str) -> str:
     """Generate a fixed Python script based on the original script and error message"""
     try:
@@ -170,3 +228,24 @@ async def generate_fixed_script(original_script: str, error_message: str) -> str
         return script
     except Exception as e:
         raise Exception(f"Failed to generate fixed script: {str(e)}")
+
+class OpenAIClient:
+    """Provider object exposing the OpenAI functions through the common LLM client interface"""
+
+    async def generate_strategy_title(self, strategy_description: str) -> str:
+        return await generate_strategy_title(strategy_description)
+
+    async def generate_backtest_script(self, strategy_description: str, extra_message: str) -> tuple[str, list[str]]:
+        return await generate_backtest_script(strategy_description, extra_message)
+
+    async def generate_strategy_spec(self, strategy_description: str) -> dict:
+        return await generate_strategy_spec(strategy_description)
+
+    async def generate_backtest_report(self, log_content: str) -> str:
+        return await generate_backtest_report(log_content)
+
+    def stream_backtest_report(self, log_content: str) -> AsyncIterator[str]:
+        return stream_backtest_report(log_content)
+
+    async def generate_fixed_script(self, original_script: str, error_message: str) -> str:
+        return await generate_fixed_script(original_script, error_message)
@@ -297,6 +297,8 @@ backtest_report_system_prompt_v3 = (
     "4. **Risk Metrics**:\n"
     "   - Include maximum exposure, max drawdown stats, and relevant timestamps.\n"
     "   - Present them in a small table.\n"
+    "   - If the log has a Monte Carlo section, add the 5th/50th/95th percentiles of max drawdown and CAGR and the ruin probability.\n"
+    "   - If the log says Monte Carlo was not run, state in one line that no robustness analysis is available for this backtest.\n"
     "\n"
     "5. **Recommendations**:\n"
     "   - Provide short, actionable recommendations based on risk/return metrics.\n"
@@ -308,4 +310,65 @@ backtest_report_system_prompt_v3 = (
     "   - Use `₹` for rupees, and `xx.xx%` for percentages.\n"
     "   - Skip or ignore any null fields.\n"
     "   - Keep the report compact.\n"
-)
\ No newline at end of file
+)
+
+backtest_engine_prompt_addendum = (
+    """
+    Prefer the built-in vectorized engine over vectorbt or row by row loops. It is importable in the script:
+
+        from src.core.backtesting.executor import (
+            BacktestConfig, run_backtest, signals_from_entries_exits, volatility_position_size
+        )
+
+    - Compute indicators with vectorized pandas or numpy operations, never with loops or iterrows.
+    - Build a signal array with one value per row (1 long, -1 short, 0 flat), or boolean entry and
+      exit arrays converted with signals_from_entries_exits(entries, exits, short_entries, short_exits).
+      A signal on a row is traded from the next row.
+    - Run it with
+        result = run_backtest(prices, signals, BacktestConfig(
+            initial_capital=100000, position_size=1.0, stop_loss=None, take_profit=None,
+            fees=0.0, slippage=0.0, allow_short=True, periods_per_year=252
+        ))
+      where prices is a numpy array of the 'price' column. stop_loss and take_profit are fractions (0.02 is 2%),
+      position_size is a fraction of equity or a per-row array from volatility_position_size(prices, target_volatility).
+    - result.stats is a dict of summary metrics, result.trades a structured array of trades and result.equity the
+      equity curve. Log every entry of result.stats as "name: value" and the number of trades.
+    - Path-dependent logic that cannot be expressed as signal arrays (trailing stops, spread or bid/ask size
+      conditions) uses the event-driven replay engine instead of a loop over DataFrame rows:
+
+        from src.core.backtesting.replay import Strategy, TickData, replay
+
+        class MyStrategy(Strategy):
+            def on_tick(self, index, price, bid, ask, bid_size, ask_size, broker):
+                ...  # broker.buy(quantity), broker.sell(quantity), broker.close(), broker.order_target_percent(0.5)
+
+        result = replay(TickData.from_frame(df), MyStrategy(), initial_capital=100000, fees=0.0, allow_short=False)
+
+      Buys fill at the ask and sells at the bid. broker.position and broker.equity hold the current state, result
+      has the same stats, trades and equity as run_backtest.
+    """
+)
+
+strategy_spec_system_prompt = (
+    """
+    You convert trading strategy descriptions into a JSON strategy spec that is executed by a built-in engine.
+    Respond with a JSON object {"spec": <spec>} or {"spec": null} when the strategy cannot be expressed exactly
+    with the spec below. Never approximate: any rule, filter, data point or sizing method that does not fit
+    means {"spec": null}.
+
+    Spec fields:
+    - "indicators": list of {"name": lowercase identifier, "kind": one of "sma", "ema", "rsi", "bollinger_middle",
+      "bollinger_upper", "bollinger_lower", "highest", "lowest", "window": integer bars, "num_std": number
+      (bollinger bands only)}. "highest" and "lowest" are over the previous window bars, excluding the current one.
+      Every indicator is computed on the 'price' column.
+    - "entry": list of conditions that must all hold to open a position.
+    - "exit": list of conditions where any one closes the position. Leave empty to hold while the entry holds.
+    - A condition is {"left": "price" or an indicator name, "op": one of "above", "below", "crosses_above",
+      "crosses_below", "right": a number, "price" or an indicator name}.
+    - "direction": "long" or "short".
+    - "position_size": fraction of equity per position, 0 to 1 (1% is 0.01).
+    - "stop_loss", "take_profit": fractions (2% is 0.02) or null.
+    - "fees": fraction of traded value per trade.
+    - "initial_capital": number.
+    """
+)
@@ -0,0 +1,286 @@
+import asyncio
+import time
+from collections import deque
+from typing import AsyncIterator, Dict, List, Optional
+
+from src.config.settings import settings
+from src.infrastructure.llm.openai_client import OpenAIClient
+from src.infrastructure.llm.localllm_client import CustomLLMClient
+from src.utils.metrics import (
+    LLM_PROVIDER_REQUEST_DURATION,
+    LLM_PROVIDER_FAILOVER_COUNT
+)
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+OPERATION_TITLE_GENERATION = "title_generation"
+OPERATION_SCRIPT_GENERATION = "script_generation"
+OPERATION_SCRIPT_REPAIR = "script_repair"
+OPERATION_SPEC_GENERATION = "spec_generation"
+OPERATION_REPORT_GENERATION = "report_generation"
+
+# Title used when every provider fails, a missing title never fails a backtest
+FALLBACK_STRATEGY_TITLE = "Custom Trading Strategy"
+
+# Minimum number of samples before a provider's error rate or latency is trusted
+MIN_SAMPLES_FOR_HEALTH = 5
+
+class ProviderStats:
+    """Rolling latency and error rate window for one provider and operation"""
+
+    def __init__(self, window: int):
+        self.latencies = deque(maxlen=window)
+        self.outcomes = deque(maxlen=window)
+
+    def record(self, latency: float, success: bool):
+        if success:
+            self.latencies.append(latency)
+        self.outcomes.append(success)
+
+    def p95(self, min_samples: int = 1) -> Optional[float]:
+        if len(self.latencies) < max(min_samples, 1):
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def error_rate(self) -> float:
+        if len(self.outcomes) < MIN_SAMPLES_FOR_HEALTH:
+            return 0.0
+        return 1 - sum(self.outcomes) / len(self.outcomes)
+
+def parse_routes(routes: str) -> Dict[str, List[str]]:
+    """Parse "operation=provider,provider;..." into an ordered provider list per operation"""
+    parsed = {}
+    for route in routes.split(";"):
+        if "=" not in route:
+            continue
+        operation, providers = route.split("=", 1)
+        parsed[operation.strip()] = [p.strip() for p in providers.split(",") if p.strip()]
+    return parsed
+
+class LLMRouter:
+    """
+    Routes LLM operations between providers that share the client interface
+    (generate_strategy_title, generate_backtest_script, generate_strategy_spec,
+    generate_backtest_report, stream_backtest_report and generate_fixed_script).
+
+    Each operation has an ordered list of providers. Providers whose rolling
+    error rate is above the threshold are tried last, healthy providers whose
+    p95 latency is more than max_latency_ratio times the fastest one's come
+    after the others, failed calls fail over to the next provider, and hedged
+    operations send a second request once the primary has been slower than
+    its own p95 latency.
+    """
+
+    def __init__(
+        self,
+        providers: Dict[str, object],
+        routes: Dict[str, List[str]],
+        hedge_operations: Optional[List[str]] = None,
+        hedge_default_delay: float = 5.0,
+        stats_window: int = 100,
+        max_error_rate: float = 0.5,
+        max_latency_ratio: float = 2.0
+    ):
+        self.providers = providers
+        self.routes = routes
+        self.hedge_operations = set(hedge_operations or [])
+        self.hedge_default_delay = hedge_default_delay
+        self.stats_window = stats_window
+        self.max_error_rate = max_error_rate
+        self.max_latency_ratio = max_latency_ratio
+        self.stats: Dict[tuple, ProviderStats] = {}
+
+    @classmethod
+    def from_settings(cls) -> "LLMRouter":
+        return cls(
+            providers={
+                "openai": OpenAIClient(),
+                "local": CustomLLMClient()
+            },
+            routes=parse_routes(settings.LLM_PROVIDER_ROUTES),
+            hedge_operations=[
+                op.strip() for op in settings.LLM_HEDGE_OPERATIONS.split(",") if op.strip()
+            ],
+            hedge_default_delay=settings.LLM_HEDGE_DEFAULT_DELAY,
+            stats_window=settings.LLM_STATS_WINDOW,
+            max_error_rate=settings.LLM_MAX_ERROR_RATE,
+            max_latency_ratio=settings.LLM_MAX_LATENCY_RATIO
+        )
+
+    def _stats(self, provider: str, operation: str) -> ProviderStats:
+        key = (provider, operation)
+        if key not in self.stats:
+            self.stats[key] = ProviderStats(self.stats_window)
+        return self.stats[key]
+
+    def _record(self, provider: str, operation: str, started: float, success: bool):
+        latency = time.monotonic() - started
+        self._stats(provider, operation).record(latency, success)
+        LLM_PROVIDER_REQUEST_DURATION.labels(provider=provider, operation=operation).observe(latency)
+
+    def candidates(self, operation: str) -> List[str]:
+        """Providers for an operation, slow ones after the fast ones and unhealthy ones at the end"""
+        configured = [
+            name for name in self.routes.get(operation, ["openai"])
+            if name in self.providers
+        ]
+        healthy = [
+            name for name in configured
+            if self._stats(name, operation).error_rate() <= self.max_error_rate
+        ]
+        latencies = {name: self._stats(name, operation).p95(MIN_SAMPLES_FOR_HEALTH) for name in healthy}
+        known = [latency for latency in latencies.values() if latency is not None]
+        if known:
+            # Stable sort, configured order is kept among fast (or not yet measured) providers
+            limit = min(known) * self.max_latency_ratio
+            healthy.sort(key=lambda name: latencies[name] is not None and latencies[name] > limit)
+        return healthy + [name for name in configured if name not in healthy]
+
+    async def _invoke(self, provider: str, operation: str, method: str, *args, **kwargs):
+        started = time.monotonic()
+        try:
+            result = await getattr(self.providers[provider], method)(*args, **kwargs)
+        except Exception:
+            self._record(provider, operation, started, success=False)
+            raise
+        self._record(provider, operation, started, success=True)
+        return result
+
+    async def _call(self, operation: str, method: str, *args, **kwargs):
+        candidates = self.candidates(operation)
+        if not candidates:
+            raise Exception(f"No LLM provider configured for {operation}")
+
+        if operation in self.hedge_operations and len(candidates) > 1:
+            return await self._call_hedged(candidates, operation, method, *args, **kwargs)
+
+        last_error = None
+        for provider in candidates:
+            try:
+                return await self._invoke(provider, operation, method, *args, **kwargs)
+            except Exception as e:
+                last_error = e
+                logger.warning(f"LLM provider {provider} failed for {operation}: {e}")
+                LLM_PROVIDER_FAILOVER_COUNT.labels(
+                    provider=provider,
+                    operation=operation,
+                    reason="error"
+                ).inc()
+        raise last_error
+
+    async def _call_hedged(self, candidates: List[str], operation: str, method: str, *args, **kwargs):
+        primary, secondary = candidates[0], candidates[1]
+        delay = self._stats(primary, operation).p95() or self.hedge_default_delay
+
+        tasks = {
+            asyncio.create_task(self._invoke(primary, operation, method, *args, **kwargs)): primary
+        }
+        done, _ = await asyncio.wait(tasks.keys(), timeout=delay)
+
+        if not done or next(iter(done)).exception() is not None:
+            reason = "hedge" if not done else "error"
+            LLM_PROVIDER_FAILOVER_COUNT.labels(
+                provider=primary,
+                operation=operation,
+                reason=reason
+            ).inc()
+            tasks[asyncio.create_task(self._invoke(secondary, operation, method, *args, **kwargs))] = secondary
+
+        pending = set(tasks.keys())
+        last_error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    last_error = task.exception()
+                    logger.warning(f"LLM provider {tasks[task]} failed for {operation}: {last_error}")
+        finally:
+            for task in pending:
+                task.cancel()
+        raise last_error
+
+    async def generate_strategy_title(self, strategy_description: str) -> str:
+        try:
+            return await self._call(
+                OPERATION_TITLE_GENERATION,
+                "generate_strategy_title",
+                strategy_description
+            )
+        except Exception as e:
+            logger.warning(f"Every LLM provider failed for {OPERATION_TITLE_GENERATION}, using the fallback title: {e}")
+            return FALLBACK_STRATEGY_TITLE
+
+    async def generate_backtest_script(self, strategy_description: str, extra_message: str) -> tuple[str, list[str]]:
+        return await self._call(
+            OPERATION_SCRIPT_GENERATION,
+            "generate_backtest_script",
+            strategy_description=strategy_description,
+            extra_message=extra_message
+        )
+
+    async def generate_strategy_spec(self, strategy_description: str) -> dict:
+        return await self._call(
+            OPERATION_SPEC_GENERATION,
+            "generate_strategy_spec",
+            strategy_description
+        )
+
+    async def generate_fixed_script(self, original_script: str, error_message: str) -> str:
+        return await self._call(
+            OPERATION_SCRIPT_REPAIR,
+            "generate_fixed_script",
+            original_script,
+            error_message
+        )
+
+    async def generate_backtest_report(self, log_content: str) -> str:
+        return await self._call(
+            OPERATION_REPORT_GENERATION,
+            "generate_backtest_report",
+            log_content
+        )
+
+    async def stream_backtest_report(self, log_content: str) -> AsyncIterator[str]:
+        """
+        Stream a report from the first provider that starts producing content.
+        Failover only happens before the first delta, once content has been
+        forwarded to the user the stream is committed to that provider.
+        """
+        operation = OPERATION_REPORT_GENERATION
+        last_error = None
+        for provider in self.candidates(operation):
+            started = time.monotonic()
+            stream = self.providers[provider].stream_backtest_report(log_content)
+            try:
+                first = await stream.__anext__()
+            except StopAsyncIteration:
+                self._record(provider, operation, started, success=True)
+                return
+            except Exception as e:
+                self._record(provider, operation, started, success=False)
+                last_error = e
+                logger.warning(f"LLM provider {provider} failed to stream {operation}: {e}")
+                LLM_PROVIDER_FAILOVER_COUNT.labels(
+                    provider=provider,
+                    operation=operation,
+                    reason="error"
+                ).inc()
+                continue
+
+            yield first
+            try:
+                async for delta in stream:
+                    yield delta
+            except Exception:
+                self._record(provider, operation, started, success=False)
+                raise
+            self._record(provider, operation, started, success=True)
+            return
+
+        raise last_error or Exception(f"No LLM provider configured for {operation}")
+
+llm_router = LLMRouter.from_settings()
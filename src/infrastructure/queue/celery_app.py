@@ -1,5 +1,8 @@
 from celery import Celery
+from celery.signals import worker_process_init, worker_process_shutdown
 from src.config.settings import settings
+from src.infrastructure.http.clients import http_clients
+from src.infrastructure.queue.event_loop import close_worker_loop, reset_worker_loop
 
 celery_app = Celery(
     "alphabench",
@@ -9,7 +12,8 @@ celery_app = Celery(
         "src.tasks.script_generation",
         "src.tasks.script_validation",
         "src.tasks.backtest_execution",
-        "src.tasks.report_generation"
+        "src.tasks.report_generation",
+        "src.tasks.preview_generation"
     ]
 )
 
@@ -35,5 +39,21 @@ celery_app.conf.update(
         "src.tasks.report_generation.*": {
             "queue": "report_generation"
         },
+        # Preview rendering is short-lived I/O, the report workers pick it up
+        "src.tasks.preview_generation.*": {
+            "queue": "report_generation"
+        },
     }
 )
+
+
+@worker_process_init.connect
+def init_worker_http_clients(**kwargs):
+    """Drop the event loop and HTTP clients inherited from the parent so each child gets its own"""
+    reset_worker_loop()
+    http_clients.reset()
+
+@worker_process_shutdown.connect
+def shutdown_worker_http_clients(**kwargs):
+    """Close the persistent event loop and pooled HTTP clients when a worker child exits"""
+    close_worker_loop()
@@ -0,0 +1,46 @@
+import asyncio
+import threading
+from typing import Any, Coroutine
+
+from src.infrastructure.http.clients import http_clients
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_state = threading.local()
+
+def get_worker_loop() -> asyncio.AbstractEventLoop:
+    """Get the persistent event loop of the current worker process (and thread)"""
+    loop = getattr(_state, "loop", None)
+    if loop is None or loop.is_closed():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        _state.loop = loop
+    return loop
+
+def run_async(coro: Coroutine) -> Any:
+    """
+    Run a coroutine to completion on the persistent worker loop.
+
+    Replaces asyncio.run in sync task code so the loop, and the async HTTP
+    client pools bound to it, survive across calls and tasks.
+    """
+    return get_worker_loop().run_until_complete(coro)
+
+def reset_worker_loop():
+    """Forget a loop inherited from a parent process, its selector is shared with the parent"""
+    _state.loop = None
+
+def close_worker_loop():
+    """Close pooled async clients and the worker loop"""
+    loop = getattr(_state, "loop", None)
+    if loop is None or loop.is_closed():
+        return
+    try:
+        loop.run_until_complete(http_clients.aclose())
+        loop.run_until_complete(loop.shutdown_asyncgens())
+    except Exception as e:
+        logger.warning(f"Error closing worker event loop: {e}")
+    finally:
+        loop.close()
+        _state.loop = None
@@ -1,6 +1,6 @@
 import boto3
 from botocore.exceptions import ClientError
-from typing import Optional
+from typing import Optional, Union
 import os
 
 from src.config.settings import settings
@@ -27,16 +27,16 @@ class S3Client:
     def upload_file_content(
         self,
         key: str,
-        content: str,
+        content: Union[str, bytes],
         content_type: str = "text/plain"
     ) -> bool:
-        """Upload string content to S3"""
+        """Upload string or binary content to S3"""
         try:
             logger.info(f"Attempting to upload to bucket: {self.bucket_name}, key: {key}")
             self.client.put_object(
                 Bucket=self.bucket_name,
                 Key=key,
-                Body=content.encode('utf-8'),
+                Body=content.encode('utf-8') if isinstance(content, str) else content,
                 ContentType=content_type
             )
             logger.info(f"Successfully uploaded to {key}")
@@ -57,6 +57,28 @@ class S3Client:
             ).inc()
             raise Exception(f"Failed to upload to S3: {str(e)}")
 
+    @track_time(S3_OPERATION_DURATION.labels(operation='copy'))
+    def copy_file(self, source_key: str, key: str) -> bool:
+        """Copy an object within the bucket without downloading it"""
+        try:
+            self.client.copy_object(
+                Bucket=self.bucket_name,
+                Key=key,
+                CopySource={'Bucket': self.bucket_name, 'Key': source_key}
+            )
+            S3_OPERATION_COUNT.labels(
+                operation='copy',
+                status='success'
+            ).inc()
+            return True
+        except ClientError as e:
+            logger.error(f"S3 copy from {source_key} to {key} failed: {str(e)}")
+            S3_OPERATION_COUNT.labels(
+                operation='copy',
+                status='error'
+            ).inc()
+            raise Exception(f"Failed to copy in S3: {str(e)}")
+
     async def upload_file(self, file_path: str, key: str) -> bool:
         """Upload file to S3"""
         try:
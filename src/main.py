@@ -17,9 +17,12 @@ from src.api.routes import (
     health, 
     users, 
     waitlist,
-    razorpay
+    razorpay,
+    events
 )
+from src.api.responses import ORJSONResponse
 from src.api.services.websocket import manager
+from src.infrastructure.http.clients import http_clients
 
 def custom_openapi():
     if app.openapi_schema:
@@ -90,7 +93,8 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/api/docs",
     redoc_url="/api/redoc",
-    openapi_url="/api/openapi.json"
+    openapi_url="/api/openapi.json",
+    default_response_class=ORJSONResponse
 )
 
 # Customize OpenAPI schema
@@ -103,6 +107,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Paginated listings return their next page cursor in a header
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Add anonymous user middleware
@@ -120,11 +126,20 @@ app.include_router(health.router)
 app.include_router(users.router)
 app.include_router(waitlist.router)
 app.include_router(razorpay.router)
+app.include_router(events.router)
 
 # Create metrics endpoint
 metrics_app = make_asgi_app()
 app.mount("/metrics", metrics_app)
 
+@app.on_event("startup")
+async def startup_http_clients():
+    await http_clients.startup()
+
+@app.on_event("shutdown")
+async def shutdown_http_clients():
+    await http_clients.aclose()
+
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
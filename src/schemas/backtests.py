@@ -1,8 +1,56 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Annotated, Dict, Literal, Optional, List
 from datetime import date, datetime
 from uuid import UUID
 
+class WalkForwardConfig(BaseModel):
+    train_days: int = Field(
+        ...,
+        ge=1,
+        le=3650,
+        description="Length of each in-sample window, used to warm up indicators and pick parameters"
+    )
+    test_days: int = Field(
+        ...,
+        ge=1,
+        le=3650,
+        description="Length of each out-of-sample window"
+    )
+    step_days: Optional[int] = Field(
+        None,
+        ge=1,
+        le=3650,
+        description="Days between window starts, defaults to test_days"
+    )
+
+class PortfolioConfig(BaseModel):
+    instrument_symbols: List[Annotated[str, Field(min_length=1, max_length=20)]] = Field(
+        ...,
+        min_length=2,
+        description="Instruments traded by the portfolio, including instrument_symbol",
+        example=["AAPL", "MSFT", "GOOGL"]
+    )
+    allocation: Literal["equal", "inverse_volatility", "weights"] = Field(
+        "equal",
+        description="How capital is split across the instruments"
+    )
+    weights: Optional[Dict[str, float]] = Field(
+        None,
+        description="Weight per instrument symbol for the weights allocation, normalized to sum to 1"
+    )
+    volatility_window: int = Field(
+        20,
+        ge=2,
+        le=500,
+        description="Bars of returns used by the inverse_volatility allocation"
+    )
+    rebalance_days: Optional[int] = Field(
+        None,
+        ge=1,
+        le=3650,
+        description="Days between rebalances to the target weights, every bar when omitted"
+    )
+
 class BacktestCreate(BaseModel):
     instrument_symbol: str = Field(
         ..., 
@@ -31,6 +79,35 @@ class BacktestCreate(BaseModel):
         example="Buy when the 50-day moving average crosses above the 200-day moving average. "
                 "Sell when it crosses below. Use 1% of portfolio per trade."
     )
+    parameter_grid: Optional[Dict[str, Annotated[List[float], Field(min_length=1, max_length=50)]]] = Field(
+        None,
+        max_length=3,
+        description="""
+        Sweep mode: candidate values per strategy parameter, every combination is backtested
+        in one run and ranked. Parameters are "<indicator>.window", "<indicator>.num_std",
+        "entry.<i>.right", "exit.<i>.right", "stop_loss", "take_profit", "position_size" and "fees".
+        Only supported for strategies the built-in engine can run from a structured spec.
+        """,
+        example={"fast.window": [20, 50], "slow.window": [100, 200]}
+    )
+    walk_forward: Optional[WalkForwardConfig] = Field(
+        None,
+        description="""
+        Walk-forward mode: the period is split into rolling train and test windows and only the
+        out-of-sample test windows are traded and stitched together. Combined with a
+        parameter_grid the best combination of each train window is traded on its test window.
+        """,
+        example={"train_days": 365, "test_days": 90}
+    )
+    portfolio: Optional[PortfolioConfig] = Field(
+        None,
+        description="""
+        Portfolio mode: the strategy trades every instrument of the portfolio and the
+        instruments are combined with the requested allocation into one equity curve.
+        Only supported for strategies the built-in engine can run from a structured spec.
+        """,
+        example={"instrument_symbols": ["AAPL", "MSFT", "GOOGL"], "allocation": "inverse_volatility"}
+    )
 
 class BacktestRequest(BacktestCreate):
     id: UUID = Field(
@@ -50,6 +127,22 @@ class BacktestRequest(BacktestCreate):
         None,
         description="S3 URL of the generated Python script"
     )
+    strategy_spec: Optional[dict] = Field(
+        None,
+        description="Structured strategy spec, set when the strategy runs on the built-in engine instead of a generated script"
+    )
+    result_stats: Optional[dict] = Field(
+        None,
+        description="Headline stats parsed from the log of a generated script, e.g. total_return and sharpe_ratio"
+    )
+    sweep_results_url: Optional[str] = Field(
+        None,
+        description="S3 URL of the ranked parameter sweep results (CSV)"
+    )
+    sweep_heatmap_url: Optional[str] = Field(
+        None,
+        description="S3 URL of the parameter sweep heatmap (PNG)"
+    )
     validation_data_url: Optional[str] = Field(
         None,
         description="S3 URL of the validation dataset"
@@ -126,6 +219,28 @@ class BacktestRequest(BacktestCreate):
 class BacktestResponse(BacktestRequest):
     pass
 
+class BacktestListItem(BaseModel):
+    """Backtest listing entry, only the requested fields are present"""
+    id: UUID
+    user_id: Optional[UUID] = None
+    instrument_symbol: Optional[str] = None
+    from_date: Optional[date] = None
+    to_date: Optional[date] = None
+    strategy_description: Optional[str] = None
+    strategy_title: Optional[str] = None
+    python_script_url: Optional[str] = None
+    validation_data_url: Optional[str] = None
+    full_data_url: Optional[str] = None
+    log_file_url: Optional[str] = None
+    report_url: Optional[str] = None
+    ready_for_report: Optional[bool] = None
+    generated_report: Optional[bool] = None
+    status: Optional[str] = None
+    error_message: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    share_id: Optional[str] = None
+
 class BacktestUpdate(BaseModel):
     id: str
     strategy_title: Optional[str] 
@@ -138,6 +253,47 @@ class BacktestUpdate(BaseModel):
     generated_report: bool
     status: str
 
+class ReportChunkBroadcast(BaseModel):
+    user_id: str = Field(
+        ...,
+        description="Owner of the backtest, sent by the worker so chunks need no database lookup"
+    )
+    chunk: str
+    index: int = Field(
+        ...,
+        description="Sequence number of the chunk within the streamed report"
+    )
+    done: bool = Field(
+        False,
+        description="Indicates that this is the last chunk of the report"
+    )
+
+class BacktestStatusRequest(BaseModel):
+    ids: Optional[List[UUID]] = Field(
+        None,
+        max_length=200,
+        description="Backtests to poll, omit to poll all of the user's in-flight backtests"
+    )
+    since: Optional[datetime] = Field(
+        None,
+        description="Watermark from the previous response, only backtests updated after it are returned"
+    )
+
+class BacktestStatus(BaseModel):
+    id: UUID
+    status: str
+    ready_for_report: bool
+    generated_report: bool
+    error_message: Optional[str] = None
+    updated_at: datetime
+
+class BacktestStatusResponse(BaseModel):
+    items: List[BacktestStatus]
+    watermark: Optional[datetime] = Field(
+        None,
+        description="Pass as `since` on the next poll to only receive changes"
+    )
+
 class BacktestTimeGroup(BaseModel):
     id: UUID
     name: str
@@ -4,22 +4,52 @@ import subprocess
 import tempfile
 import os
 from datetime import datetime
-import asyncio
-import requests
+import numpy as np
 
 from src.infrastructure.queue.celery_app import celery_app
 from src.db.base import get_db
 from src.db.queries.backtests import (
+    update_backtest_result_cache_key,
+    update_backtest_result_stats,
     update_backtest_status,
     update_backtest_urls
 )
 from src.infrastructure.storage.s3_client import S3Client
+from src.infrastructure.http.clients import http_clients
+from src.db.queries.tick_data import fetch_price_panel, fetch_price_series
+from src.core.backtesting.executor import infer_periods_per_year, script_environment
+from src.core.backtesting.generator import StrategySpec, run_strategy_spec
+from src.core.backtesting.sweep import (
+    apply_parameters,
+    format_sweep_summary,
+    render_heatmap,
+    run_sweep
+)
+from src.core.backtesting.walk_forward import format_walk_forward_summary, run_walk_forward
+from src.core.backtesting.portfolio import format_portfolio_summary, portfolio_index, run_portfolio
+from src.core.backtesting.monte_carlo import (
+    NOT_RUN_SUMMARY,
+    format_monte_carlo_summary,
+    period_equity_returns,
+    run_monte_carlo,
+    trade_equity_returns
+)
+from src.core.reports.analyzer import format_backtest_log
+from src.api.services.result_cache import (
+    get_cached_result,
+    parse_log_stats,
+    result_cache_key,
+    store_result
+)
 from src.constants.backtests import (
     BACKTEST_STATUS_EXECUTION_IN_PROGRESS,
     BACKTEST_STATUS_EXECUTION_FAILED,
     BACKTEST_STATUS_EXECUTION_SUCCESSFUL
 )
 from src.infrastructure.queue.instrumentation import track_celery_task
+from src.infrastructure.queue.event_loop import run_async
+from src.config.settings import settings
+from src.utils.metrics import RESULT_CACHE_COUNT
 
 from src.utils.logger import get_logger
 logger = get_logger(__name__)
@@ -61,22 +91,20 @@ def execute_backtest(self, backtest_id: UUID):
                 log_path = os.path.join(temp_dir, "backtest.log")
                 logger.info(f"Created log file at: {log_path}")
 
-                async def download_files():
-                    # Download script using HTTP
-                    response = requests.get(backtest['python_script_url'])
-                    with open(script_path, 'wb') as script_file:
-                        script_file.write(response.content)
-
-                    # Download validation data using HTTP
-                    response = requests.get(backtest['full_data_url'])
-                    with open(data_path, 'wb') as data_file:
-                        data_file.write(response.content)
-
-                # Run the async download function
-                asyncio.run(download_files())
+                # Download script and full dataset over the pooled HTTP client
+                http_clients.download_to_file(backtest['python_script_url'], script_path)
+                http_clients.download_to_file(backtest['full_data_url'], data_path)
 
                 # Make script executable
                 os.chmod(script_path, 0o755)
+
+                cache_key = None
+                if settings.RESULT_CACHE_ENABLED:
+                    with open(script_path, 'r') as script_file:
+                        cache_key = result_cache_key(script_file.read(), data_path)
+                    update_backtest_result_cache_key(conn, backtest_id, cache_key)
+                    if reuse_cached_result(conn, s3_client, backtest_id, cache_key):
+                        return
                 
                 # Run script with full dataset
                 with open(log_path, 'w') as log_file:
@@ -92,6 +120,7 @@ def execute_backtest(self, backtest_id: UUID):
                         ],
                         capture_output=True,
                         text=True,
+                        env=script_environment(),
                         timeout=1800  # 30 minute timeout
                     )
                 
@@ -101,16 +130,26 @@ def execute_backtest(self, backtest_id: UUID):
 
                 if result.returncode != 0:
                     raise Exception(f"Execution failed: {result.stderr}")
+
+                if settings.MONTE_CARLO_ENABLED:
+                    # The script's log is free-form, there are no trade returns to resample
+                    logger.info(f"Monte Carlo analysis not run for script backtest {backtest_id}")
+                    with open(log_path, 'a') as log_file:
+                        log_file.write("\n" + NOT_RUN_SUMMARY)
                 
                 # Upload log file to S3
                 timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
                 log_key = f"{backtest_id}/backtest_{timestamp}.log"
                 
-                asyncio.run(s3_client.upload_file(
+                run_async(s3_client.upload_file(
                     log_path,
                     log_key
                 ))
                 logger.info(f'Uploading log file for backtest: {backtest_id}')
+                stats = parse_log_stats(log_contents)
+                update_backtest_result_stats(conn, backtest_id, stats)
+                if cache_key:
+                    store_result(cache_key, backtest_id, log_key, stats)
                 
                 # Update backtest record with log URL
                 log_url = s3_client.get_file_url(log_key)
@@ -139,3 +178,334 @@ def execute_backtest(self, backtest_id: UUID):
                 str(e)
             )
             raise
+
+def reuse_cached_result(conn, s3_client: S3Client, backtest_id: UUID, cache_key: str) -> bool:
+    """
+    Point the backtest at a copy of the cached log of an identical script run
+    on identical data and queue the report, which reuses the cached report
+    when there is one. False when there is nothing to reuse.
+    """
+    cached = get_cached_result(cache_key)
+    if cached is None:
+        RESULT_CACHE_COUNT.labels(result='miss').inc()
+        return False
+
+    timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
+    log_key = f"{backtest_id}/backtest_{timestamp}.log"
+    try:
+        s3_client.copy_file(cached['log_key'], log_key)
+    except Exception as e:
+        # The cached artifacts are gone, run the script instead
+        logger.warning(f"Cached result for backtest {backtest_id} not reusable: {e}")
+        RESULT_CACHE_COUNT.labels(result='miss').inc()
+        return False
+
+    RESULT_CACHE_COUNT.labels(result='hit').inc()
+    logger.info(f"Reusing execution result of backtest {cached['backtest_id']} for backtest {backtest_id}")
+    update_backtest_urls(conn, backtest_id, log_file_url=s3_client.get_file_url(log_key))
+    update_backtest_result_stats(conn, backtest_id, cached.get('stats') or {})
+    update_backtest_status(conn, backtest_id, BACKTEST_STATUS_EXECUTION_SUCCESSFUL)
+
+    from src.tasks.report_generation import generate_report
+    generate_report.delay(backtest_id=backtest_id)
+    return True
+
+def load_price_series(conn, backtest: dict, warmup: int) -> tuple:
+    """Timestamps and prices of the backtest's instrument and period as numpy arrays"""
+    timestamps, prices = fetch_price_series(
+        conn,
+        instrument_symbol=backtest["instrument_symbol"],
+        from_date=backtest["from_date"],
+        to_date=backtest["to_date"]
+    )
+    if prices.size <= warmup:
+        raise Exception(f"Not enough data to backtest: {prices.size} rows for a {warmup} bar indicator window")
+    return timestamps, prices
+
+def load_price_panel(conn, backtest: dict, warmup: int) -> tuple:
+    """Timestamps and aligned (symbols, bars) prices of the portfolio's instruments"""
+    symbols = backtest["portfolio"]["instrument_symbols"]
+    timestamps, prices = fetch_price_panel(
+        conn,
+        instrument_symbols=symbols,
+        from_date=backtest["from_date"],
+        to_date=backtest["to_date"]
+    )
+    missing = [symbol for symbol, row in zip(symbols, prices) if np.isnan(row).all()]
+    if missing:
+        raise Exception(f"No data for {', '.join(missing)} in the backtest period")
+
+    # Start once every instrument has a price
+    first = int(np.isnan(prices).any(axis=0).argmin())
+    timestamps, prices = timestamps[first:], prices[:, first:]
+    if timestamps.size <= warmup:
+        raise Exception(f"Not enough data to backtest: {timestamps.size} common rows for a {warmup} bar indicator window")
+    return timestamps, prices
+
+def monte_carlo_summary(result, initial_capital: float, periods_per_year: float, by_month: bool = False) -> str:
+    """
+    Robustness section of an in-process backtest log, empty when disabled or
+    without trades. Portfolios resample monthly blocks of their equity curve
+    with `by_month`, their sleeves' trades overlap in time.
+    """
+    if not settings.MONTE_CARLO_ENABLED:
+        return ""
+    if by_month:
+        period = max(1, round(periods_per_year / 12))
+        returns, unit = period_equity_returns(result.equity, initial_capital, period), "months"
+    else:
+        returns, unit = trade_equity_returns(result, initial_capital), "trades"
+    simulation = run_monte_carlo(
+        returns,
+        years=result.returns.size / periods_per_year,
+        paths=settings.MONTE_CARLO_PATHS,
+        method=settings.MONTE_CARLO_METHOD,
+        ruin_level=settings.MONTE_CARLO_RUIN_LEVEL,
+        chunk_cells=settings.MONTE_CARLO_CHUNK_CELLS,
+        max_workers=settings.MONTE_CARLO_MAX_WORKERS or None,
+        unit=unit
+    )
+    if simulation is None:
+        return ""
+    return "\n" + format_monte_carlo_summary(simulation)
+
+def upload_backtest_log(conn, s3_client: S3Client, backtest_id: UUID, log_contents: str, **urls):
+    """Upload an in-process backtest log, record its URL and queue the report"""
+    timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
+    log_key = f"{backtest_id}/backtest_{timestamp}.log"
+    s3_client.upload_file_content(
+        log_key,
+        log_contents,
+        content_type="text/plain"
+    )
+
+    update_backtest_urls(
+        conn,
+        backtest_id,
+        log_file_url=s3_client.get_file_url(log_key),
+        **urls
+    )
+    update_backtest_status(
+        conn,
+        backtest_id,
+        BACKTEST_STATUS_EXECUTION_SUCCESSFUL
+    )
+
+    # Queue report generation
+    from src.tasks.report_generation import generate_report
+    generate_report.delay(backtest_id=backtest_id)
+
+@celery_app.task(
+    bind=True,
+    base=BacktestExecutionTask,
+    name="src.tasks.backtest_execution.execute_strategy_spec"
+)
+@track_celery_task("execution")
+def execute_strategy_spec(self, backtest_id: UUID):
+    """Execute a structured strategy spec in-process on the vectorized engine"""
+    with get_db() as conn:
+        try:
+            backtest = update_backtest_status(conn, backtest_id, BACKTEST_STATUS_EXECUTION_IN_PROGRESS)
+            spec = StrategySpec.model_validate(backtest['strategy_spec'])
+            timestamps, prices = load_price_series(conn, backtest, spec.warmup())
+
+            periods_per_year = infer_periods_per_year(timestamps)
+            result = run_strategy_spec(spec, prices, periods_per_year)
+            log_contents = format_backtest_log(
+                result,
+                timestamps,
+                prices,
+                strategy_title=backtest['strategy_title'],
+                strategy_spec=backtest['strategy_spec']
+            )
+            log_contents += monte_carlo_summary(result, spec.initial_capital, periods_per_year)
+            logger.info(f"Backtest log contents for {backtest_id}:\n{log_contents}")
+
+            upload_backtest_log(conn, S3Client(), backtest_id, log_contents)
+
+        except Exception as e:
+            update_backtest_status(
+                conn,
+                backtest_id,
+                BACKTEST_STATUS_EXECUTION_FAILED,
+                str(e)
+            )
+            raise
+
+@celery_app.task(
+    bind=True,
+    base=BacktestExecutionTask,
+    name="src.tasks.backtest_execution.execute_parameter_sweep"
+)
+@track_celery_task("execution")
+def execute_parameter_sweep(self, backtest_id: UUID):
+    """Backtest every combination of a parameter grid in one execution"""
+    with get_db() as conn:
+        try:
+            backtest = update_backtest_status(conn, backtest_id, BACKTEST_STATUS_EXECUTION_IN_PROGRESS)
+            spec = StrategySpec.model_validate(backtest['strategy_spec'])
+            grid = backtest['parameter_grid']
+            warmup = max([spec.warmup()] + [int(max(v)) for k, v in grid.items() if k.endswith(".window")])
+            timestamps, prices = load_price_series(conn, backtest, warmup)
+            periods_per_year = infer_periods_per_year(timestamps)
+
+            table = run_sweep(
+                spec,
+                prices,
+                grid,
+                periods_per_year=periods_per_year,
+                rank_by=settings.SWEEP_RANK_METRIC,
+                chunk_cells=settings.SWEEP_CHUNK_CELLS,
+                max_workers=settings.SWEEP_MAX_WORKERS or None
+            )
+            logger.info(f"Parameter sweep of {len(table)} combinations finished for backtest {backtest_id}")
+
+            s3_client = S3Client()
+            results_key = f"{backtest_id}/sweep_results.csv"
+            heatmap_key = f"{backtest_id}/sweep_heatmap.png"
+            s3_client.upload_file_content(
+                results_key,
+                table.to_csv(index=False),
+                content_type="text/csv"
+            )
+            s3_client.upload_file_content(
+                heatmap_key,
+                render_heatmap(table, grid, metric=settings.SWEEP_RANK_METRIC),
+                content_type="image/png"
+            )
+
+            # The report is written from the best combination's full log plus the ranking
+            best = apply_parameters(spec, {key: table.iloc[0][key] for key in grid})
+            result = run_strategy_spec(best, prices, periods_per_year)
+            log_contents = format_backtest_log(
+                result,
+                timestamps,
+                prices,
+                strategy_title=backtest['strategy_title'],
+                strategy_spec=best.model_dump()
+            )
+            log_contents += "\n" + format_sweep_summary(table, grid)
+            log_contents += monte_carlo_summary(result, best.initial_capital, periods_per_year)
+            logger.info(f"Backtest log contents for {backtest_id}:\n{log_contents}")
+
+            upload_backtest_log(
+                conn,
+                s3_client,
+                backtest_id,
+                log_contents,
+                sweep_results_url=s3_client.get_file_url(results_key),
+                sweep_heatmap_url=s3_client.get_file_url(heatmap_key)
+            )
+
+        except Exception as e:
+            update_backtest_status(
+                conn,
+                backtest_id,
+                BACKTEST_STATUS_EXECUTION_FAILED,
+                str(e)
+            )
+            raise
+
+@celery_app.task(
+    bind=True,
+    base=BacktestExecutionTask,
+    name="src.tasks.backtest_execution.execute_walk_forward"
+)
+@track_celery_task("execution")
+def execute_walk_forward(self, backtest_id: UUID):
+    """Trade rolling out-of-sample windows, optionally re-optimizing on each train window"""
+    with get_db() as conn:
+        try:
+            backtest = update_backtest_status(conn, backtest_id, BACKTEST_STATUS_EXECUTION_IN_PROGRESS)
+            spec = StrategySpec.model_validate(backtest['strategy_spec'])
+            config = backtest['walk_forward']
+            timestamps, prices = load_price_series(conn, backtest, spec.warmup())
+            periods_per_year = infer_periods_per_year(timestamps)
+
+            result, index, windows = run_walk_forward(
+                spec,
+                timestamps,
+                prices,
+                train_days=config['train_days'],
+                test_days=config['test_days'],
+                step_days=config.get('step_days'),
+                grid=backtest['parameter_grid'],
+                periods_per_year=periods_per_year,
+                rank_by=settings.SWEEP_RANK_METRIC,
+                max_workers=settings.WALK_FORWARD_MAX_WORKERS or None
+            )
+            log_contents = format_backtest_log(
+                result,
+                timestamps[index],
+                prices[index],
+                strategy_title=backtest['strategy_title'],
+                strategy_spec=backtest['strategy_spec']
+            )
+            log_contents += "\n" + format_walk_forward_summary(windows)
+            log_contents += monte_carlo_summary(result, spec.initial_capital, periods_per_year)
+            logger.info(f"Backtest log contents for {backtest_id}:\n{log_contents}")
+
+            upload_backtest_log(conn, S3Client(), backtest_id, log_contents)
+
+        except Exception as e:
+            update_backtest_status(
+                conn,
+                backtest_id,
+                BACKTEST_STATUS_EXECUTION_FAILED,
+                str(e)
+            )
+            raise
+
+@celery_app.task(
+    bind=True,
+    base=BacktestExecutionTask,
+    name="src.tasks.backtest_execution.execute_portfolio"
+)
+@track_celery_task("execution")
+def execute_portfolio(self, backtest_id: UUID):
+    """Trade the strategy on every instrument of a portfolio and combine them by allocation"""
+    with get_db() as conn:
+        try:
+            backtest = update_backtest_status(conn, backtest_id, BACKTEST_STATUS_EXECUTION_IN_PROGRESS)
+            spec = StrategySpec.model_validate(backtest['strategy_spec'])
+            config = backtest['portfolio']
+            timestamps, prices = load_price_panel(conn, backtest, spec.warmup())
+            periods_per_year = infer_periods_per_year(timestamps)
+
+            result, _, table = run_portfolio(
+                spec,
+                config['instrument_symbols'],
+                timestamps,
+                prices,
+                allocation=config.get('allocation', 'equal'),
+                weights=config.get('weights'),
+                volatility_window=config.get('volatility_window', 20),
+                rebalance_days=config.get('rebalance_days'),
+                periods_per_year=periods_per_year
+            )
+            log_contents = format_backtest_log(
+                result,
+                timestamps,
+                portfolio_index(prices),
+                strategy_title=backtest['strategy_title'],
+                strategy_spec=backtest['strategy_spec'],
+                symbols=config['instrument_symbols']
+            )
+            log_contents += "\n" + format_portfolio_summary(
+                table,
+                config.get('allocation', 'equal'),
+                config.get('rebalance_days')
+            )
+            log_contents += monte_carlo_summary(result, spec.initial_capital, periods_per_year, by_month=True)
+            logger.info(f"Backtest log contents for {backtest_id}:\n{log_contents}")
+
+            upload_backtest_log(conn, S3Client(), backtest_id, log_contents)
+
+        except Exception as e:
+            update_backtest_status(
+                conn,
+                backtest_id,
+                BACKTEST_STATUS_EXECUTION_FAILED,
+                str(e)
+            )
+            raise
@@ -0,0 +1,80 @@
+from celery import Task
+from uuid import UUID
+import hashlib
+
+from src.infrastructure.queue.celery_app import celery_app
+from src.db.base import get_db
+from src.db.queries.backtests import (
+    get_backtest_by_id,
+    update_backtest_preview_image_url
+)
+from src.infrastructure.storage.s3_client import S3Client
+from src.infrastructure.http.clients import http_clients
+from src.config.settings import settings
+from src.utils.logger import get_logger
+
+from src.infrastructure.queue.instrumentation import track_celery_task
+from src.infrastructure.queue.event_loop import run_async
+
+logger = get_logger(__name__)
+
+async def render_preview_image(user_id: UUID, report_content: str) -> str:
+    """Render the report preview image and return its URL"""
+    client = http_clients.get_async_client("preview")
+    response = await client.post(
+        f"{settings.PREVIEW_IMAGE_SERVER_URL}/generate-preview",
+        json={
+            "userId": str(user_id),
+            "markdown": report_content
+        }
+    )
+    response.raise_for_status()
+    return response.json()['imageUrl']
+
+class PreviewGenerationTask(Task):
+    def on_failure(self, exc, task_id, args, kwargs, einfo):
+        """A missing preview only degrades share links, the backtest itself is left untouched"""
+        logger.error(f"Preview generation failed for backtest {kwargs.get('backtest_id')}: {str(exc)}")
+
+@celery_app.task(
+    bind=True,
+    base=PreviewGenerationTask,
+    name="src.tasks.preview_generation.generate_preview_image",
+    max_retries=3,
+    default_retry_delay=30
+)
+@track_celery_task("preview_generation")
+def generate_preview_image(self, backtest_id: UUID):
+    """
+    Generate the share preview image of a backtest report.
+
+    Keyed by the hash of the report content, so repeated calls for an
+    unchanged report reuse the existing image instead of rendering it again.
+    """
+    with get_db() as conn:
+        backtest = get_backtest_by_id(conn, backtest_id=backtest_id)
+        if not backtest or not backtest.get('report_url'):
+            logger.warning(f"No report to preview for backtest {backtest_id}")
+            return
+
+        s3_client = S3Client()
+        report_content = run_async(s3_client.get_file_content(f"{backtest_id}/report.md"))
+        report_hash = hashlib.sha256(report_content.encode("utf-8")).hexdigest()
+
+        if backtest.get('preview_image_url') and backtest.get('preview_report_hash') == report_hash:
+            logger.info(f"Preview for backtest {backtest_id} is up to date")
+            return
+
+        try:
+            preview_image_url = run_async(render_preview_image(backtest['user_id'], report_content))
+        except Exception as e:
+            logger.warning(f"Preview rendering failed for backtest {backtest_id}, retrying: {str(e)}")
+            raise self.retry(exc=e)
+
+        update_backtest_preview_image_url(
+            conn,
+            backtest_id,
+            preview_image_url=preview_image_url,
+            preview_report_hash=report_hash
+        )
+        logger.info(f"Preview generated for backtest {backtest_id}")
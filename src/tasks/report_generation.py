@@ -8,12 +8,16 @@ from src.db.queries.backtests import (
     update_backtest_urls
 )
 from src.infrastructure.storage.s3_client import S3Client
-from src.infrastructure.llm.openai_client import generate_backtest_report
-from src.infrastructure.llm.localllm_client import CustomLLMClient
+from src.infrastructure.llm.router import llm_router
+from src.infrastructure.http.clients import http_clients
+from src.api.services.postbacks import post_report_chunk
+from src.api.services.result_cache import get_cached_result, store_report
+from src.tasks.preview_generation import generate_preview_image
+from src.config.settings import settings
 from src.utils.logger import get_logger
 import asyncio
-import requests
 import tempfile
+import time
 import os
 
 from src.constants.backtests import (
@@ -23,10 +27,75 @@ from src.constants.backtests import (
 )
 
 from src.infrastructure.queue.instrumentation import track_celery_task
+from src.infrastructure.queue.event_loop import run_async
 
 
 logger = get_logger(__name__)
 
+async def send_report_chunks(backtest_id: UUID, user_id: str, chunks: asyncio.Queue):
+    """Post queued (chunk, index, done) items in order until a None arrives"""
+    while (item := await chunks.get()) is not None:
+        chunk, index, done = item
+        try:
+            await post_report_chunk(backtest_id, user_id, chunk, index, done=done)
+        except Exception as e:
+            logger.warning(f"Failed to send report chunk {index} for backtest {backtest_id}: {e}")
+
+async def stream_report(backtest_id: UUID, user_id: str, log_content: str) -> str:
+    """
+    Consume the streamed LLM report, forwarding buffered chunks to the user
+    as they arrive, and return the complete markdown document. Chunks are
+    posted by a separate task so a slow or failing postback never holds up
+    the LLM stream.
+    """
+    parts = []
+    pending = []
+    index = 0
+    last_flush = 0.0
+    chunks: asyncio.Queue = asyncio.Queue()
+    sender = asyncio.create_task(send_report_chunks(backtest_id, user_id, chunks))
+
+    try:
+        async for delta in llm_router.stream_backtest_report(log_content):
+            parts.append(delta)
+            pending.append(delta)
+
+            # Flush the first delta immediately, then batch the rest
+            now = time.monotonic()
+            if now - last_flush >= settings.REPORT_STREAM_FLUSH_INTERVAL:
+                chunks.put_nowait(("".join(pending), index, False))
+                pending.clear()
+                index += 1
+                last_flush = now
+    except BaseException:
+        sender.cancel()
+        raise
+
+    chunks.put_nowait(("".join(pending), index, True))
+    chunks.put_nowait(None)
+    await sender
+
+    return "".join(parts).strip()
+
+def reuse_cached_report(s3_client: S3Client, backtest: dict, cache_key: str, report_key: str) -> bool:
+    """
+    Copy the report of an identical cached execution to report_key and send it
+    to the user as one final chunk. False when there is none to reuse.
+    """
+    cached = get_cached_result(cache_key) if cache_key else None
+    if not cached or not cached.get('report_key') or cached['backtest_id'] == str(backtest['id']):
+        return False
+    try:
+        s3_client.copy_file(cached['report_key'], report_key)
+        report_content = run_async(s3_client.get_file_content(report_key))
+    except Exception as e:
+        logger.warning(f"Cached report for backtest {backtest['id']} not reusable: {e}")
+        return False
+
+    logger.info(f"Reusing report of backtest {cached['backtest_id']} for backtest {backtest['id']}")
+    run_async(post_report_chunk(backtest['id'], backtest['user_id'], report_content, 0, done=True))
+    return True
+
 class ReportGenerationTask(Task):
     def on_failure(self, exc, task_id, args, kwargs, einfo):
         """Handle task failure"""
@@ -58,32 +127,34 @@ def generate_report(self, backtest_id: UUID):
                 # Update status to generating report
                 backtest = update_backtest_status(conn, backtest_id, BACKTEST_STATUS_REPORT_GENERATION_IN_PROGRESS)
                 
-                async def download_files():
-                    # Download script using HTTP
-                    response = requests.get(backtest['log_file_url'])
-                    with open(log_path, 'wb') as log_file:
-                        log_file.write(response.content)
-
-                # Download log file
-                asyncio.run(download_files())
-
-                with open(log_path, 'r') as log_file:
-                    log_content = log_file.read()
-                
-                # Generate report using LLM
-                # custom_llm = CustomLLMClient()
-                report_content = asyncio.run(generate_backtest_report(log_content))
-                
                 # Initialize S3 client
                 s3_client = S3Client()
-                
-                # Upload report to S3
                 report_key = f"{backtest_id}/report.md"
-                s3_client.upload_file_content(
-                    report_key,
-                    report_content,
-                    content_type="text/markdown"
-                )
+                cache_key = backtest.get('result_cache_key') if settings.RESULT_CACHE_ENABLED else None
+
+                if not reuse_cached_report(s3_client, backtest, cache_key, report_key):
+                    # Download log file
+                    http_clients.download_to_file(backtest['log_file_url'], log_path)
+
+                    with open(log_path, 'r') as log_file:
+                        log_content = log_file.read()
+
+                    # Generate report using LLM
+                    if settings.REPORT_STREAMING_ENABLED:
+                        report_content = run_async(
+                            stream_report(backtest_id, backtest['user_id'], log_content)
+                        )
+                    else:
+                        report_content = run_async(llm_router.generate_backtest_report(log_content))
+
+                    # Upload report to S3
+                    s3_client.upload_file_content(
+                        report_key,
+                        report_content,
+                        content_type="text/markdown"
+                    )
+                    if cache_key:
+                        store_report(cache_key, report_key)
                 
                 # Update backtest record with report URL
                 report_url = s3_client.get_file_url(report_key)
@@ -102,6 +173,9 @@ def generate_report(self, backtest_id: UUID):
                 )
                 
                 logger.info(f"Report generation completed for backtest {backtest_id}")
+
+                # Render the share preview in the background, ahead of any share click
+                generate_preview_image.delay(backtest_id=backtest_id)
             
         except Exception as e:
             logger.error(f"Report generation failed for backtest {backtest_id}: {str(e)}")
@@ -1,20 +1,26 @@
 from celery import Task
 import logging
 from uuid import UUID
+import asyncio
 
 from src.infrastructure.queue.celery_app import celery_app
 from src.db.base import get_db
 from src.db.queries.backtests import (
     update_backtest_status,
-    update_backtest_urls
+    update_backtest_urls,
+    update_backtest_title,
+    update_backtest_strategy_spec
 )
 from src.db.queries.tick_data import (
     get_available_columns,
     fetch_tick_data
 )
-from src.infrastructure.llm.openai_client import generate_backtest_script
+from src.infrastructure.llm.router import llm_router
+from src.infrastructure.llm.prompts import backtest_engine_prompt_addendum
 from src.infrastructure.storage.s3_client import S3Client
-# from src.infrastructure.llm.localllm_client import CustomLLMClient
+from src.core.backtesting.generator import generate_strategy_spec
+from src.core.backtesting.validator import script_warnings
+from src.config.settings import settings
 
 from src.constants.backtests import (
     BACKTEST_STATUS_READY_FOR_VALIDATION,
@@ -22,6 +28,7 @@ from src.constants.backtests import (
     BACKTEST_STATUS_SCRIPT_GENERATION_IN_PROGRESS,
 )
 from src.infrastructure.queue.instrumentation import track_celery_task
+from src.infrastructure.queue.event_loop import run_async
 
 # Set up logger
 logger = logging.getLogger(__name__)
@@ -40,6 +47,15 @@ class ScriptGenerationTask(Task):
                     str(exc)
                 )
 
+def save_strategy_title(conn, backtest_id: UUID, strategy_title: str):
+    if strategy_title == "None":
+        raise Exception("Invalid strategy description")
+
+    # Sanitize strategy title by removing any leading or trailing whitespace
+    strategy_title = strategy_title.strip().strip('"')
+    update_backtest_title(conn, backtest_id, strategy_title)
+    logger.info(f"Updated strategy title for backtest {backtest_id}: {strategy_title}")
+
 @celery_app.task(
     bind=True,
     base=ScriptGenerationTask,
@@ -62,7 +78,56 @@ def generate_backtest_script_task(self, backtest_id: UUID):
                 raise Exception(f"Backtest record not found or could not be updated for ID: {backtest_id}")
 
             logger.info(f"Backtest record: {backtest}")
-            
+
+            # Common strategy families are described by a structured spec and
+            # run in-process, skipping script generation, validation and the
+            # execution subprocess entirely
+            strategy_spec = None
+            if settings.STRATEGY_SPEC_ENABLED:
+                strategy_spec = run_async(generate_strategy_spec(
+                    backtest['strategy_description'],
+                    use_llm=settings.STRATEGY_SPEC_LLM_ENABLED
+                ))
+
+            if backtest['parameter_grid'] and strategy_spec is None:
+                raise Exception(
+                    "Parameter sweeps are only supported for strategies the built-in engine can run"
+                )
+            if backtest['walk_forward'] and strategy_spec is None:
+                raise Exception(
+                    "Walk-forward evaluation is only supported for strategies the built-in engine can run"
+                )
+            if backtest['portfolio'] and strategy_spec is None:
+                raise Exception(
+                    "Portfolio backtests are only supported for strategies the built-in engine can run"
+                )
+
+            if strategy_spec is not None:
+                logger.info(f"Running backtest {backtest_id} from strategy spec: {strategy_spec}")
+                save_strategy_title(
+                    conn,
+                    backtest_id,
+                    run_async(llm_router.generate_strategy_title(backtest['strategy_description']))
+                )
+                update_backtest_strategy_spec(conn, backtest_id, strategy_spec.model_dump())
+
+                from src.tasks.backtest_execution import (
+                    execute_parameter_sweep,
+                    execute_portfolio,
+                    execute_strategy_spec,
+                    execute_walk_forward
+                )
+                if backtest['portfolio']:
+                    execute_portfolio.delay(backtest_id=backtest_id)
+                elif backtest['walk_forward']:
+                    execute_walk_forward.delay(backtest_id=backtest_id)
+                elif backtest['parameter_grid']:
+                    execute_parameter_sweep.delay(backtest_id=backtest_id)
+                else:
+                    execute_strategy_spec.delay(backtest_id=backtest_id)
+                logger.info(f"Queued strategy spec execution for backtest {backtest_id}")
+                return
+
             available_columns = get_available_columns(
                 conn,
                 instrument_symbol=backtest["instrument_symbol"],
@@ -70,19 +135,25 @@ def generate_backtest_script_task(self, backtest_id: UUID):
                 to_date=backtest["to_date"]
             )
             extra_message = f"Keep in mind that I have the following available columns in database for backtesting: {', '.join(available_columns)}. If the script requires any other data points than these, then simply return None as response."
+            extra_message += f"\n{backtest_engine_prompt_addendum}"
 
             logger.info(f'Extra message: {extra_message}')
 
-            # Generate script using LLM
-            logger.info(f"Generating script using LLM for backtest {backtest_id}")
-            # custom_llm = CustomLLMClient()
+            # Generate title and script using LLM, the title is generated
+            # here rather than in the API so that creation stays a fast insert
+            logger.info(f"Generating title and script using LLM for backtest {backtest_id}")
 
-            import asyncio
+            async def generate_title_and_script():
+                return await asyncio.gather(
+                    llm_router.generate_strategy_title(backtest['strategy_description']),
+                    llm_router.generate_backtest_script(
+                        strategy_description=backtest['strategy_description'],
+                        extra_message=extra_message
+                    )
+                )
 
-            script, data_points = asyncio.run(generate_backtest_script(
-                strategy_description=backtest['strategy_description'],
-                extra_message=extra_message
-            ))
+            strategy_title, (script, data_points) = run_async(generate_title_and_script())
+            save_strategy_title(conn, backtest_id, strategy_title)
 
             if not script and not data_points:
                 # update backtest by saying we cannot backtest this yet
@@ -91,6 +162,18 @@ def generate_backtest_script_task(self, backtest_id: UUID):
             logger.info(f'Data points: {data_points}')
             logger.info(f"Generated script length: {len(script)} characters")
 
+            # Reject scripts that would certainly fail before spending a
+            # validation run on them, after trying to repair them in place
+            if settings.SCRIPT_STATIC_VALIDATION_ENABLED:
+                from src.tasks.script_validation import repair_script, static_check
+
+                check = static_check(data_points, available_columns)
+                script, problems = repair_script(script, check(script), check, "script_generation", backtest_id)
+                if problems:
+                    raise Exception(f"Generated script failed static validation: {problems}")
+                for warning in script_warnings(script):
+                    logger.warning(f"Generated script for backtest {backtest_id}: {warning}")
+
             # Initialize S3 client and upload files
             logger.info(f"Uploading files to S3 for backtest {backtest_id}")
             
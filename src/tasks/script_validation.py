@@ -1,7 +1,9 @@
 from celery import Task
 from uuid import UUID
+from typing import Callable, List, Optional, Tuple
 import subprocess
 import tempfile
+import csv
 import os
 import requests
 import asyncio
@@ -13,6 +15,11 @@ from src.db.queries.backtests import (
     update_backtest_status
 )
 from src.infrastructure.storage.s3_client import S3Client
+from src.core.backtesting.executor import script_environment
+from src.core.backtesting.validator import validate_script_source
+from src.infrastructure.llm.router import llm_router
+from src.config.settings import settings
+from src.utils.metrics import SCRIPT_REPAIR_COUNT
 
 from src.constants.backtests import (
     BACKTEST_STATUS_VALIDATION_FAILED,
@@ -20,6 +27,7 @@ from src.constants.backtests import (
     BACKTEST_STATUS_VALIDATION_PASSED
 )
 from src.infrastructure.queue.instrumentation import track_celery_task
+from src.infrastructure.queue.event_loop import run_async
 
 from src.utils.logger import get_logger
 logger = get_logger(__name__)
@@ -37,6 +45,65 @@ class ScriptValidationTask(Task):
                     str(exc)
                 )
 
+def run_script(script_path: str, data_path: str, log_path: str) -> Optional[str]:
+    """Run a generated script against a dataset, returns its error output when it fails"""
+    try:
+        result = subprocess.run(
+            ["python", script_path, "--data", data_path, "--log", log_path],
+            capture_output=True,
+            text=True,
+            env=script_environment(),
+            timeout=300  # 5 minute timeout
+        )
+    except subprocess.TimeoutExpired as e:
+        logger.error(f"Script timed out. Last stdout: {e.stdout}\nLast stderr: {e.stderr}")
+        return "The script timed out after 300 seconds on 100 rows of data, it must not loop row by row"
+
+    logger.info(f"Script execution output - stdout:\n{result.stdout}")
+    logger.info(f"Script execution output - stderr:\n{result.stderr}")
+    if result.returncode != 0:
+        logger.error(f"Validation failed. Subprocess result: {result}")
+        return result.stderr or f"The script exited with code {result.returncode}"
+    return None
+
+def repair_script(
+    script: str,
+    error: Optional[str],
+    check: Callable[[str], Optional[str]],
+    stage: str,
+    backtest_id: UUID
+) -> Tuple[str, Optional[str]]:
+    """
+    Send a failing script back to the LLM with its error, up to
+    SCRIPT_REPAIR_MAX_ATTEMPTS times. `check` returns the error of a fixed
+    script, or None when it passes. Returns the last script and its error,
+    None once the script is repaired.
+    """
+    attempts = 0
+    while error and attempts < settings.SCRIPT_REPAIR_MAX_ATTEMPTS:
+        attempts += 1
+        logger.info(f"Repairing script for backtest {backtest_id}, attempt {attempts}: {error[-500:]}")
+        # The end of a traceback holds the actual error
+        fixed = run_async(llm_router.generate_fixed_script(script, error[-4000:]))
+        if not fixed:
+            break
+        script, error = fixed, check(fixed)
+
+    if attempts:
+        SCRIPT_REPAIR_COUNT.labels(stage=stage, outcome="failed" if error else "repaired").inc()
+    return script, error
+
+def static_check(
+    data_columns: Optional[List[str]] = None,
+    available_columns: Optional[List[str]] = None
+) -> Callable[[str], Optional[str]]:
+    """Check for `repair_script` reporting the static problems of a script"""
+    def check(script: str) -> Optional[str]:
+        if not settings.SCRIPT_STATIC_VALIDATION_ENABLED:
+            return None
+        return "; ".join(validate_script_source(script, data_columns, available_columns)) or None
+    return check
+
 @celery_app.task(
     bind=True,
     base=ScriptValidationTask,
@@ -69,31 +136,39 @@ def validate_backtest_script(self, backtest_id: UUID):
                     )
 
                 # Run the async download function
-                asyncio.run(download_files())
+                run_async(download_files())
                 logger.info(f'Downloading files for backtest: {backtest_id}')
                 
                 # Make script executable
                 os.chmod(script_path, 0o755)
                 
-                # Run script with validation data
+                # Run script with validation data, failures are sent back to the
+                # LLM with their error and retried here against the same data
                 logger.info(f"Running script with validation data for backtest: {backtest_id}")
+                with open(script_path) as script_file:
+                    script = script_file.read()
+                with open(data_path, newline="") as data_file:
+                    data_columns = next(csv.reader(data_file), None) or None
 
-                try:
-                    result = subprocess.run(
-                        ["python", script_path, "--data", data_path, "--log", log_path],
-                        capture_output=True,
-                        text=True,
-                        timeout=300  # 5 minute timeout
-                    )
-                    logger.info(f"Script execution output - stdout:\n{result.stdout}")
-                    logger.info(f"Script execution output - stderr:\n{result.stderr}")
-                except subprocess.TimeoutExpired as e:
-                    logger.error(f"Script timed out for backtest {backtest_id}. Last stdout: {e.stdout}\nLast stderr: {e.stderr}")
-                    raise
-                
-                if result.returncode != 0:
-                    logger.error(f"Validation failed. Subprocess result: {result}")
-                    raise Exception(f"Validation failed: {result.stderr}")
+                static = static_check(data_columns)
+
+                def check(fixed: str) -> Optional[str]:
+                    problems = static(fixed)
+                    if problems:
+                        return problems
+                    with open(script_path, "w") as script_file:
+                        script_file.write(fixed)
+                    return run_script(script_path, data_path, log_path)
+
+                error = run_script(script_path, data_path, log_path)
+                repaired, error = repair_script(script, error, check, "validation", backtest_id)
+                if error:
+                    raise Exception(f"Validation failed: {error}")
+
+                if repaired != script:
+                    # Execution downloads the script again, replace it with the repaired one
+                    s3_client.upload_file_content(script_key, repaired, content_type="text/plain")
+                    logger.info(f"Script for backtest {backtest_id} repaired")
 
                 logger.info(f"Successfully validated script for backtest: {backtest_id}")
 
@@ -36,11 +36,23 @@ BACKTEST_QUEUE_SIZE = Gauge(
     ['stage']
 )
 
+SCRIPT_REPAIR_COUNT = Counter(
+    'script_repair_total',
+    'Total number of generated scripts sent through the in-task repair loop',
+    ['stage', 'outcome']  # stages: script_generation, validation; outcomes: repaired, failed
+)
+
+RESULT_CACHE_COUNT = Counter(
+    'backtest_result_cache_total',
+    'Total number of execution result cache lookups',
+    ['result']  # results: hit, miss
+)
+
 # LLM Metrics
 LLM_REQUEST_COUNT = Counter(
     'llm_request_total',
     'Total number of LLM API requests',
-    ['operation', 'status']  # operations: title_generation, script_generation, report_generation
+    ['operation', 'status']  # operations: title_generation, script_generation, spec_generation, report_generation
 )
 
 LLM_REQUEST_DURATION = Histogram(
@@ -49,6 +61,18 @@ LLM_REQUEST_DURATION = Histogram(
     ['operation']
 )
 
+LLM_PROVIDER_REQUEST_DURATION = Histogram(
+    'llm_provider_request_duration_seconds',
+    'LLM request duration per provider in seconds',
+    ['provider', 'operation']
+)
+
+LLM_PROVIDER_FAILOVER_COUNT = Counter(
+    'llm_provider_failover_total',
+    'Total number of LLM requests that failed over or were hedged to another provider',
+    ['provider', 'operation', 'reason']  # reasons: error, hedge
+)
+
 # S3 Metrics
 S3_OPERATION_COUNT = Counter(
     's3_operation_total',
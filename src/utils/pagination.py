@@ -0,0 +1,18 @@
+import base64
+from datetime import datetime
+from typing import Tuple
+from uuid import UUID
+
+def encode_cursor(created_at: datetime, row_id) -> str:
+    """Encode a (created_at, id) keyset position into an opaque cursor"""
+    raw = f"{created_at.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Decode a cursor produced by encode_cursor, raises ValueError if it is malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = base64.urlsafe_b64decode(padded.encode()).decode().split("|", 1)
+        return datetime.fromisoformat(created_at), str(UUID(row_id))
+    except Exception:
+        raise ValueError("Invalid cursor")
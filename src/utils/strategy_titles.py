@@ -0,0 +1,6 @@
+def get_provisional_strategy_title(strategy_description: str, max_length: int = 50) -> str:
+    """Build a placeholder title from the description until the LLM title is ready"""
+    title = " ".join(strategy_description.split())
+    if len(title) <= max_length:
+        return title
+    return title[:max_length - 3].rstrip() + "..."
@@ -0,0 +1,49 @@
+import os
+
+import numpy as np
+import pytest
+
+# Required settings without defaults, so modules that load settings can be
+# imported by unit tests. Real values from the environment win.
+TEST_SETTINGS = {
+    "SHARE_FRONTEND_URL": "http://localhost:3000",
+    "POSTGRES_USER": "alphabench",
+    "POSTGRES_PASSWORD": "alphabench",
+    "POSTGRES_DB": "alphabench",
+    "AWS_ACCESS_KEY_ID": "test",
+    "AWS_SECRET_ACCESS_KEY": "test",
+    "AWS_REGION": "us-east-1",
+    "S3_BUCKET_NAME": "alphabench-test",
+    "OPENAI_API_KEY": "test",
+    "OPENAI_MODEL": "gpt-4o",
+    "LOCAL_LLM_SERVER_URL": "http://localhost:8080",
+    "LOCAL_LLM_MODEL_NAME": "test",
+    "GOOGLE_CLIENT_ID": "test",
+    "GOOGLE_CLIENT_SECRET": "test",
+    "JWT_SECRET_KEY": "test",
+    "INTERNAL_API_TOKEN": "test",
+    "RAZORPAY_KEY_ID": "test",
+    "RAZORPAY_KEY_SECRET": "test",
+    "RAZORPAY_WEBHOOK_SECRET": "test",
+    "PREVIEW_IMAGE_SERVER_URL": "http://localhost:8000",
+}
+for name, value in TEST_SETTINGS.items():
+    os.environ.setdefault(name, value)
+
+SMA_CROSS_DESCRIPTION = "Buy when the 5 SMA crosses above the 20 SMA, sell when it crosses below"
+
+@pytest.fixture
+def random_prices():
+    """Seeded random walk prices, `make(shape)` walks along the last axis"""
+    def make(shape, volatility=0.01):
+        return 100 * np.cumprod(1 + np.random.default_rng(0).normal(0, volatility, shape), axis=-1)
+    return make
+
+@pytest.fixture
+def sma_cross_description():
+    return SMA_CROSS_DESCRIPTION
+
+@pytest.fixture
+def sma_cross_spec():
+    from src.core.backtesting.generator import parse_strategy_description
+    return parse_strategy_description(SMA_CROSS_DESCRIPTION)
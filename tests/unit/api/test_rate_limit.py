@@ -0,0 +1,61 @@
+# tests/unit/api/test_rate_limit.py
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from src.api import dependencies
+from src.config.settings import settings
+
+USER = {"id": "u1", "is_anonymous": False}
+
+class FakeConnection:
+    def commit(self):
+        pass
+
+class FakeLoader:
+    def __init__(self, plan_reports_per_day, reports_today):
+        self.context = {"plan_reports_per_day": plan_reports_per_day, "reports_today": reports_today, "user": USER}
+
+    def get_user_context(self, user_id):
+        return self.context
+
+    def __enter__(self):
+        return FakeConnection()
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+@pytest.fixture
+def upserts(monkeypatch):
+    """Limits passed to the counting upsert, which counts while `counted` is true"""
+    calls = {"limits": [], "counted": True}
+
+    def execute_query_single(conn, query, params):
+        calls["limits"].append(params[2])
+        return {"count": 1} if calls["counted"] else None
+
+    monkeypatch.setattr(dependencies, "execute_query_single", execute_query_single)
+    return calls
+
+def check(loader):
+    return asyncio.run(dependencies.check_user_rate_limit(None, USER, loader))
+
+def test_reports_are_counted_against_the_plan_limit(upserts):
+    assert check(FakeLoader(5, 4)) == USER
+    assert check(FakeLoader(None, 0)) == USER
+    assert upserts["limits"] == [5, settings.AUTHENTICATED_DAILY_LIMIT]
+
+    # Users over the limit are refused without counting
+    with pytest.raises(HTTPException) as error:
+        check(FakeLoader(5, 5))
+    assert error.value.status_code == 429 and len(upserts["limits"]) == 2
+
+def test_upsert_refusal_is_rate_limited(upserts):
+    # A concurrent request took the last report after the user was loaded,
+    # the upsert re-checks the limit and counts nothing
+    upserts["counted"] = False
+    with pytest.raises(HTTPException) as error:
+        check(FakeLoader(5, 4))
+    assert error.value.status_code == 429
+    assert upserts["limits"] == [5]
@@ -0,0 +1,42 @@
+# tests/unit/api/test_reports.py
+from contextlib import nullcontext
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api.routes import reports
+from src.core.auth.jwt import get_current_user
+from src.db.loaders import get_request_loader
+from src.main import app
+from src.utils.pagination import decode_cursor
+
+USER = {"id": str(uuid4())}
+NOW = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+def report(index):
+    return {
+        "id": str(uuid4()),
+        "strategy_title": f"Strategy {index}",
+        "status": "completed",
+        "report_url": f"https://s3/{index}/report.md",
+        "created_at": NOW - timedelta(minutes=index),
+        "updated_at": NOW
+    }
+
+@pytest.fixture
+def client(monkeypatch):
+    rows = [report(index) for index in range(3)]
+    monkeypatch.setattr(reports, "get_user_reports", lambda conn, user_id, limit, after: rows[:limit])
+    app.dependency_overrides[get_current_user] = lambda: USER
+    app.dependency_overrides[get_request_loader] = lambda: nullcontext()
+    yield TestClient(app, headers={"Authorization": "Bearer x"}), rows
+    app.dependency_overrides.clear()
+
+def test_cross_origin_clients_can_read_the_next_cursor(client):
+    client, rows = client
+    response = client.get("/v1/reports", params={"limit": 2}, headers={"Origin": "https://app.example.com"})
+    assert response.status_code == 200
+    assert "X-Next-Cursor" in response.headers["Access-Control-Expose-Headers"]
+    assert decode_cursor(response.headers["X-Next-Cursor"]) == (rows[1]["created_at"], rows[1]["id"])
@@ -0,0 +1,43 @@
+# tests/unit/core/backtesting/test_executor.py
+import numpy as np
+
+from src.core.backtesting.executor import (
+    BacktestConfig,
+    run_backtest,
+    signals_from_entries_exits
+)
+
+PRICES = np.array([100, 101, 102, 100, 97, 96, 99, 103, 104, 100], dtype=float)
+
+def test_signals_trade_on_next_bar():
+    result = run_backtest(np.array([1.0, 2.0, 3.0]), np.array([1, 1, 0]))
+    assert result.positions.tolist() == [0, 1, 1]
+    assert result.stats["total_return"] == 2.0
+
+def test_stop_loss_flattens_until_signal_changes():
+    signals = np.array([1, 1, 1, 1, 1, 1, 0, 1, 1, 1])
+    result = run_backtest(PRICES, signals, BacktestConfig(stop_loss=0.03))
+    assert result.positions.tolist() == [0, 1, 1, 1, 1, 0, 0, 0, 1, 1]
+    assert result.stats["num_trades"] == 2
+    assert result.trades["entry_price"].tolist() == [100.0, 103.0]
+
+def test_2d_signals_match_1d_runs():
+    signals = np.vstack([
+        np.array([1, 1, 1, 1, 1, 1, 0, 1, 1, 1]),
+        np.array([0, -1, -1, 0, 1, 1, 1, 0, 0, 0])
+    ])
+    config = BacktestConfig(stop_loss=0.03, take_profit=0.05, fees=0.001)
+    batch = run_backtest(PRICES, signals, config)
+    for row in range(signals.shape[0]):
+        single = run_backtest(PRICES, signals[row], config)
+        np.testing.assert_allclose(batch.equity[row], single.equity)
+        assert batch.stats["num_trades"][row] == single.stats["num_trades"]
+
+def test_entries_and_exits_are_held():
+    signals = signals_from_entries_exits(
+        [0, 1, 0, 0, 0],
+        [0, 0, 1, 0, 0],
+        short_entries=[0, 0, 0, 1, 0],
+        short_exits=[0, 0, 0, 0, 1]
+    )
+    assert signals.tolist() == [0, 1, 0, -1, 0]
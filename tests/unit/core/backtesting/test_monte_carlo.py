@@ -0,0 +1,46 @@
+# tests/unit/core/backtesting/test_monte_carlo.py
+import numpy as np
+import pytest
+
+from src.core.backtesting.generator import run_strategy_spec
+from src.core.backtesting.monte_carlo import (
+    format_monte_carlo_summary,
+    period_equity_returns,
+    run_monte_carlo,
+    simulate_paths,
+    trade_equity_returns
+)
+
+def test_trade_returns_compound_to_strategy_equity(random_prices, sma_cross_spec):
+    prices = random_prices(500)
+    spec = sma_cross_spec.model_copy(update={"fees": 0.001, "position_size": 0.5})
+    result = run_strategy_spec(spec, prices)
+    trade_returns = trade_equity_returns(result, spec.initial_capital)
+    assert trade_returns.size == result.stats["num_trades"]
+    assert np.prod(1 + trade_returns) == pytest.approx(result.equity[-1] / spec.initial_capital)
+
+def test_shuffled_paths_keep_the_total_return():
+    trade_returns = np.array([0.1, -0.2, 0.05, -0.3, 0.15])
+    paths = simulate_paths(trade_returns, 200, "shuffle", years=1.0, ruin_level=0.4, seed=0)
+    np.testing.assert_allclose(paths["total_return"], np.prod(1 + trade_returns) - 1)
+    # Both large losses in a row are a 44% drawdown, ruin is a 40% loss from the start
+    assert paths["max_drawdown"].min() == pytest.approx(0.8 * 0.7 - 1)
+    assert paths["ruined"].any() and not paths["ruined"].all()
+
+def test_chunking_is_reproducible_and_complete():
+    trade_returns = np.random.default_rng(1).normal(0.01, 0.05, 40)
+    result = run_monte_carlo(trade_returns, years=2.0, paths=1000, chunk_cells=4000, max_workers=1, seed=7)
+    again = run_monte_carlo(trade_returns, years=2.0, paths=1000, chunk_cells=4000, max_workers=1, seed=7)
+    assert result.max_drawdown.size == 1000
+    np.testing.assert_array_equal(result.cagr, again.cagr)
+    assert 0 <= result.ruin_probability <= 1
+    assert run_monte_carlo(np.array([]), years=1.0) is None
+
+def test_equity_blocks_compound_to_the_curve():
+    equity = 1000 * np.cumprod(1 + np.random.default_rng(2).normal(0, 0.01, 50))
+    block_returns = period_equity_returns(equity, 1000, 21)
+    assert block_returns.size == 3
+    assert block_returns[0] == pytest.approx(equity[20] / 1000 - 1)
+    assert np.prod(1 + block_returns) == pytest.approx(equity[-1] / 1000)
+    result = run_monte_carlo(block_returns, years=0.2, paths=100, max_workers=1, seed=0, unit="months")
+    assert "100 paths of 3 months" in format_monte_carlo_summary(result)
@@ -0,0 +1,38 @@
+# tests/unit/core/backtesting/test_portfolio.py
+import numpy as np
+import pytest
+
+from src.core.backtesting.generator import run_strategy_spec
+from src.core.backtesting.portfolio import (
+    allocation_weights,
+    portfolio_returns,
+    run_portfolio,
+    validate_portfolio
+)
+
+TIMESTAMPS = np.datetime64("2020-01-01") + np.arange(500) * np.timedelta64(1, "D")
+
+def test_rebalancing_periods():
+    returns = np.random.default_rng(1).normal(0, 0.01, (3, 50))
+    weights = np.full((3, 50), 1 / 3)
+    # A new period every bar is daily rebalancing, a single period is buy and hold
+    np.testing.assert_allclose(portfolio_returns(returns, weights, np.arange(50)), portfolio_returns(returns, weights))
+    held = np.prod(1 + portfolio_returns(returns, weights, np.zeros(50, dtype=int)))
+    assert held == pytest.approx(np.prod(1 + returns, axis=1).mean())
+
+def test_portfolio_combines_sleeves(random_prices, sma_cross_spec):
+    prices, spec = random_prices((3, 500)), sma_cross_spec
+    result, sleeves, table = run_portfolio(spec, ["A", "B", "C"], TIMESTAMPS, prices, rebalance_days=30)
+    for row in range(3):
+        np.testing.assert_allclose(sleeves.returns[row], run_strategy_spec(spec, prices[row]).returns)
+    assert result.stats["num_trades"] == table["num_trades"].sum()
+
+    weights = allocation_weights(prices, ["A", "B", "C"], "inverse_volatility")
+    np.testing.assert_allclose(weights.sum(axis=0), 1.0)
+    np.testing.assert_allclose(weights[:, :20], 1 / 3)
+
+def test_portfolio_validation():
+    with pytest.raises(ValueError, match="must be one of"):
+        validate_portfolio("AAPL", ["MSFT", "GOOGL"])
+    with pytest.raises(ValueError, match="one weight per"):
+        validate_portfolio("AAPL", ["AAPL", "MSFT"], "weights", {"AAPL": 1.0})
@@ -0,0 +1,40 @@
+# tests/unit/core/backtesting/test_replay.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.core.backtesting.replay import Strategy, TickData, TrailingStopStrategy, replay
+
+TIMESTAMPS = np.datetime64("2024-01-01") + np.arange(1000) * np.timedelta64(1, "m")
+PRICES = 100 * np.cumprod(1 + np.random.default_rng(0).normal(0, 0.002, 1000))
+
+class BuyAt(Strategy):
+    def __init__(self, orders):
+        self.orders = orders
+
+    def on_tick(self, index, price, bid, ask, bid_size, ask_size, broker):
+        if index in self.orders:
+            broker.order_target(self.orders[index])
+
+def test_fills_at_quotes_and_marks_at_price():
+    data = TickData.from_arrays(TIMESTAMPS, PRICES, PRICES - 0.05, PRICES + 0.05)
+    result = replay(data, BuyAt({10: 100, 20: 0}), initial_capital=100000, fees=0.001)
+    assert result.fills["price"].tolist() == pytest.approx([PRICES[10] + 0.05, PRICES[20] - 0.05])
+    expected = 100 * ((PRICES[20] - 0.05) - (PRICES[10] + 0.05)) - result.fills["fee"].sum()
+    assert result.equity[-1] - 100000 == pytest.approx(expected)
+    trade = result.trades[0]
+    assert (trade["entry_index"], trade["exit_index"], trade["direction"]) == (11, 20, 1)
+    assert result.positions[11:21].tolist() == [1] * 10 and result.positions[21] == 0
+
+def test_reversal_splits_trades():
+    data = TickData.from_frame(pd.DataFrame({"time": TIMESTAMPS, "price": PRICES}))
+    result = replay(data, BuyAt({5: 10, 50: -10}), allow_short=True)
+    assert result.trades[["entry_index", "exit_index", "direction"]].tolist() == [(6, 50, 1), (51, 999, -1)]
+    assert result.stats["num_trades"] == 2
+
+def test_trailing_stop_exits_below_peak():
+    data = TickData.from_arrays(TIMESTAMPS, PRICES)
+    result = replay(data, TrailingStopStrategy(trail=0.01, cooldown=5))
+    for trade in result.trades[:-1]:
+        peak = PRICES[trade["entry_index"] - 1:trade["exit_index"] + 1].max()
+        assert trade["exit_price"] <= peak * 0.99
@@ -0,0 +1,57 @@
+# tests/unit/core/backtesting/test_strategy_spec.py
+import numpy as np
+
+from src.core.backtesting.generator import (
+    StrategySpec,
+    build_signals,
+    parse_strategy_description
+)
+
+def test_parses_moving_average_crossover():
+    spec = parse_strategy_description(
+        "Buy when the 50-day moving average crosses above the 200-day moving average. "
+        "Sell when it crosses below. Use 1% of portfolio per trade."
+    )
+    assert [(i.kind, i.window) for i in spec.indicators] == [("sma", 50), ("sma", 200)]
+    assert spec.entry[0].op == "crosses_above"
+    assert spec.exit[0].op == "crosses_below"
+    assert spec.position_size == 0.01
+
+def test_parses_rsi_thresholds_and_stop():
+    spec = parse_strategy_description("Buy when RSI(14) drops below 30, sell above 70 with a 2% stop loss")
+    assert spec.indicators[0].window == 14
+    assert (spec.entry[0].right, spec.exit[0].right) == (30.0, 70.0)
+    assert spec.stop_loss == 0.02
+
+def test_unsupported_descriptions_fall_back():
+    assert parse_strategy_description("Buy when MACD crosses above the signal line") is None
+    assert parse_strategy_description("Buy when RSI is below 30 and price is above the 200-day moving average") is None
+
+def test_unrecognized_or_missing_exits_fall_back():
+    # Exits are never replaced with the family's default
+    assert parse_strategy_description(
+        "Buy when 10 day sma crosses above 30 day sma. Sell when price drops below the 30 day sma"
+    ) is None
+    assert parse_strategy_description("Buy NIFTY when price closes above the 20 day high") is None
+    assert parse_strategy_description("Buy when price crosses above the 50 day sma, sell when down 5% from entry") is None
+    assert parse_strategy_description("Buy when RSI is below 30 and sell when RSI is above 70 or after 10 days") is None
+
+def test_parses_explicit_exits():
+    spec = parse_strategy_description(
+        "Buy when price closes above the 20 day high, sell when price closes below the 10 day low"
+    )
+    assert [(i.kind, i.window) for i in spec.indicators] == [("highest", 20), ("lowest", 10)]
+    spec = parse_strategy_description("Short when the 5 ema crosses below the 20 ema, cover when it crosses above")
+    assert spec.direction == "short" and spec.exit[0].op == "crosses_above"
+
+def test_breakout_signals_hold_until_exit():
+    spec = StrategySpec.model_validate({
+        "indicators": [
+            {"name": "high", "kind": "highest", "window": 2},
+            {"name": "low", "kind": "lowest", "window": 2},
+        ],
+        "entry": [{"left": "price", "op": "above", "right": "high"}],
+        "exit": [{"left": "price", "op": "below", "right": "low"}],
+    })
+    prices = np.array([10, 11, 12, 11.5, 11.8, 10, 9], dtype=float)
+    assert build_signals(spec, prices).tolist() == [0, 0, 1, 1, 1, 0, 0]
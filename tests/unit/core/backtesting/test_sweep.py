@@ -0,0 +1,24 @@
+# tests/unit/core/backtesting/test_sweep.py
+import pytest
+
+from src.core.backtesting.generator import run_strategy_spec
+from src.core.backtesting.sweep import apply_parameters, run_sweep, validate_parameter_grid
+
+def test_sweep_matches_individual_runs(random_prices, sma_cross_spec):
+    prices = random_prices(500)
+    spec = sma_cross_spec
+    grid = {"fast.window": [3, 5, 8], "slow.window": [20, 30], "stop_loss": [0.02, 0.05]}
+    table = run_sweep(spec, prices, grid, chunk_cells=2000, max_workers=1)
+    assert len(table) == 12
+    assert table["sharpe_ratio"].is_monotonic_decreasing
+    for _, row in table.iterrows():
+        single = run_strategy_spec(apply_parameters(spec, {key: row[key] for key in grid}), prices)
+        assert single.stats["sharpe_ratio"] == pytest.approx(row["sharpe_ratio"])
+
+def test_grid_validation(sma_cross_description):
+    with pytest.raises(ValueError, match="combinations"):
+        validate_parameter_grid(sma_cross_description, {"fast.window": list(range(1, 30))}, max_combinations=10)
+    with pytest.raises(ValueError, match="Unknown sweep parameter"):
+        validate_parameter_grid(sma_cross_description, {"rsi.window": [10, 14]}, max_combinations=10)
+    with pytest.raises(ValueError, match="only supported"):
+        validate_parameter_grid("Buy on MACD crossovers", {"fast.window": [5]}, max_combinations=10)
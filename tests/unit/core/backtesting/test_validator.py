@@ -0,0 +1,52 @@
+# tests/unit/core/backtesting/test_validator.py
+from src.core.backtesting.validator import normalized_script_hash, script_warnings, validate_script_source
+
+SCRIPT = '''
+import argparse
+import logging
+import pandas as pd
+from src.core.backtesting.executor import BacktestConfig, run_backtest
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--data", required=True)
+parser.add_argument("--log", required=True)
+args = parser.parse_args()
+
+df = pd.read_csv(args.data, parse_dates=["time"])
+df["sma"] = df["price"].rolling(20).mean()
+data = df.dropna()
+signals = (data["price"] > data["sma"]).astype(int).to_numpy()
+result = run_backtest(data["price"].to_numpy(), signals, BacktestConfig())
+logging.info(result.stats["sharpe_ratio"])
+'''
+
+def test_valid_script_passes():
+    assert validate_script_source(SCRIPT, ["time", "price"], ["time", "price", "volume"]) == []
+
+def test_problems_are_reported():
+    script = SCRIPT.replace('parser.add_argument("--log", required=True)\n', "") + (
+        "import requests\n"
+        "for _, row in data.iterrows():\n"
+        "    print(row['price'], data['volume'])\n"
+    )
+    problems = validate_script_source(script, ["time", "price"])
+    assert len(problems) == 3
+    assert "--log" in problems[0]
+    assert "'requests' is not allowed" in problems[1]
+    assert "'volume'" in problems[2]
+    assert "iterrows" in script_warnings(script)[0]
+    assert validate_script_source("def broken(:\n")[0].startswith("line 1: syntax error")
+
+def test_working_scripts_are_not_rejected():
+    script = "import traceback, csv, io\n" + SCRIPT + (
+        'stats = df["price"].describe()\n'
+        'logging.info(stats["mean"])\n'
+        'logging.info(data.copy().loc[:, "sma"].max())\n'
+    )
+    assert validate_script_source(script, ["time", "price"]) == []
+    assert validate_script_source("import subprocess\n" + SCRIPT)[0] == "line 1: import of 'subprocess' is not allowed"
+
+def test_script_hash_ignores_formatting():
+    reformatted = "# generated\n" + SCRIPT.replace("rolling(20).mean()", "rolling( 20 ).mean()  # window")
+    assert normalized_script_hash(reformatted) == normalized_script_hash(SCRIPT)
+    assert normalized_script_hash(SCRIPT.replace("rolling(20)", "rolling(50)")) != normalized_script_hash(SCRIPT)
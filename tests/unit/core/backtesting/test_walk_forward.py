@@ -0,0 +1,29 @@
+# tests/unit/core/backtesting/test_walk_forward.py
+import numpy as np
+
+from src.core.backtesting.walk_forward import (
+    evaluate_window,
+    run_walk_forward,
+    walk_forward_windows
+)
+
+TIMESTAMPS = np.datetime64("2020-01-01") + np.arange(400) * np.timedelta64(1, "D")
+
+def test_windows_roll_by_test_length():
+    windows = walk_forward_windows(TIMESTAMPS, train_days=100, test_days=50)
+    assert [(w.train_start, w.test_start, w.test_end) for w in windows] == [
+        (0, 100, 150), (50, 150, 200), (100, 200, 250), (150, 250, 300), (200, 300, 350), (250, 350, 400)
+    ]
+
+def test_out_of_sample_results_are_stitched(random_prices, sma_cross_spec):
+    prices = random_prices(400)
+    spec = sma_cross_spec
+    grid = {"fast.window": [3, 5, 8]}
+    result, index, table = run_walk_forward(spec, TIMESTAMPS, prices, 100, 50, grid=grid, max_workers=2)
+    assert index.tolist() == list(range(100, 400))
+    assert len(table) == 6
+
+    windows = walk_forward_windows(TIMESTAMPS, 100, 50)
+    returns = np.concatenate([evaluate_window(spec, prices, w, grid)[1].returns for w in windows])
+    np.testing.assert_allclose(result.returns, returns)
+    assert result.stats["num_trades"] == table["num_trades"].sum()
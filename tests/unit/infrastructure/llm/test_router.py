@@ -0,0 +1,32 @@
+# tests/unit/infrastructure/llm/test_router.py
+from src.infrastructure.llm.router import MIN_SAMPLES_FOR_HEALTH, LLMRouter
+
+def make_router():
+    providers = {"openai": object(), "local": object(), "backup": object()}
+    return LLMRouter(providers, {"report_generation": ["openai", "local", "backup"]}, max_latency_ratio=2.0)
+
+def record(router, provider, latency, success=True, samples=MIN_SAMPLES_FOR_HEALTH):
+    for _ in range(samples):
+        router._stats(provider, "report_generation").record(latency, success)
+
+def test_slower_healthy_provider_ranks_below_faster_one():
+    router = make_router()
+    record(router, "openai", 10.0)
+    record(router, "local", 1.0)
+    record(router, "backup", 1.5)
+    assert router.candidates("report_generation") == ["local", "backup", "openai"]
+
+def test_latency_within_ratio_or_unmeasured_keeps_configured_order():
+    router = make_router()
+    record(router, "openai", 1.8)
+    record(router, "local", 1.0)
+    # Too few samples to trust the latency
+    record(router, "backup", 0.1, samples=MIN_SAMPLES_FOR_HEALTH - 1)
+    assert router.candidates("report_generation") == ["openai", "local", "backup"]
+
+def test_unhealthy_providers_stay_last_even_when_fast():
+    router = make_router()
+    record(router, "openai", 10.0)
+    record(router, "local", 1.0)
+    record(router, "backup", 0.1, success=False)
+    assert router.candidates("report_generation") == ["local", "openai", "backup"]
@@ -0,0 +1,47 @@
+# tests/unit/tasks/test_report_streaming.py
+import asyncio
+
+import pytest
+
+from src.config.settings import settings
+from src.infrastructure.llm.router import llm_router
+from src.tasks import report_generation
+
+DELTAS = ["# Report\n", "Sharpe ", "ratio ", "1.2\n"]
+
+@pytest.fixture
+def llm(monkeypatch):
+    """Deltas the LLM stream has handed out so far"""
+    consumed = []
+
+    async def stream_backtest_report(log_content):
+        for delta in DELTAS:
+            consumed.append(delta)
+            yield delta
+
+    monkeypatch.setattr(llm_router, "stream_backtest_report", stream_backtest_report)
+    monkeypatch.setattr(settings, "REPORT_STREAM_FLUSH_INTERVAL", 0.0)
+    return consumed
+
+def test_chunks_are_sent_in_order_after_the_stream(llm, monkeypatch):
+    sent = []
+
+    async def post_report_chunk(backtest_id, user_id, chunk, index, done=False):
+        await asyncio.sleep(0.01)
+        sent.append((user_id, chunk, index, done, len(llm)))
+
+    monkeypatch.setattr(report_generation, "post_report_chunk", post_report_chunk)
+    report = asyncio.run(report_generation.stream_report("b1", "u1", "log"))
+    assert report == "".join(DELTAS).strip()
+    assert [(user_id, chunk, index, done) for user_id, chunk, index, done, _ in sent] == [
+        ("u1", delta, index, False) for index, delta in enumerate(DELTAS)
+    ] + [("u1", "", len(DELTAS), True)]
+    # The stream never waited on the slow postbacks, it was read to the end first
+    assert all(consumed == len(DELTAS) for *_, consumed in sent)
+
+def test_failing_postbacks_do_not_abort_the_report(llm, monkeypatch):
+    async def post_report_chunk(backtest_id, user_id, chunk, index, done=False):
+        raise RuntimeError("API unavailable")
+
+    monkeypatch.setattr(report_generation, "post_report_chunk", post_report_chunk)
+    assert asyncio.run(report_generation.stream_report("b1", "u1", "log")) == "".join(DELTAS).strip()
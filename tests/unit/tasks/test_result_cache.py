@@ -0,0 +1,113 @@
+# tests/unit/tasks/test_result_cache.py
+import pytest
+
+from src.api.services import result_cache
+from src.core.backtesting.executor import ENGINE_VERSION
+from src.tasks import backtest_execution, report_generation
+from src.utils.metrics import RESULT_CACHE_COUNT
+
+SCRIPT = "import pandas as pd\nprint(pd.read_csv('data.csv')['price'].mean())\n"
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value
+
+class FakeS3:
+    def __init__(self, objects):
+        self.objects = dict(objects)
+
+    def copy_file(self, source_key, key):
+        if source_key not in self.objects:
+            raise Exception(f"Failed to copy in S3: {source_key} not found")
+        self.objects[key] = self.objects[source_key]
+
+    def get_file_url(self, key):
+        return f"https://s3/{key}"
+
+    async def get_file_content(self, key):
+        return self.objects[key]
+
+def cache_count(result):
+    return RESULT_CACHE_COUNT.labels(result=result)._value.get()
+
+@pytest.fixture
+def redis(monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr(result_cache, "redis_client", fake)
+    return fake
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    calls = []
+    monkeypatch.setattr(backtest_execution, "update_backtest_urls", lambda conn, backtest_id, **urls: calls.append(("urls", urls)))
+    monkeypatch.setattr(backtest_execution, "update_backtest_result_stats", lambda conn, backtest_id, stats: calls.append(("stats", stats)))
+    monkeypatch.setattr(backtest_execution, "update_backtest_status", lambda conn, backtest_id, status: calls.append(("status", status)))
+    monkeypatch.setattr(report_generation.generate_report, "delay", lambda **kwargs: calls.append(("report", kwargs)))
+    return calls
+
+def test_cache_key_ignores_formatting_and_tracks_data(tmp_path):
+    data = tmp_path / "data.csv"
+    data.write_text("time,price\n2024-01-01,100\n")
+    key = result_cache.result_cache_key(SCRIPT, str(data))
+    assert key.startswith(f"backtest_result:{ENGINE_VERSION}:")
+    assert result_cache.result_cache_key("# comment\n" + SCRIPT, str(data)) == key
+
+    data.write_text("time,price\n2024-01-01,101\n")
+    assert result_cache.result_cache_key(SCRIPT, str(data)) != key
+
+def test_log_stats_keep_headline_numbers():
+    log = "Total Return: 12.5%\nSharpe Ratio = 1.3\nBar 42: 101.5\nMax Drawdown: -8.2\nTotal Return: 1"
+    assert result_cache.parse_log_stats(log) == {"total_return": 12.5, "sharpe_ratio": 1.3, "max_drawdown": -8.2}
+
+def test_hit_reuses_log_and_miss_runs_script(redis, pipeline):
+    s3 = FakeS3({"b1/backtest.log": "Sharpe Ratio: 1.2"})
+    hits, misses = cache_count("hit"), cache_count("miss")
+
+    assert not backtest_execution.reuse_cached_result(None, s3, "b2", "key")
+    assert cache_count("miss") == misses + 1 and pipeline == []
+
+    stats = result_cache.parse_log_stats(s3.objects["b1/backtest.log"])
+    result_cache.store_result("key", "b1", "b1/backtest.log", stats)
+    assert backtest_execution.reuse_cached_result(None, s3, "b2", "key")
+    assert cache_count("hit") == hits + 1
+    copied = [key for key in s3.objects if key.startswith("b2/")]
+    assert [s3.objects[key] for key in copied] == ["Sharpe Ratio: 1.2"]
+    assert [call[0] for call in pipeline] == ["urls", "stats", "status", "report"]
+    assert pipeline[1] == ("stats", {"sharpe_ratio": 1.2})
+
+def test_missing_cached_objects_fall_back(redis, pipeline):
+    result_cache.store_result("key", "b1", "b1/backtest.log", {})
+    misses = cache_count("miss")
+    assert not backtest_execution.reuse_cached_result(None, FakeS3({}), "b2", "key")
+    assert cache_count("miss") == misses + 1 and pipeline == []
+
+    # A cached report that is gone is regenerated instead
+    result_cache.store_report("key", "b1/report.md")
+    backtest = {"id": "b2", "user_id": "u1"}
+    assert not report_generation.reuse_cached_report(FakeS3({}), backtest, "key", "b2/report.md")
+
+def test_cached_report_is_reused(redis, monkeypatch):
+    chunks = []
+
+    async def post_report_chunk(backtest_id, user_id, chunk, index, done=False):
+        chunks.append((backtest_id, user_id, chunk, index, done))
+
+    monkeypatch.setattr(report_generation, "post_report_chunk", post_report_chunk)
+    s3 = FakeS3({"b1/report.md": "# Report"})
+    backtest = {"id": "b2", "user_id": "u1"}
+
+    result_cache.store_result("key", "b1", "b1/backtest.log", {})
+    assert not report_generation.reuse_cached_report(s3, backtest, "key", "b2/report.md")
+
+    result_cache.store_report("key", "b1/report.md")
+    assert report_generation.reuse_cached_report(s3, backtest, "key", "b2/report.md")
+    assert s3.objects["b2/report.md"] == "# Report"
+    assert chunks == [("b2", "u1", "# Report", 0, True)]
+    # The backtest that produced the entry never reuses its own report
+    assert not report_generation.reuse_cached_report(s3, {"id": "b1", "user_id": "u1"}, "key", "b1/report.md")
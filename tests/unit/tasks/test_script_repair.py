@@ -0,0 +1,99 @@
+# tests/unit/tasks/test_script_repair.py
+from contextlib import contextmanager
+from uuid import uuid4
+
+import pytest
+
+from src.config.settings import settings
+from src.infrastructure.llm.router import llm_router
+from src.tasks import backtest_execution, script_validation
+from src.utils.metrics import SCRIPT_REPAIR_COUNT
+
+BROKEN = "import pandas as pd\nprint(pd.read_csv('data.csv')['prise'].mean())\n"
+
+class FakeS3:
+    def __init__(self, script):
+        self.script = script
+        self.uploads = []
+
+    async def download_file(self, key, local_path):
+        with open(local_path, "w") as file:
+            file.write(self.script if key.endswith("script.py") else "time,price\n2024-01-01,100\n")
+        return True
+
+    def upload_file_content(self, key, content, content_type=None):
+        self.uploads.append((key, content))
+
+def repair_count(stage, outcome):
+    return SCRIPT_REPAIR_COUNT.labels(stage=stage, outcome=outcome)._value.get()
+
+@pytest.fixture
+def llm(monkeypatch):
+    """Errors sent to `generate_fixed_script`, which answers with numbered fixes"""
+    prompts = []
+
+    async def generate_fixed_script(script, error):
+        prompts.append(error)
+        return f"# fix {len(prompts)}\n{BROKEN}"
+
+    monkeypatch.setattr(llm_router, "generate_fixed_script", generate_fixed_script)
+    monkeypatch.setattr(settings, "SCRIPT_REPAIR_MAX_ATTEMPTS", 2)
+    return prompts
+
+@pytest.fixture
+def validation(monkeypatch, llm):
+    """Runs `validate_backtest_script` without a database, failing scripts without a fix marker"""
+    fixed_by = []
+    s3 = FakeS3(BROKEN)
+
+    @contextmanager
+    def get_db():
+        yield None
+
+    def run_script(script_path, data_path, log_path):
+        with open(script_path) as file:
+            script = file.read()
+        return None if any(f"# fix {n}\n" in script for n in fixed_by) else "KeyError: 'prise'"
+
+    monkeypatch.setattr(script_validation, "get_db", get_db)
+    monkeypatch.setattr(script_validation, "S3Client", lambda: s3)
+    monkeypatch.setattr(script_validation, "run_script", run_script)
+    monkeypatch.setattr(script_validation, "update_backtest_status", lambda conn, backtest_id, status, error=None: None)
+    monkeypatch.setattr(settings, "SCRIPT_STATIC_VALIDATION_ENABLED", False)
+    monkeypatch.setattr(backtest_execution.execute_backtest, "delay", lambda **kwargs: None)
+    return s3, fixed_by
+
+def test_repairs_are_capped_and_counted(llm):
+    failed = repair_count("script_generation", "failed")
+    script, error = script_validation.repair_script(BROKEN, "first error", lambda fixed: "still broken", "script_generation", uuid4())
+    assert llm == ["first error", "still broken"]
+    assert script.startswith("# fix 2\n") and error == "still broken"
+    assert repair_count("script_generation", "failed") == failed + 1
+
+def test_repair_stops_once_the_check_passes(llm):
+    repaired = repair_count("script_generation", "repaired")
+    checks = iter(["static problem", None])
+    script, error = script_validation.repair_script(BROKEN, "first error", lambda fixed: next(checks), "script_generation", uuid4())
+    assert llm == ["first error", "static problem"]
+    assert script.startswith("# fix 2\n") and error is None
+    assert repair_count("script_generation", "repaired") == repaired + 1
+
+    # Passing scripts are not sent to the LLM or counted
+    assert script_validation.repair_script(BROKEN, None, lambda fixed: "unused", "script_generation", uuid4()) == (BROKEN, None)
+    assert len(llm) == 2 and repair_count("script_generation", "repaired") == repaired + 1
+
+def test_validation_uploads_only_repaired_scripts(validation, llm):
+    s3, fixed_by = validation
+    backtest_id = uuid4()
+    failed = repair_count("validation", "failed")
+    with pytest.raises(Exception, match="Validation failed: KeyError"):
+        script_validation.validate_backtest_script.run(backtest_id=backtest_id)
+    assert len(llm) == 2 and s3.uploads == []
+    assert repair_count("validation", "failed") == failed + 1
+
+    llm.clear()
+    fixed_by.append(1)
+    repaired = repair_count("validation", "repaired")
+    script_validation.validate_backtest_script.run(backtest_id=backtest_id)
+    assert s3.uploads == [(f"{backtest_id}/script.py", f"# fix 1\n{BROKEN}")]
+    assert repair_count("validation", "repaired") == repaired + 1
@@ -0,0 +1,18 @@
+# tests/unit/utils/test_pagination.py
+import base64
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import pytest
+
+from src.utils.pagination import decode_cursor, encode_cursor
+
+def test_cursor_round_trip():
+    created_at, row_id = datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc), uuid4()
+    assert decode_cursor(encode_cursor(created_at, row_id)) == (created_at, str(row_id))
+
+@pytest.mark.parametrize("raw", ["2024-01-02T03:04:05|1 OR 1=1", "not a date|" + str(uuid4()), "no separator"])
+def test_malformed_cursors_are_rejected(raw):
+    cursor = base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(cursor)